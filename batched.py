@@ -0,0 +1,180 @@
+from typing import List
+
+from selenium.common.exceptions import (
+    InvalidSelectorException, NoSuchElementException, WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+from data_reader import DataReader
+from snapshot import PageSnapshot
+
+# Consultas que o DataReader faz em cada página, resolvidas todas no navegador
+# em uma única chamada. Cada item é (by, valor, consultas relativas aos
+# elementos encontrados). Os valores precisam ser idênticos aos usados nos
+# métodos do DataReader; uma consulta que não esteja aqui é respondida pelo
+# PageSnapshot montado a partir do HTML da mesma coleta.
+CONSULTAS_LEITORES = (
+    # read_familia
+    (By.CSS_SELECTOR, "li.flora.e.funga.hier1", ()),
+    (By.CSS_SELECTOR, "[title='Família']", ()),
+    (By.CSS_SELECTOR, ".taxon-family", ()),
+    (By.CSS_SELECTOR, ".taxon", ()),
+    # read_autor
+    (By.CSS_SELECTOR, ".noneAutorInfraGeneric", ()),
+    (By.CSS_SELECTOR, ".taxon-author, .autor, [itemprop='author'], .author-name", ()),
+    (By.CSS_SELECTOR, ".nome.taxon, .scientific-name, .taxon-name", ()),
+    (By.CSS_SELECTOR, ".nomeAutorSupraGenerico", ()),
+    (By.CSS_SELECTOR, "meta[name='author'], meta[property='author']", ()),
+    (By.CSS_SELECTOR, "body", ()),
+    # read_status_nome
+    (By.CSS_SELECTOR, ".taxon-status, .status-badge, [class*='status']", ()),
+    (By.CSS_SELECTOR, ".accepted-name, .taxon-accepted", ()),
+    (By.CSS_SELECTOR, ".scientific-name, .taxon-name", ()),
+    # read_reflora_link
+    (By.CSS_SELECTOR, "link[rel='canonical']", ()),
+    # read_forma_e_substrato (estratégia palavras_chave)
+    (By.CSS_SELECTOR, ".forma-de-vida", ()),
+    (By.CSS_SELECTOR, ".substrato", ()),
+    # read_secao_distribuicao
+    (By.XPATH, '//div[@class="text"]', ()),
+    # _ler_origem_e_endemismo
+    (By.XPATH, "//h4[contains(text(), 'Origem')]", ((By.XPATH, "./following-sibling::div"),)),
+    (By.XPATH, "//h4[contains(text(), 'Endemismo')]", ((By.XPATH, "./following-sibling::div"),)),
+)
+
+JS_COLETA = DataReader.JS_FORMA_SUBSTRATO + """
+const consultas = arguments[0];
+
+function buscar(raiz, by, valor) {
+    if (by === 'xpath') {
+        const r = document.evaluate(valor, raiz, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const elementos = [];
+        for (let i = 0; i < r.snapshotLength; i++) {
+            const no = r.snapshotItem(i);
+            if (no.nodeType === Node.ELEMENT_NODE) elementos.push(no);
+        }
+        return elementos;
+    }
+    return Array.from(raiz.querySelectorAll(valor));
+}
+
+function lerElemento(el, filhos) {
+    const atributos = {};
+    for (const a of el.attributes) atributos[a.name] = a.value;
+    const item = {
+        texto: el.innerText !== undefined ? el.innerText : el.textContent,
+        textContent: el.textContent,
+        atributos: atributos,
+        filhos: {}
+    };
+    for (const [by, valor] of filhos) {
+        try {
+            item.filhos[by + '|' + valor] = buscar(el, by, valor).map(f => lerElemento(f, []));
+        } catch (e) {
+            // consulta inválida: fica sem resposta e cai no fallback
+        }
+    }
+    return item;
+}
+
+const resultado = {consultas: {}, html: document.documentElement.outerHTML, url: window.location.href};
+for (const [by, valor, filhos] of consultas) {
+    try {
+        resultado.consultas[by + '|' + valor] = buscar(document, by, valor).map(el => lerElemento(el, filhos));
+    } catch (e) {
+        // idem
+    }
+}
+resultado.forma_substrato = extrairFormaESubstrato();
+return resultado;
+"""
+
+
+def _chave(by, value) -> str:
+    return f"{by}|{value}"
+
+
+class BatchedElement:
+    """Elemento já lido pelo JS_COLETA, com a interface usada do WebElement"""
+
+    def __init__(self, dados: dict):
+        self._dados = dados
+
+    @property
+    def text(self) -> str:
+        return (self._dados.get("texto") or "").strip()
+
+    def get_attribute(self, nome):
+        if nome == "textContent":
+            return self._dados.get("textContent") or ""
+        return self._dados.get("atributos", {}).get(nome)
+
+    def find_elements(self, by=By.ID, value=None) -> List["BatchedElement"]:
+        filhos = self._dados.get("filhos", {})
+        chave = _chave(by, value)
+        if chave not in filhos:
+            raise InvalidSelectorException(f"Consulta relativa não incluída na coleta: {by}={value}")
+        return [BatchedElement(dados) for dados in filhos[chave]]
+
+    def find_element(self, by=By.ID, value=None) -> "BatchedElement":
+        encontrados = self.find_elements(by, value)
+        if not encontrados:
+            raise NoSuchElementException(f"Elemento não encontrado na coleta: {by}={value}")
+        return encontrados[0]
+
+
+class BatchedPage:
+    """
+    Resultado de uma única chamada execute_script (JS_COLETA) sobre a página
+    carregada no WebDriver.
+
+    O navegador resolve todos os seletores do DataReader e devolve texto e
+    atributos dos elementos, o HTML da página e o resultado do JS de forma de
+    vida/substrato, em uma só ida e volta ao chromedriver. Os métodos do
+    DataReader rodam sobre este objeto como rodariam sobre o driver; consultas
+    fora de CONSULTAS_LEITORES (estratégias de fallback) são respondidas por
+    um PageSnapshot do mesmo HTML, montado só se necessário.
+    """
+
+    is_snapshot = True
+    modo_extracao = "batched"
+
+    def __init__(self, dados: dict, current_url: str = ""):
+        self._consultas = dados.get("consultas") or {}
+        self.page_source = dados.get("html") or ""
+        self.current_url = current_url or dados.get("url", "")
+        forma_substrato = dados.get("forma_substrato") or {}
+        # Lido por DataReader._forma_substrato_javascript no lugar de executar o script
+        self.forma_substrato_js = (forma_substrato.get("forma", ""), forma_substrato.get("substrato", ""))
+        self._snapshot = None
+
+    @classmethod
+    def from_driver(cls, driver, url: str = None, consultas=CONSULTAS_LEITORES) -> "BatchedPage":
+        dados = driver.execute_script(JS_COLETA, [[by, valor, [list(f) for f in filhos]]
+                                                  for by, valor, filhos in consultas])
+        return cls(dados or {}, url if url is not None else "")
+
+    def snapshot(self) -> PageSnapshot:
+        if self._snapshot is None:
+            self._snapshot = PageSnapshot(self.page_source, self.current_url)
+        return self._snapshot
+
+    @property
+    def soup(self):
+        """Árvore do PageSnapshot, se já montado (None: parsear o HTML sai mais barato)"""
+        return self._snapshot.soup if self._snapshot is not None else None
+
+    def find_elements(self, by=By.ID, value=None):
+        chave = _chave(by, value)
+        if chave in self._consultas:
+            return [BatchedElement(dados) for dados in self._consultas[chave]]
+        return self.snapshot().find_elements(by, value)
+
+    def find_element(self, by=By.ID, value=None):
+        encontrados = self.find_elements(by, value)
+        if not encontrados:
+            raise NoSuchElementException(f"Elemento não encontrado na coleta: {by}={value}")
+        return encontrados[0]
+
+    def execute_script(self, *args, **kwargs):
+        raise WebDriverException("BatchedPage não executa JavaScript")
@@ -0,0 +1,237 @@
+"""
+Micro-benchmark dos métodos de extração do DataReader.
+
+Roda cada método de leitura (e cada estratégia de read_forma_e_substrato)
+contra o corpus de páginas salvas em benchmarks/fixtures e grava os tempos
+em um arquivo JSON, para comparar mudanças no parser em velocidade além de
+em corretude.
+
+Uso:
+    python benchmarks/bench_data_reader.py
+    python benchmarks/bench_data_reader.py --repeticoes 10 --saida bench.json
+    python benchmarks/bench_data_reader.py --sem-navegador   # só HTML puro
+
+O modo navegador serve as fixtures por um servidor HTTP estático local e as
+abre no Chrome headless; o modo HTML puro roda os mesmos métodos sobre um
+PageSnapshot (DOM parseado em memória), além da normalização e da busca de
+padrões, sem precisar do Chrome.
+
+No modo navegador também é medida a extração completa de uma página em cada
+modo do scraper (live, snapshot e batched), incluindo a transferência dos
+dados do Chrome, para comparar o caminho campo a campo com as coletas únicas.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from batched import BatchedPage
+from data_reader import DataReader
+from snapshot import PageSnapshot
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAIDA_PADRAO = "bench_results.json"
+
+
+def carregar_fixtures(pasta=FIXTURES_DIR):
+    """Lê o manifest e retorna [(arquivo, nome buscado, html)]"""
+    with open(os.path.join(pasta, "manifest.json"), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    fixtures = []
+    for arquivo, nome in manifest.items():
+        with open(os.path.join(pasta, arquivo), 'r', encoding='utf-8') as f:
+            fixtures.append((arquivo, nome, f.read()))
+    return fixtures
+
+
+def cronometrar(func, repeticoes):
+    """Executa `func` `repeticoes` vezes e retorna (estatísticas, último resultado)"""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+
+    stats = {
+        "repeticoes": repeticoes,
+        "min_s": min(tempos),
+        "mediana_s": statistics.median(tempos),
+        "media_s": statistics.mean(tempos),
+        "max_s": max(tempos),
+    }
+    return stats, resultado
+
+
+class _HandlerSilencioso(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ServidorEstatico:
+    """Servidor HTTP local que serve a pasta de fixtures em uma porta livre"""
+
+    def __init__(self, pasta):
+        handler = partial(_HandlerSilencioso, directory=pasta)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def alvos_html(html):
+    """Funções que rodam sobre o HTML puro, sem navegador"""
+    return [
+        ("PageSnapshot (parse)", lambda: PageSnapshot(html, "")),
+        ("_normalizar_texto", lambda: DataReader._normalizar_texto(html)),
+        ("_buscar_padroes[ESTADOS_BR]",
+         lambda: DataReader._buscar_padroes(html, DataReader.ESTADOS_BR)),
+        ("_buscar_padroes[DOMINIOS_FITOGEOGRAFICOS]",
+         lambda: DataReader._buscar_padroes(html, DataReader.DOMINIOS_FITOGEOGRAFICOS)),
+        ("_buscar_estados_e_dominios", lambda: DataReader._buscar_estados_e_dominios(html)),
+    ]
+
+
+def alvos_leitores(driver, nome):
+    """Métodos do DataReader que leem a página (WebDriver ou PageSnapshot)"""
+    alvos = [
+        ("read_familia", lambda: DataReader.read_familia(driver)),
+        ("read_autor", lambda: DataReader.read_autor(driver)),
+        ("read_status_nome", lambda: DataReader.read_status_nome(driver, nome)),
+        ("read_reflora_link", lambda: DataReader.read_reflora_link(driver)),
+        ("read_distribuicao", lambda: DataReader.read_distribuicao(driver)),
+        ("read_secao_distribuicao", lambda: DataReader.read_secao_distribuicao(driver)),
+        ("read_forma_e_substrato", lambda: DataReader.read_forma_e_substrato(driver)),
+        ("extract_fitogeographic_data", lambda: DataReader.extract_fitogeographic_data(driver)),
+        ("_ler_origem_e_endemismo", lambda: DataReader._ler_origem_e_endemismo(driver)),
+    ]
+    for estrategia in DataReader.FORMA_SUBSTRATO_ESTRATEGIAS:
+        func = DataReader._estrategia_forma_substrato(estrategia)
+        alvos.append((f"forma_substrato[{estrategia}]", partial(func, driver)))
+    return alvos
+
+
+def extrair_pagina(pagina, nome, estrategias=None):
+    """Todos os campos lidos de uma página, como em scraper.extract_species_data"""
+    return {
+        "status": DataReader.read_status_nome(pagina, nome),
+        "forma_substrato": DataReader.read_forma_e_substrato(pagina, estrategias),
+        "origem_endemismo": DataReader._ler_origem_e_endemismo(pagina),
+        "distribuicao": DataReader.read_secao_distribuicao(pagina),
+        "familia": DataReader.read_familia(pagina),
+        "autor": DataReader.read_autor(pagina),
+    }
+
+
+def alvos_modos(driver, nome):
+    """Extração completa de uma página em cada modo, incluindo a coleta no Chrome"""
+    from scraper import FORMA_SUBSTRATO_BATCHED
+
+    return [
+        ("extracao[live]", lambda: extrair_pagina(driver, nome)),
+        ("extracao[snapshot]", lambda: extrair_pagina(PageSnapshot.from_driver(driver), nome)),
+        ("extracao[batched]",
+         lambda: extrair_pagina(BatchedPage.from_driver(driver), nome, FORMA_SUBSTRATO_BATCHED)),
+    ]
+
+
+def _registrar(resultados, fixture, modo, alvo, stats, resultado):
+    resultados.append({
+        "fixture": fixture,
+        "modo": modo,
+        "alvo": alvo,
+        **stats,
+        "resultado": resultado,
+    })
+    print(f"  {alvo:<45} mediana {stats['mediana_s'] * 1000:9.3f} ms")
+
+
+def rodar_html(fixtures, repeticoes, resultados):
+    for arquivo, nome, html in fixtures:
+        print(f"[html] {arquivo}")
+        for alvo, func in alvos_html(html):
+            stats, resultado = cronometrar(func, repeticoes)
+            if alvo == "_normalizar_texto":
+                resultado = f"<{len(resultado)} caracteres>"
+            elif isinstance(resultado, PageSnapshot):
+                resultado = None
+            _registrar(resultados, arquivo, "html", alvo, stats, resultado)
+
+        pagina = PageSnapshot(html, f"file://{arquivo}")
+        for alvo, func in alvos_leitores(pagina, nome):
+            stats, resultado = cronometrar(func, repeticoes)
+            _registrar(resultados, arquivo, "snapshot", alvo, stats, resultado)
+
+
+def rodar_navegador(fixtures, repeticoes, resultados, headless=True):
+    from scraper import ReusableDriver
+
+    driver_instance = ReusableDriver(headless=headless)
+    try:
+        driver = driver_instance.get_driver()
+        with ServidorEstatico(FIXTURES_DIR) as servidor:
+            for arquivo, nome, _ in fixtures:
+                print(f"[navegador] {arquivo}")
+                driver.get(f"{servidor.base_url}/{arquivo}")
+                for alvo, func in alvos_leitores(driver, nome) + alvos_modos(driver, nome):
+                    stats, resultado = cronometrar(func, repeticoes)
+                    _registrar(resultados, arquivo, "navegador", alvo, stats, resultado)
+    finally:
+        driver_instance.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos do DataReader")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="arquivo JSON de resultados")
+    parser.add_argument("--sem-navegador", action="store_true",
+                        help="mede apenas HTML puro e PageSnapshot, sem abrir o Chrome")
+    parser.add_argument("--com-janela", action="store_true",
+                        help="abre o Chrome visível em vez de headless")
+    args = parser.parse_args(argv)
+
+    fixtures = carregar_fixtures()
+    resultados = []
+    # Ordem fixa das estratégias, para que os tempos sejam comparáveis entre execuções
+    DataReader.ESTATISTICAS_FORMA_SUBSTRATO.adaptativo = False
+
+    rodar_html(fixtures, args.repeticoes, resultados)
+    if not args.sem_navegador:
+        rodar_navegador(fixtures, args.repeticoes, resultados, headless=not args.com_janela)
+
+    saida = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2, default=str)
+    print(f"\nResultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark da junção dos resultados com as abas originais (enriquecimento.py).
+
+Monta abas sintéticas de parcelas com nomes repetidos (grafias com
+maiúsculas e espaços diferentes, linhas vazias) e uma tabela de resultados
+por nome distinto, e mede a deduplicação dos nomes e o hash join para
+tamanhos crescentes. Confere o resultado contra uma busca linha a linha em
+dicionário e mostra o tempo por linha, que deve ficar estável (escala
+linear).
+
+Uso:
+    python benchmarks/bench_enriquecimento.py
+    python benchmarks/bench_enriquecimento.py --linhas 50000 500000 --especies 5000 --saida join.json
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from bench_data_reader import cronometrar
+from checklist import chave_nome
+from enriquecimento import _CHAVE, chaves_nomes, juntar_resultados, nomes_unicos
+
+
+def aba_sintetica(linhas, especies):
+    """Aba de parcela com `linhas` linhas e até `especies` nomes distintos"""
+    nomes = []
+    for i in range(linhas):
+        n = (i * 7919) % especies
+        if i % 50 == 0:
+            nomes.append(None)
+        elif i % 3 == 0:
+            nomes.append(f"  Genero{n % 97}  ESPECIE{n} ")
+        else:
+            nomes.append(f"Genero{n % 97} especie{n}")
+    return pd.DataFrame({"Parcela": [i // 100 for i in range(linhas)], "Nome Científico": nomes,
+                         "DAP": [(i % 40) + 5 for i in range(linhas)]})
+
+
+def resultados_sinteticos(unicos):
+    return pd.DataFrame({
+        "Família": [f"Familia{i % 13}" for i in range(len(unicos))],
+        "Status Nome": "Nome válido",
+        "Forma de Vida": "Árvore",
+        _CHAVE: unicos[_CHAVE].to_numpy(),
+    })
+
+
+def enriquecer(df):
+    chaves = chaves_nomes(df["Nome Científico"])
+    unicos = nomes_unicos({"aba": chaves}, {"aba": df["Nome Científico"]})
+    return juntar_resultados(df, chaves, resultados_sinteticos(unicos))
+
+
+def referencia(df):
+    """Busca linha a linha: a família de cada linha pelo dicionário chave → resultado"""
+    chaves = ["" if pd.isna(nome) else chave_nome(str(nome).strip()) for nome in df["Nome Científico"]]
+    familias = {}
+    for chave in chaves:
+        if chave and chave not in familias:
+            familias[chave] = f"Familia{len(familias) % 13}"
+    return [familias.get(chave) for chave in chaves]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da junção do enriquecimento")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[50000, 100000, 250000, 500000])
+    parser.add_argument("--especies", type=int, default=5000, help="nomes distintos nas abas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    problemas = []
+    resultados = []
+    for linhas in args.linhas:
+        df = aba_sintetica(linhas, args.especies)
+        stats, enriquecido = cronometrar(lambda: enriquecer(df), args.repeticoes)
+        esperado = referencia(df)
+        obtido = enriquecido["Família"].astype(object).where(enriquecido["Família"].notna(), None).tolist()
+        if len(enriquecido) != linhas or list(enriquecido.columns[:3]) != list(df.columns) or obtido != esperado:
+            problemas.append(f"{linhas} linhas: junção diferente da busca linha a linha")
+
+        por_linha = stats["mediana_s"] / linhas
+        resultados.append({"linhas": linhas, "juncao": stats, "us_por_linha": por_linha * 1e6})
+        print(f"{linhas:>9} linhas | {stats['mediana_s']:7.3f} s | {por_linha * 1e6:6.2f} µs/linha")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "especies": args.especies,
+                       "resultados": resultados, "divergencias": problemas}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+    if problemas:
+        print("\nResultados divergentes:")
+        for problema in problemas:
+            print(f"  {problema}")
+        raise SystemExit(1)
+    print("\nA junção confere com a busca linha a linha em todos os tamanhos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark da leitura da lista de nomes (excel_utils.iter_blocos_nomes).
+
+Gera um checklist sintético com várias colunas além dos nomes, grava em CSV,
+Parquet e ODS e mede, para cada formato, o tempo e o pico de memória
+(tracemalloc) da leitura em blocos só da coluna de nomes, comparados aos da
+leitura da tabela inteira pelo pandas. Confere também que os nomes e os
+índices lidos em blocos são os mesmos da leitura inteira.
+
+Uso:
+    python benchmarks/bench_entrada.py
+    python benchmarks/bench_entrada.py --linhas 2000000 --linhas-ods 50000 --saida entrada.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from excel_utils import COLUNA_NOMES, LINHAS_POR_BLOCO, iter_blocos_nomes
+
+FAMILIAS = ["Meliaceae", "Fabaceae", "Myrtaceae", "Lauraceae", "Rubiaceae"]
+
+
+def checklist_sintetico(n):
+    """Checklist com nomes repetidos, linhas sem nome e colunas que a busca não usa"""
+    return pd.DataFrame({
+        "id": range(n),
+        "Família": [FAMILIAS[i % len(FAMILIAS)] for i in range(n)],
+        COLUNA_NOMES: [f"Genero{i % 997} especie{i % 50000}" if i % 13 else None for i in range(n)],
+        "Autor": "Vell.",
+        "Localidade": [f"Município {i % 5570}, Estado {i % 27}" for i in range(n)],
+        "Observações": "Coletado em mata ciliar, próximo ao córrego, em solo arenoso",
+    })
+
+
+def gravar(formato, df, caminho):
+    if formato == "csv":
+        df.to_csv(caminho, index=False)
+    elif formato == "parquet":
+        df.to_parquet(caminho, index=False)
+    else:
+        df.to_excel(caminho, sheet_name="Checklist", index=False, engine="odf")
+
+
+def ler_inteira(formato, caminho):
+    """Tabela inteira com strings Python, para o tracemalloc ver a memória dos três formatos"""
+    with pd.option_context("future.infer_string", False):
+        if formato == "csv":
+            return pd.read_csv(caminho, dtype=object)
+        if formato == "parquet":
+            return pd.read_parquet(caminho)
+        return pd.read_excel(caminho, sheet_name="Checklist", dtype=object)
+
+
+def sem_nan(pares):
+    return [(idx, None if pd.isna(nome) else nome) for idx, nome in pares]
+
+
+def medir(funcao):
+    """(segundos, pico de memória em bytes, valor devolvido)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        valor = funcao()
+        return time.perf_counter() - inicio, tracemalloc.get_traced_memory()[1], valor
+    finally:
+        tracemalloc.stop()
+
+
+def em_blocos(caminho):
+    """Consome os blocos como o fetch_data: só (índice, nome) de cada linha fica na memória"""
+    return [(idx, nome) for bloco in iter_blocos_nomes(caminho, "Checklist", COLUNA_NOMES, LINHAS_POR_BLOCO)
+            for idx, nome in zip(bloco.index, bloco[COLUNA_NOMES])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da leitura da lista de nomes")
+    parser.add_argument("--linhas", type=int, default=500000, help="linhas do CSV e do Parquet")
+    parser.add_argument("--linhas-ods", type=int, default=20000,
+                        help="linhas do ODS (a gravação pelo pandas é lenta)")
+    parser.add_argument("--formatos", nargs="+", choices=("csv", "parquet", "ods"),
+                        default=["csv", "parquet", "ods"])
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    divergencias = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for formato in args.formatos:
+            linhas = args.linhas_ods if formato == "ods" else args.linhas
+            caminho = os.path.join(pasta, f"Checklist.{formato}")
+            gravar(formato, checklist_sintetico(linhas), caminho)
+
+            tempo_inteira, pico_inteira, df = medir(lambda: ler_inteira(formato, caminho))
+            nomes = df[COLUNA_NOMES]
+            esperado = sem_nan(zip(nomes.index, nomes))[:nomes.last_valid_index() + 1]
+            del df, nomes
+
+            tempo_blocos, pico_blocos, lidos = medir(lambda: em_blocos(caminho))
+            if sem_nan(lidos) != esperado:
+                divergencias.append(f"{formato}: nomes ou índices diferentes dos da leitura inteira")
+
+            resultados.append({"formato": formato, "linhas": linhas, "bytes": os.path.getsize(caminho),
+                               "inteira": {"segundos": tempo_inteira, "pico_bytes": pico_inteira},
+                               "em_blocos": {"segundos": tempo_blocos, "pico_bytes": pico_blocos}})
+            print(f"{formato:<8} {linhas:>9} linhas | inteira {tempo_inteira:7.2f} s"
+                  f" {pico_inteira / 2 ** 20:8.1f} MiB | em blocos {tempo_blocos:7.2f} s"
+                  f" {pico_blocos / 2 ** 20:8.1f} MiB")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "resultados": resultados,
+                       "divergencias": divergencias}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+    if divergencias:
+        print("\nLeituras divergentes:")
+        for divergencia in divergencias:
+            print(f"  {divergencia}")
+        raise SystemExit(1)
+    print("\nTodos os formatos leram os mesmos nomes em blocos e inteiros.")
+
+
+if __name__ == "__main__":
+    main()
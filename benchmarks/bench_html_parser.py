@@ -0,0 +1,127 @@
+"""
+Benchmark dos backends de parsing de HTML (html_parser.py).
+
+Para cada página das fixtures, de variantes com marcação incomum na seção de
+forma de vida/substrato e de uma página sintética grande (fixtures
+concatenadas), mede o parse e a leitura da seção em cada backend instalado
+e confere que todos extraem exatamente os mesmos campos que o BeautifulSoup
+com html.parser (o parser usado antes) e que o caminho do PageSnapshot.
+
+Uso:
+    python benchmarks/bench_html_parser.py
+    python benchmarks/bench_html_parser.py --repeticoes 50 --multiplicador 20 --saida parsers.json
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from bench_data_reader import carregar_fixtures, cronometrar
+from data_reader import DataReader
+from html_parser import BackendBeautifulSoup, backends_disponiveis
+from snapshot import PageSnapshot
+
+ID_CONTAINER = "forma-de-vida-e-substrato"
+CLASSES = ("forma-de-vida", "substrato")
+
+# Substituições aplicadas à seção de forma de vida de nome_valido.html
+VARIANTES = {
+    "comentario_e_script": ("<br>Árvore</div>",
+                            "<br>Árvore<!-- oculto --><script>var x = 'Arbusto';</script></div>"),
+    "duplicatas_e_espacos": ("<br>Árvore</div>", "<br>  Árvore \n<br>Árvore<br>\n<span> Liana </span></div>"),
+    "br_maiusculo": ("<br>Árvore</div>", "<BR/>Árvore</div>"),
+    "sem_quebra": ("<b>Forma de Vida</b><br>Árvore", "<b>Forma de Vida</b> Árvore"),
+    "classes_extras": ('class="forma-de-vida"', 'class="campo forma-de-vida destaque"'),
+    "entidades": ("<br>Terrícola</div>", "<br>Terr&iacute;cola&nbsp;<br>Rup&#237;cola</div>"),
+}
+
+
+class _Pagina:
+    """Só o page_source, para a estratégia parsear com o backend configurado"""
+
+    def __init__(self, html):
+        self.page_source = html
+
+
+def paginas(multiplicador):
+    fixtures = carregar_fixtures()
+    saida = [(arquivo, html) for arquivo, _, html in fixtures]
+    base = dict(saida)["nome_valido.html"]
+    for nome, (trecho, substituto) in VARIANTES.items():
+        saida.append((f"variante:{nome}", base.replace(trecho, substituto, 1)))
+    corpus = "".join(html for _, _, html in fixtures)
+    saida.append((f"corpus x{multiplicador}", corpus * multiplicador))
+    return saida
+
+
+def extrair(backend, html):
+    """Campos da estratégia "beautifulsoup" do DataReader com `backend`"""
+    anterior = DataReader.PARSER_HTML
+    DataReader.PARSER_HTML = backend
+    try:
+        return DataReader._forma_substrato_beautifulsoup(_Pagina(html))
+    finally:
+        DataReader.PARSER_HTML = anterior
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de parsing de HTML")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--multiplicador", type=int, default=20,
+                        help="quantas vezes repetir o corpus na página sintética grande")
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    backends = backends_disponiveis()
+    referencia = BackendBeautifulSoup()
+    print(f"Backends instalados: {', '.join(backends)} (padrão: {DataReader.PARSER_HTML.nome})\n")
+
+    nomes = list(backends)
+    print(f"{'página':<34} {'chars':>9} | " + " | ".join(f"{nome:>18}" for nome in nomes))
+
+    resultados = []
+    divergencias = []
+    for pagina, html in paginas(args.multiplicador):
+        esperado = extrair(referencia, html)
+        via_snapshot = DataReader._forma_substrato_beautifulsoup(PageSnapshot(html))
+        if via_snapshot != esperado:
+            divergencias.append(f"{pagina}: PageSnapshot {via_snapshot!r} != {esperado!r}")
+
+        tempos = {}
+        for nome, backend in backends.items():
+            campos = extrair(backend, html)
+            if campos != esperado:
+                divergencias.append(f"{pagina}: {nome} {campos!r} != {esperado!r}")
+
+            parse, arvore = cronometrar(lambda: backend.parse(html), args.repeticoes)
+            leitura, _ = cronometrar(lambda: backend.blocos(arvore, ID_CONTAINER, CLASSES), args.repeticoes)
+            tempos[nome] = {"parse": parse, "leitura": leitura}
+
+        resultados.append({"pagina": pagina, "caracteres": len(html), "campos": list(esperado),
+                           "backends": tempos})
+        print(f"{pagina:<34} {len(html):>9} | " + " | ".join(
+            f"{tempos[nome]['parse']['mediana_s'] * 1000:9.3f} ms parse" for nome in nomes))
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "resultados": resultados,
+                       "divergencias": divergencias}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+    if divergencias:
+        print("\nCampos divergentes:")
+        for divergencia in divergencias:
+            print(f"  {divergencia}")
+        raise SystemExit(1)
+    print("\nTodos os backends extraíram os mesmos campos.")
+
+
+if __name__ == "__main__":
+    main()
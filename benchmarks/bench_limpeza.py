@@ -0,0 +1,208 @@
+"""
+Benchmark da limpeza de forma de vida e substrato feita ao salvar a planilha.
+
+Compara a implementação anterior (iterrows, uma linha por vez, seguida das
+cinco passadas de .str.replace de salvar_planilha) com
+limpar_forma_vida_substrato vetorizada, sobre um corpus de casos difíceis
+(linhas misturadas no substrato, duplicatas, títulos, "nan", vazios) repetido
+até o número de linhas pedido. Confere que as duas produzem exatamente as
+mesmas colunas.
+
+Uso:
+    python benchmarks/bench_limpeza.py
+    python benchmarks/bench_limpeza.py --linhas 100000 --repeticoes 3 --saida limpeza.json
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from bench_data_reader import cronometrar
+from excel_utils import limpar_forma_vida_substrato
+
+COLUNAS = ["Forma de Vida", "Substrato"]
+
+# (forma de vida, substrato) como saem do scraper e de planilhas antigas
+CORPUS = [
+    ("Árvore", "Terrícola"),
+    ("Arbusto, Árvore, arbusto", "Terrícola, Rupícola, terrícola"),
+    ("Forma de Vida\nÁrvore", "Substrato\nTerrícola"),
+    ("", "Forma de Vida\nÁrvore\nSubstrato\nTerrícola"),
+    ("", "Árvore\nTerrícola\nRupícola"),
+    ("", "Erva, Subarbusto\nEpífita, Epífita"),
+    ("", "Desconhecida\nOutra\nTerrícola"),
+    ("", "Terrícola\nDesconhecida\nOutra"),
+    ("", "Desconhecida\nÁrvore\nOutra"),
+    ("  ", "Liana\n\n  \nTrepadeira, liana"),
+    (None, "Aquática"),
+    (float("nan"), "Herbácea"),
+    ("", "nan\nTerrícola"),
+    ("", "Forma de Vida\nSubstrato"),
+    (None, "Substrato"),
+    ("nan", "nan"),
+    ("NaN, Árvore, , ,", ", Terrícola,,"),
+    ("Forma de Vida, Substrato", "substrato, FORMA DE VIDA"),
+    ("Árvore Forma de Vida", "Terrícola Substrato"),
+    ("", ""),
+    (None, None),
+    ("Erva", None),
+    (None, "   "),
+    (", ,", "\n"),
+    ("", "Rupícola\nÁrvore, Arbusto\nEpifítica"),
+    ("Subarbusto ", " Epífita\nEpífita "),
+]
+
+
+def limpar_referencia(df):
+    """Implementação anterior (iterrows) de limpar_forma_vida_substrato"""
+
+    def clean_and_deduplicate(text):
+        """Remove duplicatas de uma string separada por vírgulas"""
+        if pd.isna(text) or not str(text).strip():
+            return ""
+
+        text = str(text)
+        # Separar por vírgula e remover duplicatas
+        items = []
+        seen = set()
+        for item in text.split(','):
+            item = item.strip()
+            item_lower = item.lower()
+            # Filtrar títulos e duplicatas
+            if (item and
+                item_lower not in seen and
+                item_lower not in ['forma de vida', 'substrato', 'nan'] and
+                item != 'nan'):
+                items.append(item)
+                seen.add(item_lower)
+
+        return ', '.join(items)
+
+    if "Forma de Vida" in df.columns and "Substrato" in df.columns:
+        for idx, row in df.iterrows():
+            forma_vida = str(row["Forma de Vida"]) if pd.notna(row["Forma de Vida"]) else ""
+            substrato = str(row["Substrato"]) if pd.notna(row["Substrato"]) else ""
+
+            # Se forma de vida está vazia e substrato tem dados que parecem ser de forma de vida
+            if not forma_vida.strip() and substrato.strip():
+                # Separar dados que podem estar misturados
+                linhas = [linha.strip() for linha in substrato.split('\n') if linha.strip()]
+
+                forma_temp = []
+                substrato_temp = []
+
+                # Palavras-chave para identificar forma de vida
+                palavras_forma = ['Arbusto', 'Árvore', 'Erva', 'Liana', 'Subarbusto', 'Trepadeira', 'Herbácea']
+                # Palavras-chave para identificar substrato
+                palavras_substrato = ['Terrícola', 'Rupícola', 'Epífita', 'Aquática', 'Epifítica']
+
+                for linha in linhas:
+                    # Pular linhas que são títulos
+                    if linha in ['Forma de Vida', 'Substrato']:
+                        continue
+
+                    # Verificar se a linha contém palavras de forma de vida
+                    if any(palavra in linha for palavra in palavras_forma):
+                        forma_temp.append(linha)
+                    # Verificar se a linha contém palavras de substrato
+                    elif any(palavra in linha for palavra in palavras_substrato):
+                        substrato_temp.append(linha)
+                    else:
+                        # Se não conseguir identificar, tentar pela posição
+                        # Geralmente forma de vida vem primeiro
+                        if not forma_temp and linha:
+                            forma_temp.append(linha)
+                        elif linha:
+                            substrato_temp.append(linha)
+
+                # Atualizar os valores removendo duplicatas
+                if forma_temp:
+                    df.at[idx, "Forma de Vida"] = clean_and_deduplicate(', '.join(forma_temp))
+                if substrato_temp:
+                    df.at[idx, "Substrato"] = clean_and_deduplicate(', '.join(substrato_temp))
+                elif not substrato_temp and forma_temp:
+                    # Se só temos dados de forma de vida, limpar substrato
+                    df.at[idx, "Substrato"] = ""
+            else:
+                # Limpar duplicatas mesmo quando os dados estão nas colunas corretas
+                df.at[idx, "Forma de Vida"] = clean_and_deduplicate(forma_vida)
+                df.at[idx, "Substrato"] = clean_and_deduplicate(substrato)
+
+    return df
+
+
+def limpar_e_ajustar_referencia(df):
+    """Limpeza completa de antes: a função e as passadas que salvar_planilha fazia depois dela"""
+    df = limpar_referencia(df)
+    for col in ["Substrato", "Forma de Vida"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+            df[col] = df[col].str.replace("Forma de Vida", "", regex=False)
+            df[col] = df[col].str.replace("Substrato", "", regex=False)
+            df[col] = df[col].str.strip()
+            df[col] = df[col].str.replace(r'^[,\s]*$', '', regex=True)
+    return df
+
+
+def planilha(linhas):
+    """DataFrame com o corpus repetido até `linhas` linhas"""
+    repeticoes = -(-linhas // len(CORPUS))
+    df = pd.DataFrame((CORPUS * repeticoes)[:linhas], columns=COLUNAS, dtype=object)
+    df.insert(0, "Nome Científico", [f"Especie {i}" for i in range(len(df))])
+    return df
+
+
+def divergencias(esperado, obtido):
+    saida = []
+    for col in COLUNAS:
+        ausentes = esperado[col].isna() & obtido[col].isna()
+        diferentes = ((esperado[col] != obtido[col]) & ~ausentes).to_numpy().nonzero()[0]
+        saida += [f"linha {i} {col}: {obtido[col].iloc[i]!r} != {esperado[col].iloc[i]!r}" for i in diferentes[:10]]
+    return saida
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da limpeza de forma de vida e substrato")
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    problemas = divergencias(limpar_e_ajustar_referencia(planilha(len(CORPUS))),
+                             limpar_forma_vida_substrato(planilha(len(CORPUS))))
+
+    df = planilha(args.linhas)
+    ref, esperado = cronometrar(lambda: limpar_e_ajustar_referencia(df.copy()), args.repeticoes)
+    nova, obtido = cronometrar(lambda: limpar_forma_vida_substrato(df.copy()), args.repeticoes)
+    problemas += divergencias(esperado, obtido)
+
+    ganho = ref["mediana_s"] / nova["mediana_s"] if nova["mediana_s"] else None
+    print(f"{args.linhas} linhas | referência {ref['mediana_s']:8.3f} s"
+          f" | vetorizada {nova['mediana_s']:8.3f} s | {ganho:6.1f}x")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "linhas": args.linhas, "referencia": ref,
+                       "vetorizada": nova, "ganho": ganho, "divergencias": problemas},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+    if problemas:
+        print("\nResultados divergentes:")
+        for problema in problemas:
+            print(f"  {problema}")
+        raise SystemExit(1)
+    print("\nAs duas implementações produziram as mesmas colunas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark da normalização de texto (remoção de acentos) do DataReader.
+
+Compara a implementação de referência (NFKD + filtro caractere a caractere)
+com normalizar_texto (tabela de str.translate), sem e com o cache por página,
+sobre as fixtures e sobre páginas grandes sintéticas (fixtures concatenadas).
+Confere também que os dois caminhos produzem exatamente o mesmo texto.
+
+Uso:
+    python benchmarks/bench_normalizacao.py
+    python benchmarks/bench_normalizacao.py --repeticoes 20 --multiplicador 50 --saida norm.json
+"""
+import argparse
+import json
+import os
+import sys
+import unicodedata
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from bench_data_reader import carregar_fixtures, cronometrar
+from data_reader import normalizar_texto
+
+
+def normalizar_referencia(texto):
+    """Implementação anterior de DataReader._normalizar_texto"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _sem_cache(texto):
+    return normalizar_texto.__wrapped__(texto)
+
+
+def paginas(multiplicador):
+    fixtures = carregar_fixtures()
+    saida = [(arquivo, html) for arquivo, _, html in fixtures]
+    corpus = "".join(html for _, _, html in fixtures)
+    saida.append((f"corpus x{multiplicador}", corpus * multiplicador))
+    return saida
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da normalização de texto")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--multiplicador", type=int, default=20,
+                        help="quantas vezes repetir o corpus na página sintética grande")
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for nome, texto in paginas(args.multiplicador):
+        if _sem_cache(texto) != normalizar_referencia(texto):
+            raise SystemExit(f"Resultado divergente em {nome}")
+
+        ref, _ = cronometrar(lambda: normalizar_referencia(texto), args.repeticoes)
+        nova, _ = cronometrar(lambda: _sem_cache(texto), args.repeticoes)
+        normalizar_texto(texto)
+        memo, _ = cronometrar(lambda: normalizar_texto(texto), args.repeticoes)
+
+        ganho = ref["mediana_s"] / nova["mediana_s"] if nova["mediana_s"] else None
+        resultados.append({
+            "pagina": nome,
+            "caracteres": len(texto),
+            "referencia": ref,
+            "translate": nova,
+            "translate_em_cache": memo,
+            "ganho": ganho,
+        })
+        print(f"{nome:<28} {len(texto):>10} chars | referência {ref['mediana_s'] * 1000:9.3f} ms"
+              f" | translate {nova['mediana_s'] * 1000:8.3f} ms"
+              f" | em cache {memo['mediana_s'] * 1e6:7.2f} µs | {ganho:6.1f}x")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "resultados": resultados},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
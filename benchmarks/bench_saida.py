@@ -0,0 +1,129 @@
+"""
+Benchmark dos formatos de saída (output_writers.py).
+
+Grava as mesmas linhas de resultado sintéticas em cada formato, pela
+interface incremental usada durante a busca, e mede o tempo de gravação, o
+tamanho do arquivo e o tempo de leitura de volta com o pandas. Confere
+também que todos os formatos devolvem as mesmas linhas.
+
+Uso:
+    python benchmarks/bench_saida.py
+    python benchmarks/bench_saida.py --linhas 100000 --formatos csv parquet sqlite --saida saida.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from output_writers import COLUNA_ABA, EXTENSOES_SAIDA, FORMATOS_SAIDA, TABELA_SQLITE, abrir_saida
+
+FAMILIAS = ["Meliaceae", "Fabaceae", "Myrtaceae", "Lauraceae", "Rubiaceae"]
+STATUS = ["Nome válido", "Nome válido", "Nome válido", "Nome desatualizado", "Nome inválido"]
+FORMAS = ["Árvore", "Arbusto", "Erva", "Liana", ""]
+
+
+def linhas_sinteticas(n):
+    """Linhas no formato de fetch_data, com os valores repetidos de uma busca real"""
+    for i in range(n):
+        yield {
+            "Nº": i + 1,
+            "Nome Científico": f"Genero{i % 997} especie{i}",
+            "Família": FAMILIAS[i % len(FAMILIAS)],
+            "Autor": "Vell.",
+            "Link Reflora": f"http://servicos.jbrj.gov.br/flora/search/Genero{i % 997}_especie{i}",
+            "Distribuição": "Estados: Bahia, Minas Gerais, São Paulo | Domínios: Cerrado, Mata Atlântica",
+            "Forma de Vida": FORMAS[i % len(FORMAS)],
+            "Substrato": "Terrícola",
+            "Origem": "Nativa",
+            "Endemismo": "Não endêmica" if i % 3 else "Endêmica do Brasil",
+            "Domínios Fitogeográficos": "Cerrado, Mata Atlântica",
+            "Tipos de Vegetação": "Floresta Estacional Semidecidual",
+            "Inconsistências": "" if i % 7 else "Sugerido: Outro nome",
+            "Status Nome": STATUS[i % len(STATUS)],
+        }
+
+
+def ler(formato, caminho):
+    """Resultados gravados, lidos de volta com o pandas (uma tabela com a coluna Aba)"""
+    if formato == "xlsx":
+        abas = pd.read_excel(caminho, sheet_name=None)
+        return pd.concat([df.assign(**{COLUNA_ABA: nome}) for nome, df in abas.items()], ignore_index=True)
+    if formato == "csv":
+        return pd.read_csv(caminho)
+    if formato == "parquet":
+        return pd.read_parquet(caminho)
+    with sqlite3.connect(caminho) as conexao:
+        return pd.read_sql(f'SELECT * FROM "{TABELA_SQLITE}"', conexao)
+
+
+def normalizar(df):
+    """Mesmas colunas e tipos em todos os formatos, para comparar os valores"""
+    df = df[sorted(df.columns)].astype(object)
+    return df.where(df.notna() & (df != ""), None).astype(str).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos formatos de saída")
+    parser.add_argument("--linhas", type=int, default=50000)
+    parser.add_argument("--formatos", nargs="+", choices=list(FORMATOS_SAIDA), default=list(FORMATOS_SAIDA))
+    parser.add_argument("--saida", default=None, help="arquivo JSON de resultados (opcional)")
+    args = parser.parse_args(argv)
+
+    linhas = list(linhas_sinteticas(args.linhas))
+    resultados = []
+    divergencias = []
+    referencia = None
+    with tempfile.TemporaryDirectory() as pasta:
+        for formato in args.formatos:
+            caminho = os.path.join(pasta, "resultados" + EXTENSOES_SAIDA[formato][0])
+            inicio = time.perf_counter()
+            with abrir_saida(caminho, formato) as saida:
+                aba = saida.aba("Resultados")
+                for linha in linhas:
+                    aba.escrever([linha])
+            gravacao = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            df = ler(formato, caminho)
+            leitura = time.perf_counter() - inicio
+
+            valores = normalizar(df)
+            if referencia is None:
+                referencia = valores
+            elif not valores.equals(referencia):
+                divergencias.append(f"{formato}: linhas diferentes das de {args.formatos[0]}")
+
+            tamanho = os.path.getsize(caminho)
+            resultados.append({"formato": formato, "gravacao_s": gravacao, "leitura_s": leitura,
+                               "bytes": tamanho})
+            print(f"{formato:<8} {args.linhas} linhas | gravação {gravacao:8.2f} s | leitura {leitura:7.2f} s"
+                  f" | {tamanho / 2 ** 20:7.2f} MiB")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "linhas": args.linhas, "resultados": resultados,
+                       "divergencias": divergencias}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+
+    if divergencias:
+        print("\nResultados divergentes:")
+        for divergencia in divergencias:
+            print(f"  {divergencia}")
+        raise SystemExit(1)
+    print("\nTodos os formatos devolveram as mesmas linhas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Teste de carga do scraper contra o simulador local do Reflora.
+
+Gera milhares de nomes sintéticos e busca todos com scraper.fetch_data em
+pipeline (fetch_workers = N Chromes baixando as páginas), com as URLs do
+Reflora redirecionadas para o simulador. Ao final relata vazão, latência do
+download de cada ficha (p50/p95/p99, já com as retentativas), taxa de erros,
+retentativas e a memória ao longo do tempo, para dimensionar número de
+workers e timeouts.
+
+Os erros são as linhas do resultado com Status Nome "Erro na verificação"
+(inclui os nomes que o simulador trata como fora da base) e as retentativas
+são as contadas pelo retry_with_backoff dos downloads do pipeline. Índice de
+nomes, sinônimos, progresso e histórico de estratégias ficam numa pasta
+temporária.
+
+Uso:
+    python benchmarks/loadtest.py --nomes 2000 --workers 4 --timeout 10 \\
+        --latencia lognormal:-2,0.7 --taxa-erro 0.02 --taxa-lenta 0.01 --saida loadtest.json
+
+Obs.: a memória medida é a do processo Python; os processos do Chrome e os
+de extração não entram na conta.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH_DIR)
+for caminho in (RAIZ, BENCH_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+import pandas as pd
+
+import cache_manager
+import data_reader
+import pipeline
+import scraper
+from mock_reflora import MockReflora, PREFIXO_AUSENTE, adicionar_argumentos, config_from_args
+
+
+def gerar_nomes(quantidade, fracao_ausente=0.0):
+    """Nomes sintéticos únicos no formato 'Genero especie'"""
+    nomes = []
+    for i in range(quantidade):
+        if fracao_ausente and (i % max(int(1 / fracao_ausente), 1)) == 0:
+            nomes.append(f"{PREFIXO_AUSENTE} sp{i}")
+        else:
+            nomes.append(f"Genero{i // 50} especie{i}")
+    return nomes
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    inferior = int(k)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (k - inferior)
+
+
+class AmostradorMemoria(threading.Thread):
+    """Registra a memória do processo em intervalos regulares"""
+
+    def __init__(self, intervalo=1.0):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.amostras = []
+        self.concluidos = 0
+        self._parar = threading.Event()
+        self._inicio = time.perf_counter()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.amostrar()
+
+    def amostrar(self):
+        atual, pico = tracemalloc.get_traced_memory()
+        amostra = {
+            "t_s": round(time.perf_counter() - self._inicio, 2),
+            "concluidos": self.concluidos,
+            "python_atual_mb": round(atual / 1e6, 2),
+            "python_pico_mb": round(pico / 1e6, 2),
+        }
+        if resource:
+            # ru_maxrss é em KB no Linux
+            amostra["rss_max_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 2)
+        self.amostras.append(amostra)
+
+    def parar(self):
+        self._parar.set()
+        self.amostrar()
+
+
+def _cronometrar_downloads(downloads, lock):
+    """
+    Troca pipeline._baixar_paginas (já com o retry_with_backoff) por uma versão
+    que registra a duração e a exceção final de cada download. Devolve a original.
+    """
+    original = pipeline._baixar_paginas
+
+    def baixar(driver_instance, name, *args, **kwargs):
+        inicio = time.perf_counter()
+        excecao = None
+        try:
+            return original(driver_instance, name, *args, **kwargs)
+        except Exception as e:
+            excecao = str(e)
+            raise
+        finally:
+            with lock:
+                downloads.append({"nome": name, "duracao_s": time.perf_counter() - inicio, "excecao": excecao})
+
+    pipeline._baixar_paginas = baixar
+    return original
+
+
+def rodar(nomes, workers, parse_workers=None, headless=True, timeout=20, intervalo_memoria=1.0):
+    downloads = []
+    lock = threading.Lock()
+    tracemalloc.start()
+    amostrador = AmostradorMemoria(intervalo_memoria)
+    amostrador.start()
+    scraper.performance_metrics.reset()
+
+    def progresso(processados, *_):
+        amostrador.concluidos = processados
+
+    original = _cronometrar_downloads(downloads, lock)
+    inicio = time.perf_counter()
+    try:
+        # Sem correção de grafia, checklist e sinônimos, todo nome passa pelo simulador
+        tabela = scraper.fetch_data(
+            pd.DataFrame({"Nome Científico": nomes}), callback=progresso, headless=headless,
+            fetch_workers=workers, parse_workers=parse_workers, name_correction="off",
+            use_checklist=False, resolve_synonyms=False, timeout=timeout
+        )
+    finally:
+        pipeline._baixar_paginas = original
+    duracao_total = time.perf_counter() - inicio
+
+    amostrador.parar()
+    tracemalloc.stop()
+    return tabela, downloads, duracao_total, amostrador.amostras
+
+
+def resumir(tabela, downloads, duracao_total):
+    latencias = [d["duracao_s"] for d in downloads]
+    especies = len(tabela)
+    erros = int((tabela["Status Nome"] == "Erro na verificação").sum())
+    stats_scraper = scraper.performance_metrics.get_stats()
+    return {
+        "especies": especies,
+        "duracao_total_s": round(duracao_total, 2),
+        "vazao_especies_por_s": round(especies / duracao_total, 3) if duracao_total else None,
+        "latencia_s": {
+            "media": statistics.mean(latencias) if latencias else None,
+            "p50": percentil(latencias, 50),
+            "p95": percentil(latencias, 95),
+            "p99": percentil(latencias, 99),
+            "max": max(latencias) if latencias else None,
+        },
+        "erros": erros,
+        "taxa_erro": erros / especies if especies else 0,
+        "excecoes": sum(1 for d in downloads if d["excecao"]),
+        "retentativas": scraper.performance_metrics.count("retry"),
+        "tempos_scraper": stats_scraper,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do scraper contra o simulador do Reflora")
+    parser.add_argument("--nomes", type=int, default=1000, help="quantidade de nomes sintéticos")
+    parser.add_argument("--workers", type=int, default=1, help="drivers Chrome em paralelo (fetch_workers)")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="processos de extração do pipeline (padrão: número de CPUs)")
+    parser.add_argument("--timeout", type=float, default=20, help="espera pelo carregamento de cada ficha (s)")
+    parser.add_argument("--fracao-nomes-ausentes", type=float, default=0.0,
+                        help="fração de nomes que o simulador trata como fora da base")
+    parser.add_argument("--intervalo-memoria", type=float, default=1.0)
+    parser.add_argument("--com-janela", action="store_true")
+    parser.add_argument("--manter-cache", action="store_true",
+                        help="usa o cache real em vez de um cache temporário isolado")
+    parser.add_argument("--saida", default="loadtest_results.json")
+    adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    nomes = gerar_nomes(args.nomes, args.fracao_nomes_ausentes)
+
+    saida = os.path.abspath(args.saida)
+    cache_original = cache_manager.CACHE_FILE
+    pasta = tempfile.mkdtemp(prefix="reflora_loadtest_")
+    if args.manter_cache:
+        cache_manager.CACHE_FILE = os.path.abspath(cache_original)
+    else:
+        cache_manager.CACHE_FILE = os.path.join(pasta, "cache.json")
+    # Os demais arquivos de estado do fetch_data são relativos ao diretório atual
+    diretorio_original = os.getcwd()
+    os.chdir(pasta)
+
+    try:
+        with MockReflora(config_from_args(args)) as servidor:
+            data_reader.set_base_url(servidor.base_url)
+            print(f"Simulador em {servidor.base_url} | {len(nomes)} nomes | {args.workers} workers")
+            tabela, downloads, duracao_total, memoria = rodar(
+                nomes, args.workers, parse_workers=args.parse_workers, headless=not args.com_janela,
+                timeout=args.timeout, intervalo_memoria=args.intervalo_memoria
+            )
+            stats_servidor = servidor.snapshot_stats()
+    finally:
+        data_reader.set_base_url(None)
+        cache_manager.CACHE_FILE = cache_original
+        os.chdir(diretorio_original)
+
+    resumo = resumir(tabela, downloads, duracao_total)
+    relatorio = {
+        "timestamp": datetime.now().isoformat(),
+        "parametros": vars(args),
+        "resumo": resumo,
+        "simulador": stats_servidor,
+        "memoria": memoria,
+    }
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    lat = resumo["latencia_s"]
+    print(f"\nVazão: {resumo['vazao_especies_por_s']} espécies/s em {resumo['duracao_total_s']}s")
+    if lat["p50"] is not None:
+        print(f"Latência do download: p50 {lat['p50']:.2f}s | p95 {lat['p95']:.2f}s | p99 {lat['p99']:.2f}s")
+    print(f"Erros (linhas com \"Erro na verificação\"): {resumo['erros']} ({resumo['taxa_erro']:.1%})"
+          f" | Retentativas de download: {resumo['retentativas']}")
+    print(f"Relatório salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
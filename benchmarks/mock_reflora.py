@@ -0,0 +1,219 @@
+"""
+Servidor local que simula o Reflora para testes de carga.
+
+Atende as rotas usadas pelo scraper:
+    /flora/search/<Genero_especie>   ficha da espécie
+    /consulta/?...&nomeCompleto=...  consulta pública (Origem/Endemismo)
+    /__stats                         contadores do próprio simulador (JSON)
+
+As páginas são geradas a partir das fixtures de benchmarks/fixtures, trocando
+o nome da espécie. Latência, erros HTTP, respostas lentas, páginas malformadas
+e espécies ausentes podem ser injetados por parâmetro.
+
+Uso isolado:
+    python benchmarks/mock_reflora.py --porta 8765 --latencia lognormal:-2.5,0.6 --taxa-erro 0.02
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+NOME_TEMPLATE = "Cedrela fissilis"
+PREFIXO_AUSENTE = "Inexistente"
+
+
+def _ler_fixture(nome):
+    with open(os.path.join(FIXTURES_DIR, nome), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_latencia(spec: str):
+    """
+    Converte uma especificação de latência em uma função que recebe um
+    random.Random e sorteia um atraso em segundos. Formatos aceitos:
+        fixa:0.1 | uniforme:0.05,0.3 | exponencial:0.1 | lognormal:mu,sigma
+    """
+    tipo, _, params = spec.partition(':')
+    valores = [float(v) for v in params.split(',') if v.strip()]
+    if tipo == "fixa":
+        return lambda rng: valores[0]
+    if tipo == "uniforme":
+        return lambda rng: rng.uniform(valores[0], valores[1])
+    if tipo == "exponencial":
+        return lambda rng: rng.expovariate(1.0 / valores[0])
+    if tipo == "lognormal":
+        return lambda rng: rng.lognormvariate(valores[0], valores[1])
+    raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+
+class MockConfig:
+    def __init__(self, latencia="fixa:0", taxa_erro=0.0, taxa_lenta=0.0, atraso_lento=15.0,
+                 taxa_malformada=0.0, taxa_ausente=0.0, semente=None):
+        self.latencia = parse_latencia(latencia)
+        self.taxa_erro = taxa_erro
+        self.taxa_lenta = taxa_lenta
+        self.atraso_lento = atraso_lento
+        self.taxa_malformada = taxa_malformada
+        self.taxa_ausente = taxa_ausente
+        self.random = random.Random(semente)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockReflora/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        servidor = self.server.mock
+        partes = urlsplit(self.path)
+
+        if partes.path == "/__stats":
+            self._responder(200, json.dumps(servidor.snapshot_stats()), "application/json")
+            return
+
+        if partes.path.startswith("/flora/search/"):
+            rota = "search"
+            nome = unquote(partes.path[len("/flora/search/"):]).replace('_', ' ')
+        elif partes.path.startswith("/consulta"):
+            rota = "consulta"
+            nome = parse_qs(partes.query).get("nomeCompleto", [""])[0]
+        else:
+            servidor.contar(rota="outra", resultado="404")
+            self._responder(404, "Não encontrado")
+            return
+
+        config = servidor.config
+        with servidor.lock:
+            sorteios = [config.random.random() for _ in range(4)]
+            atraso = config.latencia(config.random)
+            status_erro = config.random.choice([500, 502, 503])
+
+        if sorteios[0] < config.taxa_lenta:
+            atraso += config.atraso_lento
+            resultado = "lenta"
+        else:
+            resultado = "ok"
+        time.sleep(max(atraso, 0))
+
+        if sorteios[1] < config.taxa_erro:
+            servidor.contar(rota, "erro_http")
+            self._responder(status_erro, "Erro interno")
+            return
+
+        if nome.startswith(PREFIXO_AUSENTE) or sorteios[2] < config.taxa_ausente:
+            servidor.contar(rota, "ausente")
+            self._responder(200, servidor.pagina_ausente.replace("Cedrela fisilis", nome))
+            return
+
+        html = servidor.pagina_especie.replace(NOME_TEMPLATE, nome)
+        if sorteios[3] < config.taxa_malformada:
+            # Corta a página no meio e embaralha o fechamento das tags
+            html = html[:len(html) // 2].replace("</div>", "<div>")
+            resultado = "malformada"
+
+        servidor.contar(rota, resultado)
+        self._responder(200, html)
+
+    def _responder(self, status, corpo, content_type="text/html; charset=utf-8"):
+        dados = corpo.encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class MockReflora:
+    """Simulador do Reflora rodando em uma thread, utilizável como context manager"""
+
+    def __init__(self, config=None, host="127.0.0.1", porta=0):
+        self.config = config or MockConfig()
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.pagina_especie = _ler_fixture("nome_valido.html")
+        self.pagina_ausente = _ler_fixture("especie_ausente.html")
+
+        self.httpd = ThreadingHTTPServer((host, porta), _MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, porta = self.httpd.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def contar(self, rota, resultado):
+        with self.lock:
+            self.stats[f"{rota}.{resultado}"] += 1
+
+    def snapshot_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def adicionar_argumentos(parser):
+    """Argumentos de injeção de falhas, compartilhados com o loadtest"""
+    parser.add_argument("--latencia", default="fixa:0",
+                        help="fixa:S | uniforme:A,B | exponencial:MEDIA | lognormal:MU,SIGMA")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas HTTP 5xx")
+    parser.add_argument("--taxa-lenta", type=float, default=0.0, help="fração de respostas lentas")
+    parser.add_argument("--atraso-lento", type=float, default=15.0, help="atraso extra das respostas lentas (s)")
+    parser.add_argument("--taxa-malformada", type=float, default=0.0, help="fração de páginas truncadas")
+    parser.add_argument("--taxa-ausente", type=float, default=0.0, help="fração de espécies fora da base")
+    parser.add_argument("--semente", type=int, default=None)
+
+
+def config_from_args(args):
+    return MockConfig(
+        latencia=args.latencia,
+        taxa_erro=args.taxa_erro,
+        taxa_lenta=args.taxa_lenta,
+        atraso_lento=args.atraso_lento,
+        taxa_malformada=args.taxa_malformada,
+        taxa_ausente=args.taxa_ausente,
+        semente=args.semente,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador local do Reflora")
+    parser.add_argument("--porta", type=int, default=8765)
+    adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    with MockReflora(config_from_args(args), porta=args.porta) as servidor:
+        print(f"Simulador do Reflora em {servidor.base_url} (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
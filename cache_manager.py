@@ -2,11 +2,15 @@
 import json
 import os
 import hashlib
+import threading
 from datetime import datetime, timedelta
 
 CACHE_FILE = "reflora_cache.json"
 CACHE_EXPIRE_DAYS = 30
 
+# Serializa o ciclo ler-modificar-gravar quando há várias threads buscando
+_cache_lock = threading.Lock()
+
 def get_species_hash(nome_cientifico):
     return hashlib.md5(nome_cientifico.lower().encode()).hexdigest()
 
@@ -23,8 +27,7 @@ def save_cache(cache):
     with open(CACHE_FILE, 'w', encoding='utf-8') as f:
         json.dump(cache, f, ensure_ascii=False, indent=2)
 
-def check_cache(nome_cientifico):
-    cache = load_cache()
+def _dados_validos(cache, nome_cientifico):
     species_hash = get_species_hash(nome_cientifico)
     if species_hash in cache:
         cached_data = cache[species_hash]
@@ -33,11 +36,30 @@ def check_cache(nome_cientifico):
             return cached_data['data']
     return None
 
-def update_cache(nome_cientifico, data):
+def check_cache(nome_cientifico):
+    return _dados_validos(load_cache(), nome_cientifico)
+
+def check_cache_many(nomes):
+    """{nome: dados} dos nomes com dados válidos no cache, lendo o arquivo uma única vez"""
     cache = load_cache()
-    species_hash = get_species_hash(nome_cientifico)
-    cache[species_hash] = {
-        'data': data,
-        'cache_date': datetime.now().strftime('%Y-%m-%d')
-    }
-    save_cache(cache)
\ No newline at end of file
+    encontrados = {}
+    for nome in nomes:
+        dados = _dados_validos(cache, nome)
+        if dados:
+            encontrados[nome] = dados
+    return encontrados
+
+def update_cache(nome_cientifico, data):
+    update_cache_many({nome_cientifico: data})
+
+def update_cache_many(dados_por_nome):
+    """Grava vários resultados de uma vez (um único ciclo ler-modificar-gravar)"""
+    with _cache_lock:
+        cache = load_cache()
+        cache_date = datetime.now().strftime('%Y-%m-%d')
+        for nome_cientifico, data in dados_por_nome.items():
+            cache[get_species_hash(nome_cientifico)] = {
+                'data': data,
+                'cache_date': cache_date
+            }
+        save_cache(cache)
\ No newline at end of file
@@ -0,0 +1,492 @@
+# checklist.py
+"""
+Cópia local do checklist da Flora e Funga do Brasil.
+
+Importa um export do checklist (Darwin Core Archive do IPT, ou CSV) para um
+banco SQLite indexado pelo nome científico sem autor, e monta a partir dele
+resultados no mesmo formato de scraper.search_species. Importação e consulta
+não acessam a rede.
+
+No Darwin Core Archive são lidos o núcleo Taxon (nome, autor, família,
+status e nome aceito) e as extensões Distribution (estados, origem,
+endemismo e domínios fitogeográficos) e SpeciesProfile (forma de vida,
+substrato e tipos de vegetação). Um CSV pode usar os mesmos termos Darwin
+Core ou as colunas da planilha de resultados ("Nome Científico", "Família",
+...); os campos que o arquivo não traz continuam vindo do Reflora.
+"""
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from data_reader import DataReader, build_search_url, normalizar_texto
+
+CHECKLIST_DB = "checklist.db"
+LOTE_INSERCAO = 5000
+
+# Campos do resultado de search_species que o checklist pode preencher
+CAMPOS_CHECKLIST = (
+    "familia", "autor", "distribuicao_geografica", "dominios_fitogeograficos", "tipos_vegetacao",
+    "forma_vida", "substrato", "origem", "endemismo", "Status Nome",
+)
+
+# Colunas da tabela taxon e o campo do resultado que cada uma alimenta
+_COLUNAS = {
+    "familia": "familia",
+    "autor": "autor",
+    "status": "Status Nome",
+    "estados": "distribuicao_geografica",
+    "dominios": "dominios_fitogeograficos",
+    "tipos_vegetacao": "tipos_vegetacao",
+    "forma_vida": "forma_vida",
+    "substrato": "substrato",
+    "origem": "origem",
+    "endemismo": "endemismo",
+}
+_LISTAS = ("estados", "dominios", "tipos_vegetacao", "forma_vida", "substrato")
+
+# Colunas aceitas em um CSV (termos Darwin Core e colunas da planilha de resultados)
+_COLUNAS_CSV = {
+    "scientificName": "nome", "Nome Científico": "nome",
+    "scientificNameAuthorship": "autor", "Autor": "autor",
+    "family": "familia", "Família": "familia",
+    "taxonomicStatus": "status", "Status Nome": "status",
+    "acceptedNameUsage": "aceito",
+    "lifeForm": "forma_vida", "Forma de Vida": "forma_vida",
+    "habitat": "substrato", "Substrato": "substrato",
+    "vegetationType": "tipos_vegetacao", "Tipos de Vegetação": "tipos_vegetacao",
+    "phytogeographicDomain": "dominios", "Domínios Fitogeográficos": "dominios",
+    "establishmentMeans": "origem", "Origem": "origem",
+    "endemism": "endemismo", "Endemismo": "endemismo",
+    "locationID": "estados", "Estados": "estados",
+}
+
+_SIGLAS_ESTADOS = {variacoes[0]: estado for estado, variacoes in DataReader.ESTADOS_BR.items()}
+_ESTADOS_NORMALIZADOS = {normalizar_texto(estado): estado for estado in DataReader.ESTADOS_BR}
+
+
+def chave_nome(nome: str) -> str:
+    """Nome normalizado usado como chave de busca (sem acentos, minúsculo, espaços simples)"""
+    return " ".join(normalizar_texto(nome).split())
+
+
+def _termo(uri: str) -> str:
+    return uri.rstrip("/").rsplit("/", 1)[-1].rsplit("#", 1)[-1]
+
+
+def _lista(valor) -> List[str]:
+    """Lista a partir de um valor JSON, de uma lista ou de texto separado por vírgulas/pipes"""
+    if not valor:
+        return []
+    if isinstance(valor, list):
+        return [str(v).strip() for v in valor if str(v).strip()]
+    valor = valor.strip()
+    if valor.startswith("["):
+        try:
+            return _lista(json.loads(valor))
+        except ValueError:
+            pass
+    return [v.strip() for v in valor.replace("|", ",").split(",") if v.strip()]
+
+
+def _sem_autor(nome: str, autor: str) -> str:
+    nome = " ".join(nome.split())
+    autor = " ".join((autor or "").split())
+    if autor and nome.endswith(autor):
+        nome = nome[:-len(autor)].strip()
+    return nome
+
+
+def _status(valor: str) -> str:
+    """Status do checklist no vocabulário de DataReader.read_status_nome"""
+    valor = normalizar_texto(valor or "")
+    if "sinon" in valor or "synonym" in valor or "desatualizado" in valor:
+        return "Nome desatualizado"
+    if "aceito" in valor or "accepted" in valor or "valido" in valor:
+        return "Nome válido"
+    return ""
+
+
+def _origem(valor: str) -> str:
+    valor = (valor or "").strip()
+    return valor[:1].upper() + valor[1:].lower() if valor else ""
+
+
+def _endemismo(valor: str) -> str:
+    normalizado = normalizar_texto(valor or "")
+    if not normalizado:
+        return ""
+    if normalizado.startswith("nao"):
+        return "Não endêmica"
+    if normalizado.startswith("endemic"):
+        return "Endêmica"
+    return valor.strip()
+
+
+def _estado(valor: str) -> Optional[str]:
+    """Nome do estado a partir de 'BR-SP', 'SP' ou do nome"""
+    valor = valor.strip()
+    sigla = valor.split("-")[-1].upper()
+    if sigla in _SIGLAS_ESTADOS:
+        return _SIGLAS_ESTADOS[sigla]
+    return _ESTADOS_NORMALIZADOS.get(normalizar_texto(valor))
+
+
+def _decodificar(separador: str) -> str:
+    return separador.encode("utf-8").decode("unicode_escape") if separador else separador
+
+
+class _TabelaDwca:
+    """Arquivo de dados de um Darwin Core Archive, descrito por um elemento do meta.xml"""
+
+    def __init__(self, zf, elemento=None, arquivo=None):
+        self.zf = zf
+        if elemento is None:
+            # Sem meta.xml: arquivo com cabeçalho, separado por tabulação
+            self.arquivo = arquivo
+            self.separador, self.aspas, self.cabecalho, self.encoding = "\t", "", 1, "utf-8"
+            self.campos, self.indice_id, self.padroes = None, 0, {}
+            return
+        ns = {"dwc": "http://rs.tdwg.org/dwc/text/"}
+        self.arquivo = elemento.find("dwc:files/dwc:location", ns).text.strip()
+        self.separador = _decodificar(elemento.get("fieldsTerminatedBy", "\\t"))
+        self.aspas = _decodificar(elemento.get("fieldsEnclosedBy", ""))
+        self.cabecalho = int(elemento.get("ignoreHeaderLines", "0"))
+        self.encoding = elemento.get("encoding", "utf-8")
+        id_el = elemento.find("dwc:id", ns)
+        if id_el is None:
+            id_el = elemento.find("dwc:coreid", ns)
+        self.indice_id = int(id_el.get("index")) if id_el is not None else 0
+        self.campos, self.padroes = {}, {}
+        for campo in elemento.findall("dwc:field", ns):
+            termo = _termo(campo.get("term", ""))
+            if campo.get("index") is not None:
+                self.campos[int(campo.get("index"))] = termo
+            elif campo.get("default") is not None:
+                self.padroes[termo] = campo.get("default")
+
+    def linhas(self) -> Iterable[Dict[str, str]]:
+        with self.zf.open(self.arquivo) as bruto:
+            texto = io.TextIOWrapper(bruto, encoding=self.encoding, newline="")
+            leitor = csv.reader(texto, delimiter=self.separador, quotechar=self.aspas or None,
+                                quoting=csv.QUOTE_MINIMAL if self.aspas else csv.QUOTE_NONE)
+            campos = self.campos
+            for numero, valores in enumerate(leitor):
+                if numero < self.cabecalho:
+                    if campos is None:
+                        campos = {i: _termo(nome) for i, nome in enumerate(valores)}
+                    continue
+                linha = dict(self.padroes)
+                for indice, termo in campos.items():
+                    if indice < len(valores) and valores[indice] != "":
+                        linha[termo] = valores[indice]
+                linha["_id"] = valores[self.indice_id] if self.indice_id < len(valores) else ""
+                yield linha
+
+
+class Checklist:
+    """
+    Banco SQLite com o checklist importado. Seguro para várias threads (uma
+    única conexão protegida por lock).
+    """
+
+    def __init__(self, caminho=CHECKLIST_DB):
+        self.caminho = caminho
+        self._conexao = None
+        self._campos = None
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.executescript("""
+                CREATE TABLE IF NOT EXISTS taxon (
+                    taxon_id TEXT, chave TEXT, nome TEXT, autor TEXT, familia TEXT, status TEXT,
+                    aceito_id TEXT, aceito TEXT, estados TEXT, dominios TEXT, tipos_vegetacao TEXT,
+                    forma_vida TEXT, substrato TEXT, origem TEXT, endemismo TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_taxon_chave ON taxon (chave);
+                CREATE INDEX IF NOT EXISTS idx_taxon_id ON taxon (taxon_id);
+                CREATE TABLE IF NOT EXISTS info (chave TEXT PRIMARY KEY, valor TEXT);
+            """)
+        return self._conexao
+
+    @property
+    def disponivel(self) -> bool:
+        """Se há um checklist importado"""
+        if not os.path.exists(self.caminho):
+            return False
+        return bool(self.campos())
+
+    def campos(self) -> set:
+        """Campos do resultado que o checklist importado preenche"""
+        if self._campos is None:
+            with self._lock:
+                linha = self._conectar().execute("SELECT valor FROM info WHERE chave = 'campos'").fetchone()
+            self._campos = set(json.loads(linha[0])) if linha else set()
+        return self._campos
+
+    def info(self) -> dict:
+        with self._lock:
+            return dict(self._conectar().execute("SELECT chave, valor FROM info").fetchall())
+
+    def __len__(self):
+        with self._lock:
+            return self._conectar().execute("SELECT COUNT(*) FROM taxon").fetchone()[0]
+
+    # ----- Importação -----
+
+    def importar(self, caminho: str) -> int:
+        """Substitui o conteúdo do banco pelo checklist em `caminho` (.zip DwC-A ou CSV)"""
+        if zipfile.is_zipfile(caminho):
+            registros, campos = self._ler_dwca(caminho)
+        else:
+            registros, campos = self._ler_csv(caminho)
+
+        total = 0
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute("DELETE FROM taxon")
+                conexao.execute("DELETE FROM info")
+                lote = []
+                for registro in registros:
+                    lote.append(self._linha_banco(registro))
+                    if len(lote) >= LOTE_INSERCAO:
+                        total += self._inserir(conexao, lote)
+                        lote = []
+                total += self._inserir(conexao, lote)
+                # Nome aceito dos sinônimos que só trazem o ID do aceito
+                conexao.execute("""
+                    UPDATE taxon SET aceito = (
+                        SELECT a.nome FROM taxon a WHERE a.taxon_id = taxon.aceito_id LIMIT 1
+                    ) WHERE (aceito IS NULL OR aceito = '') AND aceito_id IS NOT NULL AND aceito_id != ''
+                """)
+                conexao.executemany("INSERT INTO info (chave, valor) VALUES (?, ?)", [
+                    ("arquivo", os.path.abspath(caminho)),
+                    ("importado_em", datetime.now().isoformat()),
+                    ("campos", json.dumps(sorted(campos))),
+                ])
+            self._campos = None
+        return total
+
+    @staticmethod
+    def _inserir(conexao, lote) -> int:
+        conexao.executemany(
+            "INSERT INTO taxon (taxon_id, chave, nome, autor, familia, status, aceito_id, aceito, estados, "
+            "dominios, tipos_vegetacao, forma_vida, substrato, origem, endemismo) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", lote
+        )
+        return len(lote)
+
+    @staticmethod
+    def _linha_banco(registro: dict) -> tuple:
+        nome = _sem_autor(registro.get("nome", ""), registro.get("autor", ""))
+        aceito = registro.get("aceito") or ""
+        if aceito:
+            aceito = _sem_autor(aceito, registro.get("aceito_autor", ""))
+        return (
+            registro.get("taxon_id", ""), chave_nome(nome), nome, registro.get("autor", "").strip(),
+            registro.get("familia", "").strip(), _status(registro.get("status", "")),
+            registro.get("aceito_id", ""), aceito,
+            *(json.dumps(registro.get(coluna, []), ensure_ascii=False)
+              for coluna in ("estados", "dominios", "tipos_vegetacao", "forma_vida", "substrato")),
+            _origem(registro.get("origem", "")), _endemismo(registro.get("endemismo", "")),
+        )
+
+    def _ler_dwca(self, caminho):
+        zf = zipfile.ZipFile(caminho)
+        nomes = set(zf.namelist())
+        ns = {"dwc": "http://rs.tdwg.org/dwc/text/"}
+        nucleo, extensoes = None, {}
+        if "meta.xml" in nomes:
+            raiz = ET.fromstring(zf.read("meta.xml"))
+            core = raiz.find("dwc:core", ns)
+            nucleo = _TabelaDwca(zf, core)
+            for ext in raiz.findall("dwc:extension", ns):
+                extensoes[_termo(ext.get("rowType", ""))] = _TabelaDwca(zf, ext)
+        else:
+            nucleo = _TabelaDwca(zf, arquivo="taxon.txt")
+            for tipo, arquivo in (("Distribution", "distribution.txt"), ("SpeciesProfile", "speciesprofile.txt")):
+                if arquivo in nomes:
+                    extensoes[tipo] = _TabelaDwca(zf, arquivo=arquivo)
+
+        campos = {"familia", "autor", "Status Nome"}
+        distribuicao = defaultdict(lambda: {"estados": [], "dominios": [], "origem": "", "endemismo": ""})
+        if "Distribution" in extensoes:
+            campos |= {"distribuicao_geografica", "dominios_fitogeograficos", "origem", "endemismo"}
+            for linha in extensoes["Distribution"].linhas():
+                dados = distribuicao[linha["_id"]]
+                estado = _estado(linha.get("locationID", ""))
+                if estado and estado not in dados["estados"]:
+                    dados["estados"].append(estado)
+                dados["origem"] = dados["origem"] or linha.get("establishmentMeans", "")
+                observacoes = linha.get("occurrenceRemarks", "")
+                try:
+                    observacoes = json.loads(observacoes) if observacoes else {}
+                except ValueError:
+                    observacoes = {}
+                if isinstance(observacoes, dict):
+                    dados["endemismo"] = dados["endemismo"] or observacoes.get("endemism", "")
+                    for dominio in _lista(observacoes.get("phytogeographicDomain")):
+                        if dominio not in dados["dominios"]:
+                            dados["dominios"].append(dominio)
+
+        perfil = {}
+        if "SpeciesProfile" in extensoes:
+            campos |= {"forma_vida", "substrato", "tipos_vegetacao"}
+            for linha in extensoes["SpeciesProfile"].linhas():
+                forma = linha.get("lifeForm", "")
+                try:
+                    dados = json.loads(forma) if forma.strip().startswith("{") else {}
+                except ValueError:
+                    dados = {}
+                perfil[linha["_id"]] = {
+                    "forma_vida": _lista(dados.get("lifeForm") if dados else forma),
+                    "substrato": _lista(dados.get("habitat") if dados else linha.get("habitat", "")),
+                    "tipos_vegetacao": _lista(dados.get("vegetationType") if dados else ""),
+                }
+
+        def registros():
+            try:
+                for linha in nucleo.linhas():
+                    taxon_id = linha["_id"]
+                    registro = {
+                        "taxon_id": linha.get("taxonID", taxon_id),
+                        "nome": linha.get("scientificName", ""),
+                        "autor": linha.get("scientificNameAuthorship", ""),
+                        "familia": linha.get("family", ""),
+                        "status": linha.get("taxonomicStatus", ""),
+                        "aceito": linha.get("acceptedNameUsage", ""),
+                        "aceito_id": linha.get("acceptedNameUsageID", ""),
+                    }
+                    if registro["aceito_id"] == registro["taxon_id"]:
+                        registro["aceito_id"] = registro["aceito"] = ""
+                    registro.update(distribuicao.get(taxon_id, {}))
+                    registro.update(perfil.get(taxon_id, {}))
+                    if len(registro["nome"].split()) >= 2:
+                        yield registro
+            finally:
+                zf.close()
+
+        return registros(), campos
+
+    def _ler_csv(self, caminho):
+        with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+            amostra = f.read(64 * 1024)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra.splitlines()[0] if amostra else "", delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+
+        with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+            colunas = next(csv.reader(f, dialeto), [])
+        mapeadas = {coluna: _COLUNAS_CSV[coluna] for coluna in colunas if coluna in _COLUNAS_CSV}
+        if "nome" not in mapeadas.values():
+            raise ValueError("O CSV precisa de uma coluna 'scientificName' ou 'Nome Científico'")
+        campos = {_COLUNAS[c] for c in mapeadas.values() if c in _COLUNAS}
+
+        def registros():
+            with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+                for linha in csv.DictReader(f, dialect=dialeto):
+                    registro = {}
+                    for coluna, destino in mapeadas.items():
+                        valor = linha.get(coluna) or ""
+                        if destino == "estados":
+                            valor = [e for e in (_estado(v) for v in _lista(valor)) if e]
+                        elif destino in _LISTAS:
+                            valor = _lista(valor)
+                        registro[destino] = valor
+                    if len(registro.get("nome", "").split()) >= 2:
+                        yield registro
+
+        return registros(), campos
+
+    # ----- Consulta -----
+
+    def _buscar(self, coluna: str, valor: str) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conectar().execute(
+                f"SELECT * FROM taxon WHERE {coluna} = ? "
+                "ORDER BY CASE status WHEN 'Nome válido' THEN 0 WHEN '' THEN 1 ELSE 2 END LIMIT 1",
+                (valor,)
+            )
+            linha = cursor.fetchone()
+            if linha is None:
+                return None
+            return dict(zip((d[0] for d in cursor.description), linha))
+
+    def buscar(self, nome: str) -> Optional[dict]:
+        """Registro do checklist para `nome` (sem autor), com as listas já decodificadas"""
+        if not os.path.exists(self.caminho):
+            return None
+        registro = self._buscar("chave", chave_nome(nome))
+        if registro is not None:
+            for coluna in _LISTAS:
+                registro[coluna] = json.loads(registro[coluna] or "[]")
+        return registro
+
+    def resultado(self, nome: str) -> Optional[dict]:
+        """
+        Resultado no formato de search_species montado só com o checklist,
+        ou None se o nome não está nele. Os dados de um sinônimo (forma de
+        vida, distribuição...) são os do nome aceito.
+        """
+        registro = self.buscar(nome)
+        if registro is None or not registro["familia"]:
+            return None
+
+        status_nome, inconsistencia = registro["status"] or "Nome válido", ""
+        dados = registro
+        if status_nome == "Nome desatualizado":
+            inconsistencia = f"Sugerido: {registro['aceito']}" if registro["aceito"] else ""
+            aceito = self.buscar(registro["aceito"]) if registro["aceito"] else None
+            if aceito is not None:
+                dados = aceito
+            inconsistencia += " | Nome científico desatualizado"
+
+        # Como na página, formações citadas nos tipos de vegetação (Restinga...) contam como domínios citados
+        _, dominios_citados = DataReader._buscar_estados_e_dominios(
+            ", ".join(dados["dominios"] + dados["tipos_vegetacao"])
+        )
+        secao = {
+            "regioes": [],
+            "estados": sorted(dados["estados"]),
+            "dominios": [d for d in dados["dominios"] if d in DataReader.DOMINIOS_VALIDOS],
+            "tipos_vegetacao": list(dados["tipos_vegetacao"]),
+            "dominios_citados": dominios_citados,
+            "completa": True,
+        }
+        fitogeo = DataReader.formatar_fitogeografia(secao)
+        result = {
+            "familia": registro["familia"],
+            "autor": registro["autor"],
+            "reflora_link": build_search_url(nome, canonical=True),
+            "distribuicao_geografica": DataReader.formatar_distribuicao(secao),
+            "dominios_fitogeograficos": fitogeo["dominios_fitogeograficos"],
+            "tipos_vegetacao": fitogeo["tipos_vegetacao"],
+            "secao_distribuicao": secao,
+            "forma_vida": ", ".join(dados["forma_vida"]),
+            "substrato": ", ".join(dados["substrato"]),
+            "origem": dados["origem"] or "Não encontrado",
+            "endemismo": dados["endemismo"] or "Não encontrado",
+            "inconsistencia": inconsistencia,
+            "Status Nome": status_nome,
+            "fonte": "checklist",
+        }
+        if not result["autor"]:
+            result["inconsistencia"] += " | Autor não encontrado"
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
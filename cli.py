@@ -0,0 +1,221 @@
+"""
+Interface de linha de comando do Buscador Reflora (sem janela).
+
+Exemplos:
+    python cli.py planilha.xlsx --saida resultados.xlsx
+    python cli.py planilha.xlsx --abas "Parcela 1" "Parcela 2" --saida resultados.xlsx
+    python cli.py --nomes "Cedrela fissilis" "Paubrasilia echinata" --saida consulta.xlsx
+    python cli.py planilha.xlsx --saida resultados.xlsx --profile
+    python cli.py planilha.xlsx --saida r.xlsx --gravar paginas.zip
+    python cli.py planilha.xlsx --saida r.xlsx --reproduzir paginas.zip
+    python cli.py planilha.xlsx --saida resultados.parquet
+    python cli.py planilha.xlsx --saida resultados.db --formato sqlite
+    python cli.py parcelas.xlsx --abas "Parcela 1" --enriquecer --saida parcelas_reflora.xlsx
+    python cli.py checklist.csv --coluna-nomes scientificName --saida resultados.parquet
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+import pandas as pd
+
+from data_reader import DataReader
+from enriquecimento import enriquecer_planilha
+from excel_utils import COLUNA_NOMES, EXTENSOES_CSV, EXTENSOES_PARQUET, iter_blocos_nomes, listar_abas
+from output_writers import FORMATOS_SAIDA, abrir_saida, formato_saida
+from profiling import ProfilingSession
+from replay import PageArchive
+from checklist import CAMPOS_CHECKLIST
+from scraper import (
+    ALL_FIELDS, DEFAULT_EXTRACTION_MODE, DEFAULT_NAME_CORRECTION, EXTRACTION_MODES, NAME_CORRECTION_MODES,
+    fetch_data, local_checklist, name_index
+)
+
+
+def _progresso(current, total, name, elapsed, remaining):
+    print(f"[{current}/{total}] {name} | decorrido: {elapsed:.1f}s | estimado: {remaining:.1f}s")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Coleta dados taxonômicos do Reflora a partir de uma planilha ou de nomes avulsos"
+    )
+    parser.add_argument("planilha", nargs="?",
+                        help="planilha (.xlsx, .xls, .ods), CSV ou Parquet com a coluna de nomes; "
+                             "é lida em blocos, sem carregar o arquivo inteiro")
+    parser.add_argument("--abas", nargs="+", help="abas a processar (padrão: todas)")
+    parser.add_argument("--coluna-nomes", default=COLUNA_NOMES, metavar="COLUNA",
+                        help=f"coluna com os nomes científicos (padrão: '{COLUNA_NOMES}')")
+    parser.add_argument("--nomes", nargs="+", help="nomes científicos avulsos, em vez de planilha")
+    parser.add_argument("--saida", required=True,
+                        help="arquivo de resultados (.xlsx, .csv, .parquet ou .sqlite/.db)")
+    parser.add_argument("--formato", choices=list(FORMATOS_SAIDA),
+                        help="formato da saída (padrão: pela extensão de --saida; xlsx se não for conhecida)")
+    parser.add_argument("--enriquecer", action="store_true",
+                        help="grava em --saida (.xlsx) uma cópia da planilha com todas as abas e colunas "
+                             "originais e os resultados ao lado de cada nome das abas processadas")
+    parser.add_argument("--com-janela", action="store_true", help="abre o Chrome visível")
+    parser.add_argument("--modo-extracao", choices=EXTRACTION_MODES, default=DEFAULT_EXTRACTION_MODE,
+                        help="snapshot: lê o DOM em memória; batched: um único execute_script por página; "
+                             "live: consulta o navegador campo a campo")
+    parser.add_argument("--campos", nargs="+", choices=ALL_FIELDS, default=ALL_FIELDS, metavar="CAMPO",
+                        help="busca só estes campos, pulando as páginas e leituras que eles não usam "
+                             f"(padrão: todos; {', '.join(ALL_FIELDS)})")
+    parser.add_argument("--ordem-fixa", action="store_true",
+                        help="não reordena as estratégias de forma de vida/substrato pelo histórico")
+    parser.add_argument("--telemetria", action="store_true",
+                        help="grava ao lado da saída o relatório de seletores e fallbacks (.telemetria.json)")
+
+    nomes = parser.add_argument_group("correção de nomes")
+    nomes.add_argument("--correcao-nomes", choices=NAME_CORRECTION_MODES, default=DEFAULT_NAME_CORRECTION,
+                       help="para nomes com grafia parecida com a de um nome já conhecido: suggest busca "
+                            "o nome e sugere a correção nas Inconsistências; skip não busca o nome e sugere "
+                            "a correção; apply busca o nome corrigido; off não confere a grafia")
+    nomes.add_argument("--importar-nomes", metavar="ARQUIVO",
+                       help="adiciona ao índice de nomes um checklist (um nome por linha, ou CSV com a "
+                            "coluna 'Nome Científico' ou 'scientificName')")
+
+    checklist = parser.add_argument_group("checklist local")
+    checklist.add_argument("--importar-checklist", metavar="ARQUIVO",
+                           help="importa um export do checklist da Flora e Funga do Brasil "
+                                "(Darwin Core Archive .zip ou CSV) para o banco local")
+    checklist.add_argument("--sem-checklist", action="store_true",
+                           help="busca todos os nomes no Reflora, mesmo os que estão no checklist local")
+    checklist.add_argument("--ao-vivo", nargs="+", choices=CAMPOS_CHECKLIST, default=(), metavar="CAMPO",
+                           help="campos que precisam vir do Reflora; com algum deles o checklist local "
+                                f"não é usado ({', '.join(CAMPOS_CHECKLIST)})")
+    checklist.add_argument("--sem-sinonimos", action="store_true",
+                           help="busca também os nomes que o grafo local já conhece como sinônimos, "
+                                "em vez de buscar só o nome aceito")
+
+    pipeline = parser.add_argument_group("pipeline")
+    pipeline.add_argument("--pipeline", type=int, default=0, metavar="N",
+                          help="baixa as páginas com N Chromes em paralelo e extrai em outros processos "
+                               "(requer --modo-extracao snapshot)")
+    pipeline.add_argument("--processos", type=int, default=None, metavar="M",
+                          help="processos de extração do pipeline (padrão: número de CPUs)")
+
+    pipeline.add_argument("--por-genero", type=int, default=0, metavar="N",
+                          help="gêneros com pelo menos N nomes ainda fora do cache são buscados de uma vez "
+                               "pela consulta do gênero, que grava no cache todos os táxons listados")
+
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument("--profile", action="store_true",
+                           help="gera .prof, diffs de alocação e pilhas collapsed ao lado da saída")
+    profiling.add_argument("--profile-intervalo", type=int, default=50,
+                           help="snapshot do tracemalloc a cada N espécies")
+    profiling.add_argument("--sem-amostrador", action="store_true",
+                           help="desativa o amostrador de pilha (sem arquivo collapsed)")
+
+    replay = parser.add_argument_group("gravação e replay")
+    modo = replay.add_mutually_exclusive_group()
+    modo.add_argument("--gravar", metavar="ARQUIVO.zip",
+                      help="grava cada página carregada (URL, DOM final e tempos)")
+    modo.add_argument("--reproduzir", metavar="ARQUIVO.zip",
+                      help="reproduz um arquivo gravado, sem acesso à rede")
+    return parser
+
+
+def _carregar_entrada(args, parser):
+    if args.nomes:
+        return {"Consulta Manual": pd.DataFrame({args.coluna_nomes: args.nomes})}
+    if not args.planilha:
+        parser.error("informe uma planilha ou use --nomes")
+
+    disponiveis = listar_abas(args.planilha)
+    abas = args.abas or disponiveis
+    faltando = [aba for aba in abas if aba not in disponiveis]
+    if faltando:
+        parser.error(f"abas não encontradas: {', '.join(faltando)}")
+    if args.enriquecer:
+        # A planilha inteira é lida pelo enriquecimento
+        return dict.fromkeys(abas)
+    # Blocos lidos sob demanda pelo fetch_data, aba por aba
+    return {aba: iter_blocos_nomes(args.planilha, aba, args.coluna_nomes) for aba in abas}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.pipeline and args.modo_extracao != "snapshot":
+        parser.error("--pipeline só funciona com --modo-extracao snapshot")
+    if args.enriquecer and (args.nomes or (args.formato or formato_saida(args.saida)) != "xlsx"):
+        parser.error("--enriquecer requer uma planilha de entrada e saída .xlsx")
+    extensao = os.path.splitext(args.planilha or "")[1].lower()
+    if args.enriquecer and extensao in EXTENSOES_CSV + EXTENSOES_PARQUET:
+        parser.error("--enriquecer requer uma planilha de entrada (.xlsx, .xls ou .ods)")
+    entradas = _carregar_entrada(args, parser)
+    if args.ordem_fixa:
+        DataReader.ESTATISTICAS_FORMA_SUBSTRATO.adaptativo = False
+    DataReader.TELEMETRIA.reset()
+    if args.importar_checklist:
+        total = local_checklist.importar(args.importar_checklist)
+        print(f"{total} nomes importados para o checklist local ({local_checklist.caminho})")
+    if args.importar_nomes:
+        name_index.carregar()
+        novos = name_index.importar(args.importar_nomes)
+        name_index.salvar()
+        print(f"{novos} nomes importados para o índice ({len(name_index)} no total)")
+
+    profiler = None
+    if args.profile:
+        profiler = ProfilingSession(
+            intervalo_snapshot=args.profile_intervalo,
+            amostrador=not args.sem_amostrador
+        )
+
+    recorder = PageArchive(args.gravar, "w") if args.gravar else None
+    replay = PageArchive(args.reproduzir, "r") if args.reproduzir else None
+
+    opcoes_busca = dict(
+        callback=_progresso,
+        headless=not args.com_janela,
+        profiler=profiler,
+        recorder=recorder,
+        replay=replay,
+        extraction_mode=args.modo_extracao,
+        fetch_workers=args.pipeline,
+        parse_workers=args.processos,
+        name_correction=args.correcao_nomes,
+        use_checklist=not args.sem_checklist,
+        live_fields=args.ao_vivo,
+        resolve_synonyms=not args.sem_sinonimos,
+        genus_bulk=args.por_genero,
+        fields=args.campos
+    )
+    try:
+        if args.enriquecer:
+            print(f"Enriquecendo as abas {', '.join(entradas)}...")
+            enriquecer_planilha(args.planilha, list(entradas), args.saida, coluna=args.coluna_nomes,
+                                **opcoes_busca)
+        else:
+            # Os resultados vão para a saída durante a busca (parciais ficam nela mesmo se a busca falhar)
+            with abrir_saida(args.saida, args.formato) as saida:
+                for aba, df in entradas.items():
+                    print(f"Processando aba '{aba}'...")
+                    fetch_data(df, writer=saida.aba(aba), name_column=args.coluna_nomes, **opcoes_busca)
+    finally:
+        for archive in (recorder, replay):
+            if archive is not None:
+                archive.close()
+        if recorder is not None:
+            print(f"{len(recorder)} páginas gravadas em {args.gravar}")
+
+    output_path = args.saida
+    print(f"Resultados salvos em: {output_path}")
+
+    print(DataReader.TELEMETRIA.resumo_texto())
+    if args.telemetria:
+        caminho = DataReader.TELEMETRIA.salvar(os.path.splitext(output_path)[0] + ".telemetria.json")
+        print(f"Relatório de telemetria salvo em: {caminho}")
+
+    if profiler:
+        arquivos = profiler.save(os.path.splitext(output_path)[0])
+        print("Arquivos de profiling: " + ", ".join(arquivos))
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -6,12 +6,143 @@ from selenium.webdriver.support import expected_conditions as EC
 from typing import Tuple, List, Dict, Optional
 import re
 import unicodedata
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 import time
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from html_parser import BackendBeautifulSoup, PARSER_BS4, escolher_backend
+from strategy_stats import EstatisticasEstrategias
+from telemetry import TelemetriaSeletores
 from selenium.webdriver.common.by import By
 
 
+# Endereços do Reflora. Podem ser redirecionados para um servidor local
+# (simulador para testes de carga, por exemplo) com set_base_url()
+REFLORA_SEARCH_BASE = "http://servicos.jbrj.gov.br"
+REFLORA_CONSULTA_BASE = "https://reflora.jbrj.gov.br"
+
+_base_url_override = None
+
+
+def set_base_url(base_url: Optional[str] = None):
+    """Redireciona as buscas e consultas para `base_url` (None restaura o Reflora)"""
+    global _base_url_override
+    _base_url_override = base_url.rstrip('/') if base_url else None
+
+
+def build_search_url(nome: str, canonical: bool = False) -> str:
+    """URL da ficha da espécie; `canonical` ignora o redirecionamento"""
+    base = REFLORA_SEARCH_BASE if canonical else (_base_url_override or REFLORA_SEARCH_BASE)
+    return f"{base}/flora/search/{nome.replace(' ', '_')}"
+
+
+def build_consulta_url(nome: str) -> str:
+    """URL da consulta pública filtrada pelo nome completo"""
+    base = _base_url_override or REFLORA_CONSULTA_BASE
+    nome_url = quote_plus(nome)
+    return f"{base}/consulta/?grupo=6&familia=null&genero=&especie=&autor=&nomeVernaculo=&nomeCompleto={nome_url}&formaVida=null&substrato=null&ocorreBrasil=QUALQUER&ocorrencia=OCORRE&endemismo=TODOS&origem=TODOS&regiao=QUALQUER&ilhaOceanica=32767&estado=QUALQUER&domFitogeograficos=QUALQUER&vegetacao=TODOS&mostrarAte=SUBESP_VAR&opcoesBusca=TODOS_OS_NOMES&loginUsuario=Visitante&senhaUsuario=&contexto=consulta-publica&pagina=1"
+
+
+def build_consulta_genero_url(genero: str, pagina: int = 1) -> str:
+    """URL da página `pagina` da consulta pública de todos os táxons do gênero"""
+    base = _base_url_override or REFLORA_CONSULTA_BASE
+    return f"{base}/consulta/?grupo=6&familia=null&genero={quote_plus(genero)}&especie=&autor=&nomeVernaculo=&nomeCompleto=&formaVida=null&substrato=null&ocorreBrasil=QUALQUER&ocorrencia=OCORRE&endemismo=TODOS&origem=TODOS&regiao=QUALQUER&ilhaOceanica=32767&estado=QUALQUER&domFitogeograficos=QUALQUER&vegetacao=TODOS&mostrarAte=SUBESP_VAR&opcoesBusca=TODOS_OS_NOMES&loginUsuario=Visitante&senhaUsuario=&contexto=consulta-publica&pagina={pagina}"
+
+
+def _remover_acentos(texto: str) -> str:
+    """NFKD sem as marcas combinantes (implementação de referência, caractere a caractere)"""
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+class _TabelaAcentos(dict):
+    """
+    Tabela de str.translate com o resultado de _remover_acentos por caractere.
+    Latin-1, Latin Extended-A/B e as marcas combinantes são pré-calculados;
+    qualquer outro caractere é calculado (e guardado) na primeira vez que aparece.
+    """
+
+    def __init__(self, faixas):
+        super().__init__()
+        for faixa in faixas:
+            for codigo in faixa:
+                self[codigo] = _remover_acentos(chr(codigo))
+
+    def __missing__(self, codigo):
+        dobrado = _remover_acentos(chr(codigo))
+        self[codigo] = dobrado
+        return dobrado
+
+
+_TABELA_ACENTOS = _TabelaAcentos((range(0x80, 0x250), range(0x300, 0x370)))
+_NAO_ASCII = re.compile(r'[^\x00-\x7f]+')
+# Sinais de forma de vida/substrato mal extraídos: tags ou entidades que sobraram
+# e itens colados sem separador ("ArbustoÁrvore")
+_RESTO_MARCACAO = re.compile(r'[<>]|&\w+;')
+_ITENS_COLADOS = re.compile(r'[a-zà-ÿ][A-ZÀ-Þ]')
+
+
+def _dobrar_trecho(match) -> str:
+    return match.group().translate(_TABELA_ACENTOS)
+
+
+@lru_cache(maxsize=32)
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza texto removendo acentos e caracteres especiais.
+
+    Equivale a NFKD + remoção das marcas combinantes, mas só os trechos não
+    ASCII passam pela tabela pré-calculada; texto só ASCII sai direto. O
+    resultado fica em cache para que a mesma página não seja normalizada
+    duas vezes.
+    """
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return _NAO_ASCII.sub(_dobrar_trecho, texto)
+
+
+class _BuscadorPadroes:
+    """
+    Busca todas as variações de vários grupos de padrões (ex.: estados e
+    domínios) em uma única passada sobre o texto normalizado.
+
+    As variações normalizadas formam uma única regex de alternação, compilada
+    na criação, com as mais longas primeiro. Como as ocorrências encontradas
+    não se sobrepõem, cada variação carrega também os nomes das variações
+    contidas nela ("mato grosso do sul" conta "Mato Grosso"), o que dá o mesmo
+    resultado de procurar cada variação separadamente.
+    """
+
+    def __init__(self, grupos: Dict[str, Dict[str, List[str]]]):
+        self.grupos = list(grupos)
+        nomes_por_variacao = {}
+        for grupo, padroes in grupos.items():
+            for nome, variacoes in padroes.items():
+                for variacao in variacoes:
+                    nomes_por_variacao.setdefault(normalizar_texto(variacao), set()).add((grupo, nome))
+
+        variacoes = sorted(nomes_por_variacao, key=len, reverse=True)
+        self._nomes = {}
+        for variacao in variacoes:
+            nomes = set(nomes_por_variacao[variacao])
+            for outra in variacoes:
+                if outra != variacao and re.search(rf'\b{re.escape(outra)}\b', variacao):
+                    nomes |= nomes_por_variacao[outra]
+            self._nomes[variacao] = nomes
+        self.regex = re.compile(r'\b(?:' + '|'.join(re.escape(v) for v in variacoes) + r')\b')
+
+    def buscar(self, texto_normalizado: str) -> Dict[str, List[str]]:
+        """Nomes encontrados em cada grupo, em ordem alfabética"""
+        encontrados = {grupo: set() for grupo in self.grupos}
+        for variacao in set(self.regex.findall(texto_normalizado)):
+            for grupo, nome in self._nomes[variacao]:
+                encontrados[grupo].add(nome)
+        return {grupo: sorted(nomes) for grupo, nomes in encontrados.items()}
+
+
+# Buscadores de _buscar_padroes já compilados, por dicionário de padrões
+_buscadores_compilados = {}
 
 
 class DataReader:
@@ -65,45 +196,109 @@ class DataReader:
         'Manguezal': ['Manguezal', 'Mangrove']
     }
 
+    # Títulos da seção de distribuição (div.text) e a parte que cada um abre
+    TITULOS_DISTRIBUICAO = {
+        "Distribuição Geográfica": "distribuicao",
+        "Domínios Fitogeográficos": "dominios",
+        "Tipo de Vegetação": "vegetacao",
+    }
+    _TITULOS_DISTRIBUICAO_RE = re.compile("(" + "|".join(map(re.escape, TITULOS_DISTRIBUICAO)) + ")")
+    # Região de ocorrência seguida da lista de estados: "Norte (Acre, Amapá, ...)"
+    _REGIAO_RE = re.compile(r"\b(Centro-Oeste|Nordeste|Sudeste|Norte|Sul)\s*\(")
+    # Vírgulas fora de parênteses separam os itens de uma lista
+    _ITENS_RE = re.compile(r",(?![^()]*\))")
+
+    # Acertos por seletor de read_familia/read_autor e alertas de mudança de layout
+    TELEMETRIA = TelemetriaSeletores()
+
+    # Estados e domínios compilados uma única vez, na importação
+    _BUSCADOR_DISTRIBUICAO = _BuscadorPadroes({
+        "estados": ESTADOS_BR,
+        "dominios": DOMINIOS_FITOGEOGRAFICOS,
+    })
+
     @staticmethod
     def _normalizar_texto(texto: str) -> str:
         """Normaliza texto removendo acentos e caracteres especiais"""
-        texto = unicodedata.normalize('NFKD', texto.lower())
-        return ''.join(c for c in texto if not unicodedata.combining(c))
+        return normalizar_texto(texto)
 
     @staticmethod
     def _buscar_padroes(texto: str, padroes: Dict[str, List[str]]) -> List[str]:
         """Busca padrões em um texto ignorando case e acentos"""
-        texto_normalizado = DataReader._normalizar_texto(texto)
-        encontrados = set()
-        
-        for nome, variacoes in padroes.items():
-            for variacao in variacoes:
-                variacao_normalizada = DataReader._normalizar_texto(variacao)
-                if re.search(rf'\b{re.escape(variacao_normalizada)}\b', texto_normalizado):
-                    encontrados.add(nome)
-                    break
-                    
-        return sorted(encontrados)
+        compilado = _buscadores_compilados.get(id(padroes))
+        if compilado is None or compilado[0] is not padroes:
+            compilado = (padroes, _BuscadorPadroes({"padroes": padroes}))
+            _buscadores_compilados[id(padroes)] = compilado
+        return compilado[1].buscar(normalizar_texto(texto))["padroes"]
 
     @staticmethod
-    def read_distribuicao(driver) -> str:
-        """Busca sistemática por estados e domínios fitogeográficos"""
-        page_text = driver.page_source
+    def _buscar_estados_e_dominios(texto: str) -> Tuple[List[str], List[str]]:
+        """Estados e domínios citados em `texto`, encontrados em uma única passada"""
+        encontrados = DataReader._BUSCADOR_DISTRIBUICAO.buscar(normalizar_texto(texto))
+        return encontrados["estados"], encontrados["dominios"]
+
+    @staticmethod
+    def _ler_secao_distribuicao(texto: str) -> dict:
+        """Divide o texto da seção pelos títulos, em uma única passada, e lê cada parte"""
+        trechos = DataReader._TITULOS_DISTRIBUICAO_RE.split(texto)
+        partes = {}
+        # split() alterna texto e título: [antes, título, texto, título, texto, ...]
+        for titulo, conteudo in zip(trechos[1::2], trechos[2::2]):
+            partes.setdefault(DataReader.TITULOS_DISTRIBUICAO[titulo], conteudo)
+
+        regioes = []
+        for regiao in DataReader._REGIAO_RE.findall(partes.get("distribuicao", "")):
+            if regiao not in regioes:
+                regioes.append(regiao)
+
+        dominios = partes.get("dominios", "").replace('\n', '').replace('\t', '')
+        # Só a primeira linha depois do título é a lista de tipos de vegetação
+        vegetacao = partes.get("vegetacao", "").strip().split('\n')[0]
+        estados, dominios_citados = DataReader._buscar_estados_e_dominios(texto)
+
+        return {
+            "regioes": regioes,
+            "estados": estados,
+            "dominios": [d.strip() for d in dominios.split(',') if d.strip() in DataReader.DOMINIOS_VALIDOS],
+            "tipos_vegetacao": [v.strip() for v in DataReader._ITENS_RE.split(vegetacao) if v.strip()],
+            # Domínios (e formações como Restinga) citados em qualquer parte da seção
+            "dominios_citados": dominios_citados,
+            "completa": "dominios" in partes and "vegetacao" in partes,
+        }
+
+    @staticmethod
+    def read_secao_distribuicao(driver) -> dict:
+        """
+        Seção de distribuição (div.text) lida de uma vez: regiões de
+        ocorrência, estados, domínios fitogeográficos e tipos de vegetação,
+        em listas. Sem a seção, estados e domínios são procurados na página.
+        """
+        try:
+            texto = driver.find_element(By.XPATH, '//div[@class="text"]').get_attribute('textContent')
+        except Exception:
+            secao = DataReader._ler_secao_distribuicao("")
+            secao["estados"], secao["dominios_citados"] = DataReader._buscar_estados_e_dominios(driver.page_source)
+            return secao
+        return DataReader._ler_secao_distribuicao(texto or "")
+
+    @staticmethod
+    def formatar_distribuicao(secao: dict) -> str:
+        """Texto da coluna Distribuição a partir de read_secao_distribuicao"""
         resultados = []
         
-        # Busca estados
-        estados = DataReader._buscar_padroes(page_text, DataReader.ESTADOS_BR)
-        if estados:
-            resultados.append(f"Estados: {', '.join(estados)}")
+        if secao["estados"]:
+            resultados.append(f"Estados: {', '.join(secao['estados'])}")
         
-        # Busca domínios
-        dominios = DataReader._buscar_padroes(page_text, DataReader.DOMINIOS_FITOGEOGRAFICOS)
-        if dominios:
-            resultados.append(f"Domínios: {', '.join(dominios)}")
+        if secao["dominios_citados"]:
+            resultados.append(f"Domínios: {', '.join(secao['dominios_citados'])}")
         
         return " | ".join(resultados) if resultados else "Distribuição não registrada"
 
+    @staticmethod
+    def read_distribuicao(driver) -> str:
+        """Busca sistemática por estados e domínios fitogeográficos"""
+        return DataReader.formatar_distribuicao(DataReader.read_secao_distribuicao(driver))
+
     @staticmethod
     def read_familia(driver) -> str:
         """Extrai família botânica com múltiplos fallbacks"""
@@ -115,17 +310,26 @@ class DataReader:
                 ext in el.text.lower() for ext in ['aceae', 'eae', 'idae']) else None)
         ]
 
+        tentativas = []
         for selector, processor in strategies:
+            inicio = time.perf_counter()
             try:
                 elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 for el in elements:
                     result = processor(el)
                     if result:
+                        tentativas.append((selector, time.perf_counter() - inicio))
+                        DataReader.TELEMETRIA.registrar("familia", tentativas, selector)
                         return re.sub(r'\(.*?\)', '', result).strip()
             except NoSuchElementException:
-                continue
+                pass
+            tentativas.append((selector, time.perf_counter() - inicio))
+        DataReader.TELEMETRIA.registrar("familia", tentativas)
         return "Família não identificada"
 
+    # Nome do último recurso de read_autor na telemetria
+    AUTOR_FALLBACK_BODY = "body (regex entre parênteses)"
+
     @staticmethod
     def read_autor(driver) -> str:
         """Método robusto para extração de autores com múltiplas estratégias"""
@@ -155,7 +359,9 @@ class DataReader:
             }
         ]
 
+        tentativas = []
         for strategy in strategies:
+            inicio = time.perf_counter()
             try:
                 elements = driver.find_elements(By.CSS_SELECTOR, strategy['selector'])
                 for el in elements:
@@ -165,21 +371,29 @@ class DataReader:
                             clean_result = re.sub(r'^\W+|\W+$', '', result)
                             clean_result = re.sub(r'\s+', ' ', clean_result)
                             if clean_result:
+                                tentativas.append((strategy['selector'], time.perf_counter() - inicio))
+                                DataReader.TELEMETRIA.registrar("autor", tentativas, strategy['selector'])
                                 return clean_result
                     except Exception:
                         continue
             except NoSuchElementException:
-                continue
+                pass
+            tentativas.append((strategy['selector'], time.perf_counter() - inicio))
         
+        inicio = time.perf_counter()
         try:
             body_text = driver.find_element(By.CSS_SELECTOR, "body").text
             match = re.search(r'\((.*?)\)', body_text)
             if match:
                 result = match.group(1).strip()
                 if len(result) > 1:
+                    tentativas.append((DataReader.AUTOR_FALLBACK_BODY, time.perf_counter() - inicio))
+                    DataReader.TELEMETRIA.registrar("autor", tentativas, DataReader.AUTOR_FALLBACK_BODY)
                     return result
         except:
             pass
+        tentativas.append((DataReader.AUTOR_FALLBACK_BODY, time.perf_counter() - inicio))
+        DataReader.TELEMETRIA.registrar("autor", tentativas)
         
         return "Autor não identificado"
 
@@ -221,129 +435,216 @@ class DataReader:
 
         return ("Nome válido", "")
     
+    # Ordem padrão das estratégias de read_forma_e_substrato
+    FORMA_SUBSTRATO_ESTRATEGIAS = (
+        "beautifulsoup", "javascript", "xpath", "regex", "palavras_chave"
+    )
+
+    # Sucesso e custo recentes de cada estratégia, usados para reordená-las
+    ESTATISTICAS_FORMA_SUBSTRATO = EstatisticasEstrategias()
+
+    # Parser HTML da estratégia "beautifulsoup": o mais rápido instalado
+    PARSER_HTML = escolher_backend()
+    _PARSER_SOUP = BackendBeautifulSoup()
+
+    # Função JS de extração de forma de vida/substrato, reaproveitada na coleta em lote
+    JS_FORMA_SUBSTRATO = """
+        function extrairFormaESubstrato() {
+            const container = document.getElementById('forma-de-vida-e-substrato');
+            if (!container) return {forma: '', substrato: ''};
+            
+            const formaDiv = container.querySelector('.forma-de-vida');
+            const substratoDiv = container.querySelector('.substrato');
+            
+            let forma = '';
+            let substrato = '';
+            
+            if (formaDiv) {
+                const nodes = formaDiv.childNodes;
+                let afterBr = false;
+                let formaItems = new Set(); // Usar Set para evitar duplicatas
+                for (let node of nodes) {
+                    if (node.tagName === 'BR') {
+                        afterBr = true;
+                        continue;
+                    }
+                    if (afterBr && node.nodeType === Node.TEXT_NODE) {
+                        const text = node.textContent.trim();
+                        if (text && text !== 'Forma de Vida') {
+                            formaItems.add(text);
+                        }
+                    }
+                }
+                forma = Array.from(formaItems).join(', ');
+            }
+            
+            if (substratoDiv) {
+                const nodes = substratoDiv.childNodes;
+                let afterBr = false;
+                let substratoItems = new Set(); // Usar Set para evitar duplicatas
+                for (let node of nodes) {
+                    if (node.tagName === 'BR') {
+                        afterBr = true;
+                        continue;
+                    }
+                    if (afterBr && node.nodeType === Node.TEXT_NODE) {
+                        const text = node.textContent.trim();
+                        if (text && text !== 'Substrato') {
+                            substratoItems.add(text);
+                        }
+                    }
+                }
+                substrato = Array.from(substratoItems).join(', ');
+            }
+            
+            return {
+                forma: forma.trim(),
+                substrato: substrato.trim()
+            };
+        }
+    """
+
     @staticmethod
-    def read_forma_e_substrato(driver) -> Tuple[str, str]:
-        """Extrai Forma de Vida e Substrato com separação correta e sem duplicações"""
-        forma_vida, substrato = "", ""
-        
-        # Estratégia 1: Usar BeautifulSoup para parsing preciso
+    def _estrategia_forma_substrato(nome: str):
+        """Retorna a função que implementa a estratégia de nome `nome`"""
+        return getattr(DataReader, f"_forma_substrato_{nome}")
+
+    @staticmethod
+    def _forma_substrato_limpos(forma_vida: str, substrato: str, completo=True) -> bool:
+        """
+        Campos com itens separados e sem restos de marcação ou títulos; com
+        `completo` os dois têm de estar preenchidos, senão basta um
+        """
+        if (not forma_vida or not substrato) if completo else (not forma_vida and not substrato):
+            return False
+        for item in ", ".join(campo for campo in (forma_vida, substrato) if campo).split(","):
+            item = item.strip()
+            if not item or item in ("Forma de Vida", "Substrato") or _RESTO_MARCACAO.search(item) \
+                    or _ITENS_COLADOS.search(item):
+                return False
+        return True
+
+    @staticmethod
+    def _estrategia_disponivel(nome: str, driver) -> bool:
+        """
+        Em snapshots não rodam o XPath (usa text(), fora do subconjunto do
+        PageSnapshot) nem o JavaScript, a menos que a coleta em lote já traga
+        o resultado dele
+        """
+        if not getattr(driver, "is_snapshot", False):
+            return True
+        if nome == "javascript":
+            return getattr(driver, "forma_substrato_js", None) is not None
+        return nome != "xpath"
+
+    @staticmethod
+    def read_forma_e_substrato(driver, estrategias=None) -> Tuple[str, str]:
+        """
+        Extrai Forma de Vida e Substrato com separação correta e sem duplicações.
+
+        As estratégias (`estrategias`, ou FORMA_SUBSTRATO_ESTRATEGIAS) são
+        tentadas na ordem dada por ESTATISTICAS_FORMA_SUBSTRATO, que registra o
+        resultado e o tempo de cada tentativa no modo de extração da página.
+        As que não se aplicam à página (_estrategia_disponivel) são puladas
+        sem registro.
+
+        Um resultado completo e limpo (_forma_substrato_limpos) encerra a
+        busca e conta como sucesso; um limpo com um só campo também, se vem de
+        uma estratégia comprovada no contexto (EstatisticasEstrategias.comprovada),
+        o que evita rodar todas as estratégias nas páginas que só têm um dos
+        campos. Se nenhuma estratégia chega a um desses (por exemplo antes de
+        haver MIN_AMOSTRAS tentativas), vale o resultado da primeira estratégia
+        da ordem padrão que achou algo (a de referência), e contam como sucesso
+        só as que devolveram o mesmo que ela.
+        Quando nenhuma estratégia encontra nada (página sem esses dados) as
+        tentativas não são registradas, pois não dizem qual estratégia funciona.
+        """
+        contexto = getattr(driver, "modo_extracao", "live")
+        estatisticas = DataReader.ESTATISTICAS_FORMA_SUBSTRATO
+        padrao = tuple(estrategias or DataReader.FORMA_SUBSTRATO_ESTRATEGIAS)
+        tentativas = []
+        for nome in estatisticas.ordem(contexto, padrao):
+            if not DataReader._estrategia_disponivel(nome, driver):
+                continue
+            inicio = time.perf_counter()
+            resultado = DataReader._estrategia_forma_substrato(nome)(driver)
+            tentativas.append((nome, time.perf_counter() - inicio, resultado))
+            if DataReader._forma_substrato_limpos(*resultado) or (
+                    DataReader._forma_substrato_limpos(*resultado, completo=False)
+                    and estatisticas.comprovada(contexto, nome)):
+                for anterior, custo, _ in tentativas[:-1]:
+                    estatisticas.registrar(contexto, anterior, False, custo)
+                estatisticas.registrar(contexto, nome, True, tentativas[-1][1])
+                return resultado
+
+        parciais = sorted((padrao.index(nome), resultado) for nome, _, resultado in tentativas if any(resultado))
+        if not parciais:
+            return "", ""
+        referencia = parciais[0][1]
+        for nome, custo, resultado in tentativas:
+            estatisticas.registrar(contexto, nome, resultado == referencia, custo)
+        return referencia
+
+    @staticmethod
+    def _forma_substrato_beautifulsoup(driver) -> Tuple[str, str]:
+        """Estratégia 1: parsing do HTML (backend em DataReader.PARSER_HTML)"""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            container = soup.find(id="forma-de-vida-e-substrato")
+            # Em um PageSnapshot a árvore já está parseada
+            soup = getattr(driver, "soup", None)
+            if soup is not None:
+                blocos = DataReader._PARSER_SOUP.blocos(soup, "forma-de-vida-e-substrato",
+                                                        ("forma-de-vida", "substrato"))
+            else:
+                blocos = DataReader.PARSER_HTML.blocos_html(driver.page_source, "forma-de-vida-e-substrato",
+                                                            ("forma-de-vida", "substrato"))
+
+            def conteudo(texto_completo, titulo):
+                # Uma linha por nó de texto; a primeira é o título, o resto é o conteúdo
+                linhas = [linha.strip() for linha in texto_completo.split('\n') if linha.strip()]
+                # Remover duplicatas mantendo ordem
+                linhas_unicas = []
+                for linha in linhas[1:]:
+                    if linha not in linhas_unicas and linha != titulo:
+                        linhas_unicas.append(linha)
+                return ', '.join(linhas_unicas)
 
-            if container:
-                # Buscar especificamente cada div
-                forma_div = container.find("div", class_="forma-de-vida")
-                substrato_div = container.find("div", class_="substrato")
+            forma_vida = conteudo(blocos.get("forma-de-vida", ""), "Forma de Vida")
+            substrato = conteudo(blocos.get("substrato", ""), "Substrato")
 
-                if forma_div:
-                    # Pegar todo o texto e separar pela tag <br>
-                    forma_content = str(forma_div)
-                    if '<br/>' in forma_content or '<br>' in forma_content:
-                        # Extrair apenas o que vem depois do <br>
-                        texto_completo = forma_div.get_text(separator='\n', strip=True)
-                        linhas = [linha.strip() for linha in texto_completo.split('\n') if linha.strip()]
-                        # A primeira linha é "Forma de Vida", o resto é o conteúdo
-                        if len(linhas) > 1:
-                            # Remover duplicatas mantendo ordem
-                            linhas_unicas = []
-                            for linha in linhas[1:]:
-                                if linha not in linhas_unicas and linha != "Forma de Vida":
-                                    linhas_unicas.append(linha)
-                            forma_vida = ', '.join(linhas_unicas)
+            # Se conseguiu extrair pelo menos um, retorna
+            if forma_vida or substrato:
+                return forma_vida.strip(), substrato.strip()
 
-                if substrato_div:
-                    # Mesmo processo para substrato
-                    substrato_content = str(substrato_div)
-                    if '<br/>' in substrato_content or '<br>' in substrato_content:
-                        texto_completo = substrato_div.get_text(separator='\n', strip=True)
-                        linhas = [linha.strip() for linha in texto_completo.split('\n') if linha.strip()]
-                        # A primeira linha é "Substrato", o resto é o conteúdo
-                        if len(linhas) > 1:
-                            # Remover duplicatas mantendo ordem
-                            linhas_unicas = []
-                            for linha in linhas[1:]:
-                                if linha not in linhas_unicas and linha != "Substrato":
-                                    linhas_unicas.append(linha)
-                            substrato = ', '.join(linhas_unicas)
-
-                # Se conseguiu extrair pelo menos um, retorna
-                if forma_vida or substrato:
-                    return forma_vida.strip(), substrato.strip()
-                    
         except Exception as e:
             print(f"Erro na estratégia BeautifulSoup: {e}")
 
-        # Estratégia 2: Usar JavaScript para extração mais precisa
+        return "", ""
+
+    @staticmethod
+    def _forma_substrato_javascript(driver) -> Tuple[str, str]:
+        """Estratégia 2: Usar JavaScript para extração mais precisa"""
+        # Uma BatchedPage já traz o resultado deste script da coleta em lote
+        precalculado = getattr(driver, "forma_substrato_js", None)
+        if precalculado is not None:
+            return precalculado
+        if getattr(driver, "is_snapshot", False):
+            return "", ""
         try:
-            # Executar JavaScript para extrair o conteúdo após <br>
-            js_script = """
-            function extrairFormaESubstrato() {
-                const container = document.getElementById('forma-de-vida-e-substrato');
-                if (!container) return {forma: '', substrato: ''};
-                
-                const formaDiv = container.querySelector('.forma-de-vida');
-                const substratoDiv = container.querySelector('.substrato');
-                
-                let forma = '';
-                let substrato = '';
-                
-                if (formaDiv) {
-                    const nodes = formaDiv.childNodes;
-                    let afterBr = false;
-                    let formaItems = new Set(); // Usar Set para evitar duplicatas
-                    for (let node of nodes) {
-                        if (node.tagName === 'BR') {
-                            afterBr = true;
-                            continue;
-                        }
-                        if (afterBr && node.nodeType === Node.TEXT_NODE) {
-                            const text = node.textContent.trim();
-                            if (text && text !== 'Forma de Vida') {
-                                formaItems.add(text);
-                            }
-                        }
-                    }
-                    forma = Array.from(formaItems).join(', ');
-                }
-                
-                if (substratoDiv) {
-                    const nodes = substratoDiv.childNodes;
-                    let afterBr = false;
-                    let substratoItems = new Set(); // Usar Set para evitar duplicatas
-                    for (let node of nodes) {
-                        if (node.tagName === 'BR') {
-                            afterBr = true;
-                            continue;
-                        }
-                        if (afterBr && node.nodeType === Node.TEXT_NODE) {
-                            const text = node.textContent.trim();
-                            if (text && text !== 'Substrato') {
-                                substratoItems.add(text);
-                            }
-                        }
-                    }
-                    substrato = Array.from(substratoItems).join(', ');
-                }
-                
-                return {
-                    forma: forma.trim(),
-                    substrato: substrato.trim()
-                };
-            }
-            
-            return extrairFormaESubstrato();
-            """
-            
-            result = driver.execute_script(js_script)
+            result = driver.execute_script(DataReader.JS_FORMA_SUBSTRATO + "\nreturn extrairFormaESubstrato();")
             if result and (result.get('forma') or result.get('substrato')):
                 return result.get('forma', ''), result.get('substrato', '')
                 
         except Exception as e:
             print(f"Erro na estratégia JavaScript: {e}")
 
-        # Estratégia 3: Usar XPath mais específico
+        return "", ""
+
+    @staticmethod
+    def _forma_substrato_xpath(driver) -> Tuple[str, str]:
+        """Estratégia 3: Usar XPath mais específico"""
+        forma_vida, substrato = "", ""
+        if getattr(driver, "is_snapshot", False):
+            return forma_vida, substrato
         try:
             from selenium.webdriver.common.by import By
             
@@ -378,7 +679,12 @@ class DataReader:
         except Exception as e:
             print(f"Erro na estratégia XPath: {e}")
 
-        # Estratégia 4: Parsing manual do HTML bruto
+        return "", ""
+
+    @staticmethod
+    def _forma_substrato_regex(driver) -> Tuple[str, str]:
+        """Estratégia 4: Parsing manual do HTML bruto"""
+        forma_vida, substrato = "", ""
         try:
             import re
             page_source = driver.page_source
@@ -426,7 +732,12 @@ class DataReader:
         except Exception as e:
             print(f"Erro na estratégia HTML manual: {e}")
 
-        # Estratégia 5: Fallback melhorado - separar dados que vieram juntos
+        return "", ""
+
+    @staticmethod
+    def _forma_substrato_palavras_chave(driver) -> Tuple[str, str]:
+        """Estratégia 5: Fallback melhorado - separar dados que vieram juntos"""
+        forma_vida, substrato = "", ""
         try:
             # Se chegou até aqui, tentar os métodos originais
             forma_elements = driver.find_elements(By.CSS_SELECTOR, ".forma-de-vida")
@@ -509,8 +820,9 @@ class DataReader:
     def debug_forma_substrato(driver):
         """Função para debugar o que está sendo extraído"""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = getattr(driver, "soup", None)
+            if soup is None:
+                soup = BeautifulSoup(driver.page_source, PARSER_BS4)
             container = soup.find(id="forma-de-vida-e-substrato")
             
             if container:
@@ -551,6 +863,67 @@ class DataReader:
     @staticmethod
     def read_origem_e_endemismo(driver, nome_planta: str) -> Tuple[str, str]:
         """Extrai Origem e Endemismo usando a lógica do plantas.py"""
+        try:
+            DataReader.load_consulta(driver, nome_planta)
+            return DataReader._ler_origem_e_endemismo(driver)
+        except Exception as e:
+            print(f"Erro ao buscar origem/endemismo para {nome_planta}: {e}")
+            return "Erro na coleta", "Erro na coleta"
+
+    @staticmethod
+    def load_consulta(driver, nome_planta: str):
+        """Navega até a consulta pública da espécie e aguarda o carregamento"""
+        driver.get(build_consulta_url(nome_planta))
+        time.sleep(2)
+
+    @staticmethod
+    def load_consulta_genero(driver, genero: str, pagina: int = 1):
+        """Navega até uma página da consulta pública do gênero e aguarda o carregamento"""
+        driver.get(build_consulta_genero_url(genero, pagina))
+        time.sleep(2)
+
+    # Nome científico de cada táxon na listagem da consulta
+    SELETOR_NOME_TAXON = ".nome.taxon, .taxon"
+
+    @staticmethod
+    def read_taxons_consulta(html: str) -> List[Tuple[str, str]]:
+        """
+        Divide uma página de resultados da consulta em um trecho de HTML por
+        táxon: [(nome como aparece na página, HTML do trecho)].
+
+        O trecho de um táxon é o maior elemento em volta do seu nome que não
+        contém o nome de nenhum outro táxon, e pode ser lido pelos mesmos
+        métodos que leem a ficha (envolvido em um PageSnapshot).
+        """
+        soup = BeautifulSoup(html or "", PARSER_BS4)
+        nomes, vistos = [], set()
+        for el in soup.select(DataReader.SELETOR_NOME_TAXON):
+            # .nome.taxon dentro de outro .taxon conta uma vez só
+            if not any(id(pai) in vistos for pai in el.parents):
+                nomes.append(el)
+                vistos.add(id(el))
+
+        # Quantos nomes há dentro de cada elemento
+        contagem = {}
+        for el in nomes:
+            for pai in el.parents:
+                contagem[id(pai)] = contagem.get(id(pai), 0) + 1
+
+        taxons = []
+        for el in nomes:
+            trecho = el
+            while trecho.parent is not None and trecho.parent.name != "[document]" \
+                    and contagem.get(id(trecho.parent), 0) == 1:
+                trecho = trecho.parent
+            italico = el.find("i")
+            nome = (italico or el).get_text(" ", strip=True)
+            if nome:
+                taxons.append((nome, str(trecho)))
+        return taxons
+
+    @staticmethod
+    def _ler_origem_e_endemismo(driver) -> Tuple[str, str]:
+        """Lê Origem e Endemismo da página de consulta já carregada"""
         def get_info_by_label(label_text):
             try:
                 elemento_h4 = driver.find_element(By.XPATH, f"//h4[contains(text(), '{label_text}')]")
@@ -559,23 +932,14 @@ class DataReader:
             except:
                 return "Não encontrado"
 
-        nome_url = quote_plus(nome_planta)
-        url = f"https://reflora.jbrj.gov.br/consulta/?grupo=6&familia=null&genero=&especie=&autor=&nomeVernaculo=&nomeCompleto={nome_url}&formaVida=null&substrato=null&ocorreBrasil=QUALQUER&ocorrencia=OCORRE&endemismo=TODOS&origem=TODOS&regiao=QUALQUER&ilhaOceanica=32767&estado=QUALQUER&domFitogeograficos=QUALQUER&vegetacao=TODOS&mostrarAte=SUBESP_VAR&opcoesBusca=TODOS_OS_NOMES&loginUsuario=Visitante&senhaUsuario=&contexto=consulta-publica&pagina=1"
+        origem = get_info_by_label("Origem")
+        endemismo = get_info_by_label("Endemismo")
         
-        try:
-            driver.get(url)
-            time.sleep(2)
-            origem = get_info_by_label("Origem")
-            endemismo = get_info_by_label("Endemismo")
-            
-            # Padronização dos valores
-            origem = "Nativa" if "Nativa" in origem else ("Exótica" if "Exótica" in origem else origem)
-            endemismo = "Endêmica" if "Endêmico" in endemismo or "Endêmica" in endemismo else ("Não endêmica" if "Não endêmico" in endemismo or "Não endêmica" in endemismo else endemismo)
-            
-            return origem, endemismo
-        except Exception as e:
-            print(f"Erro ao buscar origem/endemismo para {nome_planta}: {e}")
-            return "Erro na coleta", "Erro na coleta"
+        # Padronização dos valores
+        origem = "Nativa" if "Nativa" in origem else ("Exótica" if "Exótica" in origem else origem)
+        endemismo = "Endêmica" if "Endêmico" in endemismo or "Endêmica" in endemismo else ("Não endêmica" if "Não endêmico" in endemismo or "Não endêmica" in endemismo else endemismo)
+        
+        return origem, endemismo
         
     from selenium.webdriver.common.by import By
 
@@ -601,41 +965,22 @@ class DataReader:
 
 
     @staticmethod
-    def extract_fitogeographic_data(driver) -> dict:
-        """Extrai dados de domínios fitogeográficos e tipos de vegetação IDÊNTICO ao dominios.py"""
-        try:
-            # Espera para garantir que a página carregou
-            time.sleep(2)
-            
-            # Pega a div principal que contém os dados
-            div_text = driver.find_element(By.XPATH, '//div[@class="text"]')
-            full_text = div_text.get_attribute('textContent').strip()
-            
-            # Extrai os Domínios Fitogeográficos
-            dominios = full_text.split("Domínios Fitogeográficos")[1].split("Tipo de Vegetação")[0].strip()
-            dominios = dominios.replace('\n', '').replace('\t', '')  # Remove formatação
-            
-            # Filtra apenas os domínios válidos
-            dominios_encontrados = [
-                d.strip() 
-                for d in dominios.split(',') 
-                if d.strip() in DataReader.DOMINIOS_VALIDOS
-            ]
-            
-            # Extrai os Tipos de Vegetação
-            vegetacao = full_text.split("Tipo de Vegetação")[1].strip()
-            vegetacao = vegetacao.split('\n')[0].strip()  # Pega apenas a primeira linha
-            
-            return {
-                "dominios_fitogeograficos": ", ".join(dominios_encontrados) if dominios_encontrados else "Não encontrado",
-                "tipos_vegetacao": vegetacao if vegetacao else "Não encontrado"
-            }
-        except Exception as e:
-            print(f"Erro ao extrair dados fitogeográficos: {e}")
+    def formatar_fitogeografia(secao: dict) -> dict:
+        """Colunas de domínios fitogeográficos e tipos de vegetação a partir de read_secao_distribuicao"""
+        if not secao["completa"]:
             return {
                 "dominios_fitogeograficos": "Erro na extração",
                 "tipos_vegetacao": "Erro na extração"
             }
+        return {
+            "dominios_fitogeograficos": ", ".join(secao["dominios"]) if secao["dominios"] else "Não encontrado",
+            "tipos_vegetacao": ", ".join(secao["tipos_vegetacao"]) if secao["tipos_vegetacao"] else "Não encontrado"
+        }
+
+    @staticmethod
+    def extract_fitogeographic_data(driver) -> dict:
+        """Extrai dados de domínios fitogeográficos e tipos de vegetação"""
+        return DataReader.formatar_fitogeografia(DataReader.read_secao_distribuicao(driver))
 
     @staticmethod
     def read_dominios_fitogeograficos(driver) -> str:
@@ -0,0 +1,86 @@
+"""
+Resultados gravados de volta na planilha de origem ("enriquecer no lugar").
+
+Em vez de uma planilha de resultados separada, que depois teria de ser
+cruzada à mão (PROCV) com as abas de parcelas, cada nome distinto das abas
+selecionadas é buscado uma única vez e o resultado é juntado a todas as
+linhas com esse nome, em uma cópia da pasta de trabalho com todas as abas e
+colunas originais. A junção é um hash join do pandas (merge) pela chave do
+nome (checklist.chave_nome), linear no número de linhas.
+"""
+import pandas as pd
+
+from checklist import chave_nome
+from excel_utils import COLUNA_NOMES, formatar_planilha, preparar_resultados, read_excel
+from scraper import fetch_data
+
+# Sufixo das colunas de resultado que já existem na aba original
+SUFIXO_RESULTADOS = " (Reflora)"
+_CHAVE = "__chave_nome"
+
+
+def chaves_nomes(nomes: pd.Series) -> pd.Series:
+    """Chave de cada nome ("" nos vazios); chave_nome roda uma vez por texto distinto"""
+    texto = nomes.astype(object).where(nomes.notna(), "").map(str).str.strip()
+    distintos = texto.drop_duplicates()
+    return texto.map(dict(zip(distintos, map(chave_nome, distintos))))
+
+
+def nomes_unicos(chaves_por_aba: dict, nomes_por_aba: dict) -> pd.DataFrame:
+    """Um nome (a primeira grafia encontrada) por chave, na ordem em que aparecem nas abas"""
+    chaves = pd.concat(list(chaves_por_aba.values()), ignore_index=True)
+    nomes = pd.concat(list(nomes_por_aba.values()), ignore_index=True)
+    primeiros = ~chaves.duplicated() & (chaves != "")
+    return pd.DataFrame({"Nome Científico": nomes[primeiros].to_numpy(), _CHAVE: chaves[primeiros].to_numpy()})
+
+
+def juntar_resultados(df: pd.DataFrame, chaves: pd.Series, resultados: pd.DataFrame) -> pd.DataFrame:
+    """
+    `df` com as colunas de `resultados` (uma linha por chave, com a coluna
+    de chave) juntadas pela chave de cada linha. Mantém a ordem e todas as
+    linhas e colunas de `df`; linhas sem resultado ficam em branco.
+    """
+    enriquecido = df.assign(**{_CHAVE: chaves.to_numpy()}).merge(
+        resultados, on=_CHAVE, how="left", suffixes=("", SUFIXO_RESULTADOS), validate="many_to_one"
+    )
+    return enriquecido.drop(columns=_CHAVE).set_axis(df.index)
+
+
+def enriquecer_planilha(file_path, abas, output_path, coluna=COLUNA_NOMES, **opcoes_busca):
+    """
+    Busca os nomes da `coluna` das `abas` de `file_path` e grava em
+    `output_path` uma cópia da pasta de trabalho com as colunas de resultado
+    ao lado das originais nas abas selecionadas. As demais abas são
+    copiadas como estão. `opcoes_busca` vão para scraper.fetch_data.
+    Retorna o DataFrame de resultados da busca (um por nome distinto).
+    """
+    planilhas = read_excel(file_path)
+    faltando = [aba for aba in abas if aba not in planilhas]
+    if faltando:
+        raise ValueError(f"Abas não encontradas: {', '.join(faltando)}")
+    sem_coluna = [aba for aba in abas if coluna not in planilhas[aba].columns]
+    if sem_coluna:
+        raise ValueError(f"A coluna '{coluna}' não existe nas abas: {', '.join(sem_coluna)}")
+
+    nomes = {aba: planilhas[aba][coluna] for aba in abas}
+    chaves = {aba: chaves_nomes(nomes[aba]) for aba in abas}
+    unicos = nomes_unicos(chaves, nomes)
+    print(f" Nomes distintos: {len(unicos)} (em {sum(len(c) for c in chaves.values())} linhas)")
+
+    resultados = fetch_data(unicos[["Nome Científico"]], **opcoes_busca)
+    if len(resultados):
+        # O Nº de cada resultado é a posição do nome em `unicos`
+        posicoes = resultados["Nº"].to_numpy() - 1
+        resultados = preparar_resultados(resultados).drop(columns=["Nº", "Nome Científico"])
+        resultados[_CHAVE] = unicos[_CHAVE].to_numpy()[posicoes]
+    else:
+        resultados = pd.DataFrame({_CHAVE: pd.Series(dtype=object)})
+
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        for aba, df in planilhas.items():
+            if aba in chaves:
+                df = juntar_resultados(df, chaves[aba], resultados)
+            df.to_excel(writer, sheet_name=aba, index=False)
+            if aba in chaves:
+                formatar_planilha(writer.sheets[aba], df)
+    return resultados
@@ -1,7 +1,35 @@
+import csv
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
 import pandas as pd
 from tkinter import filedialog, messagebox
 from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Coluna com os nomes a buscar e quantas linhas ir em cada DataFrame
+COLUNA_NOMES = "Nome Científico"
+LINHAS_POR_BLOCO = 5000
+# Formatos lidos direto do XML do pacote (os demais passam pelo pandas)
+EXTENSOES_XLSX = (".xlsx", ".xlsm", ".xltx", ".xltm")
+EXTENSOES_ODS = (".ods",)
+# Listas de nomes com uma única tabela, lidas em blocos
+EXTENSOES_CSV = (".csv", ".tsv", ".txt")
+EXTENSOES_PARQUET = (".parquet", ".pq")
 
 def read_excel(file_path):
     try:
@@ -9,202 +37,629 @@ def read_excel(file_path):
     except Exception as e:
         raise Exception(f"Erro ao ler planilha: {str(e)}")
 
-def limpar_forma_vida_substrato(df):
-    """Limpa e separa corretamente forma de vida e substrato, removendo duplicatas"""
-    
-    def clean_and_deduplicate(text):
-        """Remove duplicatas de uma string separada por vírgulas"""
-        if pd.isna(text) or not str(text).strip():
-            return ""
-        
-        text = str(text)
-        # Separar por vírgula e remover duplicatas
-        items = []
-        seen = set()
-        for item in text.split(','):
-            item = item.strip()
-            item_lower = item.lower()
-            # Filtrar títulos e duplicatas
-            if (item and 
-                item_lower not in seen and 
-                item_lower not in ['forma de vida', 'substrato', 'nan'] and
-                item != 'nan'):
-                items.append(item)
-                seen.add(item_lower)
-        
-        return ', '.join(items)
-    
-    if "Forma de Vida" in df.columns and "Substrato" in df.columns:
-        for idx, row in df.iterrows():
-            forma_vida = str(row["Forma de Vida"]) if pd.notna(row["Forma de Vida"]) else ""
-            substrato = str(row["Substrato"]) if pd.notna(row["Substrato"]) else ""
-            
-            # Se forma de vida está vazia e substrato tem dados que parecem ser de forma de vida
-            if not forma_vida.strip() and substrato.strip():
-                # Separar dados que podem estar misturados
-                linhas = [linha.strip() for linha in substrato.split('\n') if linha.strip()]
-                
-                forma_temp = []
-                substrato_temp = []
-                
-                # Palavras-chave para identificar forma de vida
-                palavras_forma = ['Arbusto', 'Árvore', 'Erva', 'Liana', 'Subarbusto', 'Trepadeira', 'Herbácea']
-                # Palavras-chave para identificar substrato  
-                palavras_substrato = ['Terrícola', 'Rupícola', 'Epífita', 'Aquática', 'Epifítica']
-                
-                for linha in linhas:
-                    # Pular linhas que são títulos
-                    if linha in ['Forma de Vida', 'Substrato']:
+def _extensao(file_path):
+    return os.path.splitext(file_path)[1].lower()
+
+def _usa_xlsx(file_path):
+    return _extensao(file_path) in EXTENSOES_XLSX
+
+def _tabela_unica(file_path):
+    """CSV e Parquet não têm abas: a única "aba" é o nome do arquivo"""
+    return _extensao(file_path) in EXTENSOES_CSV + EXTENSOES_PARQUET
+
+def _aba_unica(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def _local(tag):
+    """Nome da tag sem o namespace (serve para o OOXML transicional e para o estrito)"""
+    return tag.rsplit("}", 1)[-1]
+
+def _iterparse(fonte, nome):
+    """Elementos `nome` de um XML em streaming, descartando cada um depois de usado"""
+    if lxml_etree is not None:
+        for _, el in lxml_etree.iterparse(fonte, events=("end",), tag=f"{{*}}{nome}", huge_tree=True):
+            yield el
+            el.clear(keep_tail=True)
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+        return
+    for _, el in ET.iterparse(fonte, events=("end",)):
+        if _local(el.tag) == nome:
+            yield el
+            el.clear()
+
+def _partes_xlsx(pacote):
+    """({aba: caminho do XML da aba}, caminho das strings compartilhadas ou None)"""
+    def relacoes(caminho):
+        if caminho not in pacote.namelist():
+            return []
+        return [(rel.get("Id"), rel.get("Type", ""), rel.get("Target", "")) for rel in ET.fromstring(pacote.read(caminho))]
+
+    def resolver(base, alvo):
+        return alvo.lstrip("/") if alvo.startswith("/") else posixpath.normpath(posixpath.join(base, alvo))
+
+    parte = next((alvo for _, tipo, alvo in relacoes("_rels/.rels") if tipo.endswith("/officeDocument")),
+                 "xl/workbook.xml").lstrip("/")
+    base = posixpath.dirname(parte)
+    alvos = {}
+    strings = None
+    for id_, tipo, alvo in relacoes(posixpath.join(base, "_rels", posixpath.basename(parte) + ".rels")):
+        alvos[id_] = resolver(base, alvo)
+        if tipo.endswith("/sharedStrings"):
+            strings = alvos[id_]
+
+    abas = {}
+    for el in ET.fromstring(pacote.read(parte)).iter():
+        if _local(el.tag) == "sheet":
+            id_ = next((valor for atributo, valor in el.attrib.items() if _local(atributo) == "id"), None)
+            if id_ in alvos:
+                abas[el.get("name")] = alvos[id_]
+    return abas, strings
+
+def _abas_xlsx(file_path):
+    """
+    Nomes das abas lidos direto do workbook.xml do pacote. O load_workbook,
+    mesmo somente leitura, percorre o XML de cada aba que não declara suas
+    dimensões, o que em pastas grandes leva minutos.
+    """
+    with zipfile.ZipFile(file_path) as pacote:
+        return list(_partes_xlsx(pacote)[0])
+
+def _atributo(el, nome):
+    """Valor do atributo `nome`, qualquer que seja o namespace"""
+    return next((valor for atributo, valor in el.attrib.items() if _local(atributo) == nome), None)
+
+def _iter_ods(fonte):
+    """
+    (nome da aba, <table:table-row>) de um content.xml de .ods em streaming,
+    descartando cada linha; o início de cada aba vem como (nome da aba, None)
+    """
+    aba = None
+    if lxml_etree is not None:
+        eventos = lxml_etree.iterparse(fonte, events=("start", "end"), tag=("{*}table", "{*}table-row"),
+                                       huge_tree=True)
+    else:
+        eventos = ET.iterparse(fonte, events=("start", "end"))
+    for evento, el in eventos:
+        nome = _local(el.tag)
+        if nome == "table" and evento == "start":
+            aba = _atributo(el, "name")
+            yield aba, None
+        elif nome == "table-row" and evento == "end":
+            yield aba, el
+            el.clear()
+            if lxml_etree is not None:
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+
+def _abas_ods(file_path):
+    """Nomes das abas de um .ods, em streaming (as linhas são descartadas sem ler as células)"""
+    with zipfile.ZipFile(file_path) as pacote, pacote.open("content.xml") as fonte:
+        return [aba for aba, linha in _iter_ods(fonte) if linha is None]
+
+def listar_abas(file_path):
+    """Nomes das abas, sem ler o conteúdo de nenhuma delas"""
+    try:
+        if _usa_xlsx(file_path):
+            return _abas_xlsx(file_path)
+        if _extensao(file_path) in EXTENSOES_ODS:
+            return _abas_ods(file_path)
+        if _tabela_unica(file_path):
+            return [_aba_unica(file_path)]
+        with pd.ExcelFile(file_path) as arquivo:
+            return list(arquivo.sheet_names)
+    except Exception as e:
+        raise Exception(f"Erro ao ler planilha: {str(e)}")
+
+class _StringCompartilhada(int):
+    """Índice na tabela de strings compartilhadas, resolvido depois da leitura da aba"""
+
+def _coluna(referencia):
+    """Índice (0 = A) da coluna de uma referência de célula como 'AB12'"""
+    indice = 0
+    for letra in referencia:
+        if not letra.isalpha():
+            break
+        indice = indice * 26 + ord(letra.upper()) - 64
+    return indice - 1
+
+def _valor_celula(celula):
+    tipo = celula.get("t", "n")
+    if tipo == "inlineStr":
+        return "".join(el.text or "" for el in celula.iter() if _local(el.tag) == "t")
+    valor = next((el.text for el in celula if _local(el.tag) == "v"), None)
+    if valor is None:
+        return None
+    if tipo == "s":
+        return _StringCompartilhada(valor)
+    if tipo == "b":
+        return valor == "1"
+    if tipo in ("str", "d", "e"):
+        return valor
+    numero = float(valor)
+    return int(numero) if numero.is_integer() else numero
+
+def _celulas(linha):
+    """(índice da coluna, valor) de cada célula de um <row>"""
+    posicao = -1
+    for celula in linha:
+        if _local(celula.tag) != "c":
+            continue
+        referencia = celula.get("r")
+        posicao = _coluna(referencia) if referencia else posicao + 1
+        yield posicao, celula
+
+def _ler_strings(pacote, parte, indices):
+    """{índice: texto} das strings compartilhadas em `indices`, parando na última delas"""
+    if not indices or parte is None:
+        return {}
+    textos, ultimo = {}, max(indices)
+    with pacote.open(parte) as fonte:
+        for numero, si in enumerate(_iterparse(fonte, "si")):
+            if numero in indices:
+                # Texto simples (<t>) ou rico (<r><t>); a leitura fonética (<rPh>) fica de fora
+                textos[numero] = "".join(
+                    el.text or "" for filho in si if _local(filho.tag) in ("t", "r")
+                    for el in filho.iter() if _local(el.tag) == "t"
+                )
+            if numero >= ultimo:
+                break
+    return textos
+
+def _vazio(valor):
+    return valor is None or valor == ""
+
+def _bloco(valores, inicio, coluna):
+    return pd.DataFrame({coluna: valores}, index=pd.RangeIndex(inicio, inicio + len(valores)), dtype=object)
+
+def _iter_blocos_xlsx(file_path, aba, coluna, tamanho_bloco):
+    with zipfile.ZipFile(file_path) as pacote:
+        abas, parte_strings = _partes_xlsx(pacote)
+        if aba not in abas:
+            raise ValueError(f"Aba '{aba}' não encontrada")
+
+        cabecalho, posicao, encontrados = None, None, []
+        with pacote.open(abas[aba]) as fonte:
+            numero = 0
+            for linha in _iterparse(fonte, "row"):
+                numero = int(linha.get("r") or numero + 1)
+                if posicao is None:
+                    # Cabeçalho: primeira linha com algum valor
+                    valores = {indice: _valor_celula(celula) for indice, celula in _celulas(linha)}
+                    valores = {indice: valor for indice, valor in valores.items() if not _vazio(valor)}
+                    if not valores:
                         continue
-                        
-                    # Verificar se a linha contém palavras de forma de vida
-                    if any(palavra in linha for palavra in palavras_forma):
-                        forma_temp.append(linha)
-                    # Verificar se a linha contém palavras de substrato
-                    elif any(palavra in linha for palavra in palavras_substrato):
-                        substrato_temp.append(linha)
-                    else:
-                        # Se não conseguir identificar, tentar pela posição
-                        # Geralmente forma de vida vem primeiro
-                        if not forma_temp and linha:
-                            forma_temp.append(linha)
-                        elif linha:
-                            substrato_temp.append(linha)
-                
-                # Atualizar os valores removendo duplicatas
-                if forma_temp:
-                    df.at[idx, "Forma de Vida"] = clean_and_deduplicate(', '.join(forma_temp))
-                if substrato_temp:
-                    df.at[idx, "Substrato"] = clean_and_deduplicate(', '.join(substrato_temp))
-                elif not substrato_temp and forma_temp:
-                    # Se só temos dados de forma de vida, limpar substrato
-                    df.at[idx, "Substrato"] = ""
-            else:
-                # Limpar duplicatas mesmo quando os dados estão nas colunas corretas
-                df.at[idx, "Forma de Vida"] = clean_and_deduplicate(forma_vida)
-                df.at[idx, "Substrato"] = clean_and_deduplicate(substrato)
-    
+                    textos = _ler_strings(pacote, parte_strings, {
+                        v for v in valores.values() if isinstance(v, _StringCompartilhada)
+                    })
+                    nomes = {indice: str(textos.get(v, "") if isinstance(v, _StringCompartilhada) else v).strip()
+                             for indice, v in valores.items()}
+                    posicao = next((indice for indice, nome in nomes.items() if nome == coluna), None)
+                    if posicao is None:
+                        raise ValueError(f"A aba '{aba}' não tem a coluna '{coluna}'")
+                    cabecalho = numero
+                    continue
+
+                for indice, celula in _celulas(linha):
+                    if indice == posicao:
+                        valor = _valor_celula(celula)
+                        if not _vazio(valor):
+                            encontrados.append((numero - cabecalho - 1, valor))
+                        break
+
+        if cabecalho is None:
+            raise ValueError(f"A aba '{aba}' não tem a coluna '{coluna}'")
+        textos = _ler_strings(pacote, parte_strings, {
+            valor for _, valor in encontrados if isinstance(valor, _StringCompartilhada)
+        })
+
+    yield from _blocos_de(((indice, textos.get(valor) if isinstance(valor, _StringCompartilhada) else valor)
+                           for indice, valor in encontrados), coluna, tamanho_bloco)
+
+def _blocos_de(encontrados, coluna, tamanho_bloco):
+    """
+    Blocos a partir de (posição, valor) dos nomes, em ordem. Linhas sem nome
+    entre dois nomes viram NaN (como no pd.read_excel); as do fim ficam de fora.
+    """
+    valores, inicio = [], 0
+    for indice, valor in encontrados:
+        valores.extend([float("nan")] * (indice - inicio - len(valores)))
+        valores.append(valor)
+        while len(valores) >= tamanho_bloco:
+            yield _bloco(valores[:tamanho_bloco], inicio, coluna)
+            valores = valores[tamanho_bloco:]
+            inicio += tamanho_bloco
+    if valores:
+        yield _bloco(valores, inicio, coluna)
+
+def _valor_ods(celula):
+    """Valor de uma <table:table-cell> (None se vazia)"""
+    tipo = _atributo(celula, "value-type")
+    if tipo in ("float", "percentage", "currency"):
+        numero = float(_atributo(celula, "value"))
+        return int(numero) if numero.is_integer() else numero
+    if tipo == "boolean":
+        return _atributo(celula, "boolean-value") == "true"
+    if tipo == "date":
+        return _atributo(celula, "date-value")
+    if tipo == "time":
+        return _atributo(celula, "time-value")
+    # Texto: um parágrafo (<text:p>) por linha, com os espaços de <text:s>
+    paragrafos = []
+    for p in celula:
+        if _local(p.tag) != "p":
+            continue
+        partes = []
+        for el in p.iter():
+            if el is not p:
+                nome = _local(el.tag)
+                if nome == "s":
+                    partes.append(" " * int(_atributo(el, "c") or 1))
+                elif nome == "tab":
+                    partes.append("\t")
+                elif nome == "line-break":
+                    partes.append("\n")
+            if el.text and (el is p or _local(el.tag) not in ("s", "tab", "line-break")):
+                partes.append(el.text)
+            if el is not p and el.tail:
+                partes.append(el.tail)
+        paragrafos.append("".join(partes))
+    return "\n".join(paragrafos) if paragrafos else None
+
+def _celulas_ods(linha, ate=None):
+    """(índice da coluna, valor) das células não vazias de uma <table:table-row>, até a coluna `ate`"""
+    posicao = 0
+    for celula in linha:
+        if _local(celula.tag) not in ("table-cell", "covered-table-cell"):
+            continue
+        repeticoes = int(_atributo(celula, "number-columns-repeated") or 1)
+        if ate is not None and posicao > ate:
+            return
+        valor = _valor_ods(celula)
+        if not _vazio(valor):
+            fim = posicao + repeticoes if ate is None else min(posicao + repeticoes, ate + 1)
+            for indice in range(posicao, fim):
+                yield indice, valor
+        posicao += repeticoes
+
+def _iter_blocos_ods(file_path, aba, coluna, tamanho_bloco):
+    def encontrados(linhas):
+        cabecalho, posicao, numero, vista = None, None, 0, False
+        for nome_aba, linha in linhas:
+            if nome_aba != aba:
+                if vista:
+                    break
+                continue
+            vista = True
+            if linha is None:
+                continue
+            repeticoes = int(_atributo(linha, "number-rows-repeated") or 1)
+            if posicao is None:
+                # Cabeçalho: primeira linha com algum valor
+                nomes = {indice: str(valor).strip() for indice, valor in _celulas_ods(linha)}
+                if nomes:
+                    posicao = next((indice for indice, nome in nomes.items() if nome == coluna), None)
+                    if posicao is None:
+                        raise ValueError(f"A aba '{aba}' não tem a coluna '{coluna}'")
+                    cabecalho = numero
+                numero += repeticoes
+                continue
+
+            valor = next((v for indice, v in _celulas_ods(linha, posicao) if indice == posicao), None)
+            if valor is not None:
+                for repeticao in range(repeticoes):
+                    yield numero + repeticao - cabecalho - 1, valor
+            numero += repeticoes
+
+        if not vista:
+            raise ValueError(f"Aba '{aba}' não encontrada")
+        if cabecalho is None:
+            raise ValueError(f"A aba '{aba}' não tem a coluna '{coluna}'")
+
+    with zipfile.ZipFile(file_path) as pacote, pacote.open("content.xml") as fonte:
+        yield from _blocos_de(encontrados(_iter_ods(fonte)), coluna, tamanho_bloco)
+
+def _sem_vazios_no_fim(blocos, coluna):
+    """Tira dos blocos as linhas vazias do fim, guardando só o último bloco com nomes"""
+    ultimo, vazios = None, []
+    for bloco in blocos:
+        bloco[coluna] = bloco[coluna].mask(bloco[coluna].eq(""))
+        if bloco[coluna].notna().any():
+            if ultimo is not None:
+                yield ultimo
+            yield from vazios
+            ultimo, vazios = bloco, []
+        else:
+            vazios.append(bloco)
+    if ultimo is not None:
+        yield ultimo.loc[:ultimo[coluna].last_valid_index()]
+
+def _iter_blocos_csv(file_path, coluna, tamanho_bloco):
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        primeira = f.readline()
+    try:
+        dialeto = csv.Sniffer().sniff(primeira, delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel_tab if _extensao(file_path) == ".tsv" else csv.excel
+    colunas = [nome.strip() for nome in next(csv.reader([primeira], dialeto), [])]
+    if coluna not in colunas:
+        raise ValueError(f"O arquivo não tem a coluna '{coluna}'")
+
+    leitor = pd.read_csv(file_path, sep=dialeto.delimiter, usecols=[colunas.index(coluna)], dtype=object,
+                         encoding='utf-8-sig', chunksize=tamanho_bloco)
+    with leitor:
+        for bloco in leitor:
+            bloco.columns = [coluna]
+            yield bloco
+
+def _iter_blocos_parquet(file_path, coluna, tamanho_bloco):
+    if pq is None:
+        raise ValueError("A leitura de Parquet requer o pacote pyarrow")
+    arquivo = pq.ParquetFile(file_path)
+    nome = next((nome for nome in arquivo.schema_arrow.names if nome.strip() == coluna), None)
+    if nome is None:
+        raise ValueError(f"O arquivo não tem a coluna '{coluna}'")
+    inicio = 0
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=[nome]):
+        valores = [float("nan") if valor is None else valor for valor in lote.column(0).to_pylist()]
+        yield _bloco(valores, inicio, coluna)
+        inicio += len(valores)
+
+def iter_blocos_nomes(file_path, aba, coluna=COLUNA_NOMES, tamanho_bloco=LINHAS_POR_BLOCO):
+    """
+    Lê de `aba` só a coluna `coluna`, em DataFrames de até `tamanho_bloco`
+    linhas. O índice é a posição da linha abaixo do cabeçalho, como no
+    pd.read_excel, e as linhas vazias no fim da aba são ignoradas.
+
+    Nenhum formato é carregado inteiro: .xlsx/.xlsm e .ods são lidos em
+    streaming direto do XML da aba, sem as outras abas, as demais colunas,
+    imagens ou estilos (no .xlsx, só as strings compartilhadas usadas na
+    coluna são lidas); CSV é lido pelo pandas em chunks e Parquet em lotes
+    só da coluna. CSV e Parquet têm uma única aba (ver listar_abas), e
+    `aba` é ignorada. .xls é lido pelo pandas com usecols.
+    """
+    if _usa_xlsx(file_path):
+        yield from _iter_blocos_xlsx(file_path, aba, coluna, tamanho_bloco)
+        return
+    if _extensao(file_path) in EXTENSOES_ODS:
+        yield from _iter_blocos_ods(file_path, aba, coluna, tamanho_bloco)
+        return
+    if _extensao(file_path) in EXTENSOES_CSV:
+        yield from _sem_vazios_no_fim(_iter_blocos_csv(file_path, coluna, tamanho_bloco), coluna)
+        return
+    if _extensao(file_path) in EXTENSOES_PARQUET:
+        yield from _sem_vazios_no_fim(_iter_blocos_parquet(file_path, coluna, tamanho_bloco), coluna)
+        return
+
+    df = pd.read_excel(file_path, sheet_name=aba, usecols=lambda nome: str(nome).strip() == coluna)
+    if df.columns.empty:
+        raise ValueError(f"A aba '{aba}' não tem a coluna '{coluna}'")
+    df.columns = [coluna]
+    ultima = df[coluna].last_valid_index()
+    df = df.loc[:ultima] if ultima is not None else df.iloc[:0]
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+def ler_nomes(file_path, aba, coluna=COLUNA_NOMES, tamanho_bloco=LINHAS_POR_BLOCO):
+    """DataFrame só com a coluna de nomes de `aba` (ver iter_blocos_nomes)"""
+    blocos = list(iter_blocos_nomes(file_path, aba, coluna, tamanho_bloco))
+    if not blocos:
+        return pd.DataFrame({coluna: []}, dtype=object)
+    return pd.concat(blocos)
+
+# Cor da fonte de cada valor da coluna Status Nome
+CORES_STATUS = {
+    "Nome desatualizado": "FF0000",
+    "Nome válido": "008000",
+    "Possível sinônimo": "FF8C00",
+    "Nome inválido": "8B0000",
+}
+ESTILO_LINK = "Link Reflora"
+
+def _estilo_link(workbook):
+    """Estilo nomeado dos links, registrado uma vez por pasta de trabalho"""
+    if ESTILO_LINK not in workbook.named_styles:
+        estilo = NamedStyle(name=ESTILO_LINK)
+        estilo.font = Font(underline="single", color="0563C1")
+        workbook.add_named_style(estilo)
+    return ESTILO_LINK
+
+def _larguras(df):
+    """Largura de cada coluna: maior texto (ou o cabeçalho) + 2, entre 12 e 80"""
+    larguras = []
+    for col in df.columns:
+        maior = df[col].astype(str).str.len().max() if len(df) else 0
+        larguras.append(min(max(max(int(maior), len(str(col))) + 2, 12), 80))
+    return larguras
+
+def _formatacao_condicional(worksheet, colunas, linhas):
+    """Regras de cor do Status Nome e de destaque das Inconsistências para `linhas` linhas de dados"""
+    ultima = max(linhas + 1, 2)
+
+    # Formatar Status Nome
+    if "Status Nome" in colunas:
+        letra = get_column_letter(colunas.index("Status Nome") + 1)
+        for status, cor in CORES_STATUS.items():
+            worksheet.conditional_formatting.add(
+                f"{letra}2:{letra}{ultima}",
+                CellIsRule(operator="equal", formula=[f'"{status}"'], font=Font(color=cor, bold=True))
+            )
+
+    # Formatar Inconsistências
+    if "Inconsistências" in colunas:
+        letra = get_column_letter(colunas.index("Inconsistências") + 1)
+        worksheet.conditional_formatting.add(
+            f"{letra}2:{letra}{ultima}",
+            FormulaRule(formula=[f'LEN(TRIM({letra}2))>0'],
+                        fill=PatternFill(start_color="FFFFE0", end_color="FFFFE0", fill_type="solid"))
+        )
+
+def formatar_planilha(worksheet, df):
+    """
+    Cores do Status Nome, destaque das Inconsistências, links e larguras.
+    Cores e destaque são regras de formatação condicional (uma por coluna,
+    não um estilo por célula) e os links usam um único estilo nomeado.
+    """
+    _formatacao_condicional(worksheet, list(df.columns), len(df))
+
+    # Formatar Links (só as células com endereço)
+    if "Link Reflora" in df.columns:
+        coluna = df.columns.get_loc("Link Reflora") + 1
+        estilo = _estilo_link(worksheet.parent)
+        com_link = df["Link Reflora"].astype(str).str.contains("http", regex=False).to_numpy().nonzero()[0]
+        for posicao in com_link:
+            worksheet.cell(row=int(posicao) + 2, column=coluna).style = estilo
+
+    # Ajustar largura das colunas
+    for numero, largura in enumerate(_larguras(df), start=1):
+        worksheet.column_dimensions[get_column_letter(numero)].width = largura
+
+# Palavras que indicam a coluna de cada linha quando forma de vida e substrato vêm misturados
+_PALAVRAS_FORMA = re.compile("|".join(map(re.escape, [
+    'Arbusto', 'Árvore', 'Erva', 'Liana', 'Subarbusto', 'Trepadeira', 'Herbácea'])))
+_PALAVRAS_SUBSTRATO = re.compile("|".join(map(re.escape, [
+    'Terrícola', 'Rupícola', 'Epífita', 'Aquática', 'Epifítica'])))
+_TITULOS = ["Forma de Vida", "Substrato"]
+# Itens descartados (comparados em minúsculas)
+_ITENS_DESCARTADOS = ['forma de vida', 'substrato', 'nan']
+_SO_SEPARADORES = re.compile(r'[,\s]*')
+
+def _texto(coluna):
+    """Valores da coluna como texto ("" nos ausentes), indexados pela posição"""
+    coluna = coluna.reset_index(drop=True).astype(object)
+    return coluna.where(coluna.notna(), "").map(str)
+
+def _sem_titulos(coluna):
+    """Tira os títulos das seções e o que sobrar só de vírgulas e espaços"""
+    coluna = coluna.astype(str)
+    coluna = coluna.str.replace("Forma de Vida", "", regex=False).str.replace("Substrato", "", regex=False).str.strip()
+    return coluna.mask(coluna.str.fullmatch(_SO_SEPARADORES), "")
+
+def limpar_forma_vida_substrato(df):
+    """
+    Limpa e separa corretamente forma de vida e substrato, removendo duplicatas.
+
+    Trabalha sobre todas as linhas de uma vez: os textos são quebrados em
+    itens (explode), classificados pelas palavras-chave, deduplicados e
+    juntados de volta por linha da planilha. No fim, tira das duas colunas
+    os títulos das seções que sobraram no texto.
+    """
+    if "Forma de Vida" not in df.columns or "Substrato" not in df.columns:
+        for col in _TITULOS:
+            if col in df.columns:
+                df[col] = _sem_titulos(df[col])
+        return df
+
+    forma = _texto(df["Forma de Vida"])
+    substrato = _texto(df["Substrato"])
+    # Forma de vida vazia e substrato preenchido: o substrato pode trazer as duas coisas, uma por linha
+    misturado = (forma.str.strip() == "") & (substrato.str.strip() != "")
+
+    linhas = substrato[misturado].str.split("\n").explode().str.strip()
+    linhas = linhas[(linhas != "") & ~linhas.isin(_TITULOS)]
+    e_forma = linhas.str.contains(_PALAVRAS_FORMA)
+    sem_palavra = ~e_forma & ~linhas.str.contains(_PALAVRAS_SUBSTRATO)
+    # Sem palavra-chave, vai pela posição: forma de vida se nenhuma linha anterior foi para ela
+    candidata = (e_forma | sem_palavra).astype(int)
+    anteriores = candidata.groupby(level=0).cumsum() - candidata
+    vai_forma = e_forma | (sem_palavra & (anteriores == 0))
+
+    itens = pd.concat([
+        pd.DataFrame({"linha": forma.index[~misturado], "coluna": "Forma de Vida", "texto": forma[~misturado]}),
+        pd.DataFrame({"linha": substrato.index[~misturado], "coluna": "Substrato", "texto": substrato[~misturado]}),
+        pd.DataFrame({"linha": linhas.index, "coluna": vai_forma.map({True: "Forma de Vida", False: "Substrato"}),
+                      "texto": linhas}),
+    ], ignore_index=True)
+    itens = itens.assign(texto=itens["texto"].str.split(",")).explode("texto", ignore_index=True)
+    itens["texto"] = itens["texto"].str.strip()
+    itens["chave"] = itens["texto"].str.lower()
+    itens = itens[(itens["texto"] != "") & ~itens["chave"].isin(_ITENS_DESCARTADOS)]
+    itens = itens.drop_duplicates(["linha", "coluna", "chave"])
+    # Junta os itens de cada linha e coluna concatenando "item, " em grupo (sem um join por grupo)
+    limpos = ((itens["texto"].astype(object) + ", ").groupby([itens["linha"], itens["coluna"]], sort=False).sum()
+              .str[:-2].unstack("coluna").reindex(index=forma.index, columns=_TITULOS).fillna(""))
+
+    # Linhas misturadas só de títulos ficam como estavam
+    tem_forma = misturado & forma.index.isin(linhas.index[vai_forma])
+    tem_substrato = misturado & forma.index.isin(linhas.index[~vai_forma])
+    reescrever = {"Forma de Vida": ~misturado | tem_forma,
+                  "Substrato": ~misturado | tem_forma | tem_substrato}
+    for col, mascara in reescrever.items():
+        valores = df[col].reset_index(drop=True).astype(object).mask(mascara, limpos[col])
+        df[col] = _sem_titulos(valores).set_axis(df.index)
     return df
 
-# Modifique a função salvar_planilha para incluir a limpeza:
+# Mapeamento completo das colunas internas para nomes de exibição
+COL_MAP = {
+    "Nº": "Nº",
+    "Nome Científico": "Nome Científico",
+    "familia": "Família",
+    "autor": "Autor",
+    "reflora_link": "Link Reflora",
+    "Status Nome": "Status Nome",
+    "inconsistencia": "Inconsistências",
+    "distribuicao_geografica": "Distribuição",
+    "dominios_fitogeograficos": "Domínios Fitogeográficos",
+    "tipos_vegetacao": "Tipos de Vegetação",
+    "forma_vida": "Forma de Vida",
+    "substrato": "Substrato",
+    "origem": "Origem",     # Vai garantir que a coluna de origem seja mapeada
+    "endemismo": "Endemismo"   # endemismo tambem
+}
+
+# Ordem das colunas na planilha de resultados
+COL_ORDER = [
+    "Nº",
+    "Nome Científico",
+    "Família",
+    "Autor",
+    "Link Reflora",
+    "Status Nome",
+    "Inconsistências",
+    "Distribuição",
+    "Domínios Fitogeográficos",
+    "Tipos de Vegetação",
+    "Forma de Vida",
+    "Substrato",
+    "Origem",
+    "Endemismo"
+]
 
-def salvar_planilha(dataframes_dict, colunas_personalizadas=None):
-    output_path = filedialog.asksaveasfilename(
+def preparar_resultados(df):
+    """Resultados de uma aba com os nomes de exibição, na ordem da planilha e com forma de vida/substrato limpos"""
+    df = df.rename(columns=COL_MAP)
+    df = df[[col for col in COL_ORDER if col in df.columns]]
+    return limpar_forma_vida_substrato(df)
+
+def escolher_saida(tipos=None):
+    """Pergunta ao usuário onde salvar os resultados ("" se cancelado); `tipos` são os filetypes do diálogo"""
+    return filedialog.asksaveasfilename(
         defaultextension=".xlsx",
-        filetypes=[("Excel files", "*.xlsx *.xlsm")],
+        filetypes=tipos or [("Excel files", "*.xlsx *.xlsm")],
         title="Salvar planilha"
     )
-    if not output_path:
-        return
 
-    # Mapeamento completo das colunas internas para nomes de exibição
-    col_map = {
-        "Nº": "Nº",
-        "Nome Científico": "Nome Científico",
-        "familia": "Família",
-        "autor": "Autor",
-        "reflora_link": "Link Reflora",
-        "Status Nome": "Status Nome",
-        "inconsistencia": "Inconsistências",
-        "distribuicao_geografica": "Distribuição",
-        "dominios_fitogeograficos": "Domínios Fitogeográficos",
-        "tipos_vegetacao": "Tipos de Vegetação",
-        "forma_vida": "Forma de Vida",
-        "substrato": "Substrato",
-        "origem": "Origem",     # Vai garantir que a coluna de origem seja mapeada
-        "endemismo": "Endemismo"   # endemismo tambem
-    }
+def salvar_planilha(dataframes_dict, colunas_personalizadas=None, output_path=None):
+    """
+    Salva os resultados em .xlsx e retorna o caminho gravado (None se cancelado).
+    Sem `output_path`, pergunta o destino ao usuário por um diálogo.
+    """
+    usar_dialogo = output_path is None
+    if usar_dialogo:
+        output_path = escolher_saida()
+    if not output_path:
+        return None
 
     with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
         for sheet_name, df in dataframes_dict.items():
-            # Renomear colunas conforme mapeamento
-            df = df.rename(columns=col_map)
-            
-            # Ordem das colunas (ajustada para incluir Origem e Endemismo)
-            col_order = [
-                "Nº", 
-                "Nome Científico", 
-                "Família", 
-                "Autor",
-                "Link Reflora", 
-                "Status Nome", 
-                "Inconsistências",
-                "Distribuição",           
-                "Domínios Fitogeográficos",  
-                "Tipos de Vegetação",     
-                "Forma de Vida",          
-                "Substrato",
-                "Origem",
-                "Endemismo"
-            ]
-
-            # Filtrar apenas colunas existentes
-            col_order = [col for col in col_order if col in df.columns]
-            
-            # Reordenar colunas
-            df = df[col_order]
-            
-            # Limpeza específica para Forma de Vida e Substrato
-            df = limpar_forma_vida_substrato(df)
-            
-            # Limpeza adicional
-            for col in ["Substrato", "Forma de Vida"]:
-                if col in df.columns:
-                    df[col] = df[col].astype(str)
-                    df[col] = df[col].str.replace("Forma de Vida", "", regex=False)
-                    df[col] = df[col].str.replace("Substrato", "", regex=False)
-                    df[col] = df[col].str.strip()
-                    df[col] = df[col].str.replace(r'^[,\s]*$', '', regex=True)
-            
+            df = preparar_resultados(df)
+
             # Salvar no Excel
             df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
-            
+
             # Formatação
-            workbook = writer.book
-            worksheet = writer.sheets[sheet_name]
-            
-            # Formatar Status Nome
-            if "Status Nome" in df.columns:
-                status_col = df.columns.get_loc("Status Nome") + 1
-                for row in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row, column=status_col)
-                    if cell.value == "Nome desatualizado":
-                        cell.font = Font(color="FF0000", bold=True)
-                    elif cell.value == "Nome válido":
-                        cell.font = Font(color="008000", bold=True)
-                    elif cell.value == "Possível sinônimo":
-                        cell.font = Font(color="FF8C00", bold=True)
-                    elif cell.value == "Nome inválido":
-                        cell.font = Font(color="8B0000", bold=True)
-            
-            # Formatar Links
-            if "Link Reflora" in df.columns:
-                link_col = df.columns.get_loc("Link Reflora") + 1
-                for row in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row, column=link_col)
-                    if "http" in str(cell.value):
-                        cell.style = "Hyperlink"
-                        cell.font = Font(underline="single", color="0563C1")
-            
-            # Formatar Inconsistências
-            if "Inconsistências" in df.columns:
-                inconsist_col = df.columns.get_loc("Inconsistências") + 1
-                for row in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row, column=inconsist_col)
-                    if cell.value and str(cell.value).strip():
-                        cell.fill = PatternFill(start_color="FFFFE0", end_color="FFFFE0", fill_type="solid")
-            
-            # Ajustar largura das colunas
-            for col in worksheet.columns:
-                max_len = 0
-                column_letter = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_len:
-                            max_len = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max(max_len + 2, 12), 80)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-
-    messagebox.showinfo("Sucesso", f"Planilha salva em:\n{output_path}")
\ No newline at end of file
+            formatar_planilha(writer.sheets[sheet_name[:31]], df)
+
+    if usar_dialogo:
+        messagebox.showinfo("Sucesso", f"Planilha salva em:\n{output_path}")
+    return output_path
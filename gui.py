@@ -3,12 +3,25 @@ from tkinter import filedialog, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import threading
-from excel_utils import read_excel, salvar_planilha
-from scraper import fetch_data, cancel_search_event
+from enriquecimento import enriquecer_planilha
+from excel_utils import EXTENSOES_CSV, EXTENSOES_PARQUET, escolher_saida, ler_nomes, listar_abas
+from output_writers import TIPOS_ARQUIVO_SAIDA, abrir_saida
+from scraper import DEFAULT_NAME_CORRECTION, SEARCH_FIELDS, fetch_data, cancel_search_event, local_checklist
+from profiling import ProfilingSession
+from data_reader import DataReader
 from selenium import webdriver
 import webbrowser
 import os
 import pandas as pd
+from datetime import datetime
+
+# Texto de cada modo de correção de grafia (scraper.NAME_CORRECTION_MODES) na interface
+MODOS_CORRECAO_GRAFIA = {
+    "Buscar e sugerir a correção": "suggest",
+    "Não buscar e sugerir a correção": "skip",
+    "Buscar o nome corrigido": "apply",
+    "Não conferir a grafia": "off",
+}
 
 
 class ScraperApp:
@@ -40,6 +53,10 @@ class ScraperApp:
         self.file_path = tk.StringVar()
         self.status_var = tk.StringVar(value="Pronto para buscar")
         self.use_headless = tk.BooleanVar(value=True)
+        self.use_profiling = tk.BooleanVar(value=False)
+        self.name_correction = tk.StringVar(value=next(
+            texto for texto, modo in MODOS_CORRECAO_GRAFIA.items() if modo == DEFAULT_NAME_CORRECTION))
+        self.selected_fields = {campo: tk.BooleanVar(value=True) for campo in SEARCH_FIELDS}
         self.sheet_names = []
         self.dataframes = {}
         self.selected_sheets = []
@@ -120,7 +137,7 @@ class ScraperApp:
 
     def build_gui(self):
         # ===== FRAME PRINCIPAL COM COR DE FUNDO VERDINHA =====
-        self.root.geometry("700x450")  # Largura x Altura
+        self.root.geometry("700x530")  # Largura x Altura
         
         # Frame principal com fundo verdinho clarinho
 
@@ -177,7 +194,29 @@ class ScraperApp:
             text="Executar com navegador oculto (headless)",
             variable=self.use_headless,
             style="Custom.TCheckbutton"                 # Estilo personalizado para checkbox
-        ).grid(row=3, column=0, columnspan=3, sticky="w", pady=5)
+        ).grid(row=3, column=0, columnspan=2, sticky="w", pady=5)
+
+        # Checkbox para gerar arquivos de profiling ao lado da planilha
+        ttk.Checkbutton(
+            main_frame,
+            text="Modo profiling",
+            variable=self.use_profiling,
+            style="Custom.TCheckbutton"
+        ).grid(row=3, column=2, sticky="w", pady=5)
+
+        # O que fazer com um nome de grafia parecida com a de um nome conhecido
+        ttk.Label(
+            main_frame,
+            text="Grafia parecida com a de um nome conhecido:",
+            style="Custom.TLabel"
+        ).grid(row=4, column=0, sticky="w", pady=5)
+        ttk.Combobox(
+            main_frame,
+            textvariable=self.name_correction,
+            values=list(MODOS_CORRECAO_GRAFIA),
+            state="readonly",
+            width=32
+        ).grid(row=4, column=1, columnspan=2, sticky="w", pady=5)
 
         # ===== SEÇÃO DE SELEÇÃO DE ABAS =====
         # Label para seleção de abas
@@ -185,12 +224,12 @@ class ScraperApp:
             main_frame, 
             text="Selecione as abas que deseja processar:",
             style="Custom.TLabel"
-        ).grid(row=4, column=0, columnspan=3, sticky="w")
+        ).grid(row=5, column=0, columnspan=3, sticky="w")
         
         # ===== LISTBOX PERSONALIZADA =====
         # Frame para listbox com scrollbar
         listbox_frame = ttk.Frame(main_frame)
-        listbox_frame.grid(row=5, column=0, columnspan=3, pady=5)
+        listbox_frame.grid(row=6, column=0, columnspan=3, pady=5)
         
         # Listbox com cores personalizadas
         self.sheet_listbox = tk.Listbox(
@@ -224,12 +263,12 @@ class ScraperApp:
             mode='determinate',
             style="Custom.Horizontal.TProgressbar"      # Estilo personalizado da barra
         )
-        self.progress.grid(row=6, column=0, columnspan=3, pady=10)
+        self.progress.grid(row=7, column=0, columnspan=3, pady=10)
 
         # ===== FRAME DE BOTÕES PRINCIPAIS =====
         # Frame centralizado para os botões principais
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=7, column=0, columnspan=3, pady=15, sticky="ew") #mais espaço
+        button_frame.grid(row=8, column=0, columnspan=3, pady=15, sticky="ew") #mais espaço
 
         button_options = {
             'style': "Custom.TButton",
@@ -285,13 +324,37 @@ class ScraperApp:
             style="Custom.TButton"
         ).grid(row=0, column=5, padx=5)
 
+        # Botão para importar o checklist da Flora e Funga do Brasil (consulta offline)
+        ttk.Button(
+            button_frame,
+            text="Importar checklist",
+            command=self.import_checklist,
+            style="Custom.TButton"
+        ).grid(row=1, column=0, padx=5, pady=(10, 0))
+
+        # Botão para escolher os campos buscados (menos campos, menos páginas abertas)
+        ttk.Button(
+            button_frame,
+            text="Campos buscados",
+            command=self.choose_fields,
+            style="Custom.TButton"
+        ).grid(row=1, column=1, padx=5, pady=(10, 0))
+
+        # Botão para gravar os resultados em uma cópia da própria planilha, ao lado de cada nome
+        ttk.Button(
+            button_frame,
+            text="Enriquecer planilha",
+            command=self.run_enrich,
+            style="Custom.TButton"
+        ).grid(row=1, column=2, padx=5, pady=(10, 0))
+
         # Configurar expansão das colunas do button_frame
         for i in range(5):
             button_frame.grid_columnconfigure(i, weight=1)
         
         # Ajustar a barra de status
         status_frame = ttk.Frame(main_frame)
-        status_frame.grid(row=8, column=0, columnspan=3, pady=(15, 0), sticky="ew")
+        status_frame.grid(row=9, column=0, columnspan=3, pady=(15, 0), sticky="ew")
         
         ttk.Label(
             status_frame, 
@@ -367,6 +430,26 @@ class ScraperApp:
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao limpar cache: {e}")
 
+    def import_checklist(self):
+        """Importa um export do checklist (DwC-A ou CSV) para o banco local"""
+        caminho = filedialog.askopenfilename(
+            title="Selecione o checklist da Flora e Funga do Brasil",
+            filetypes=[("Darwin Core Archive ou CSV", "*.zip *.csv *.txt"), ("Todos os arquivos", "*.*")]
+        )
+        if not caminho:
+            return
+        self.status_var.set("Importando checklist...")
+
+        def importar():
+            try:
+                total = local_checklist.importar(caminho)
+                self.status_var.set(f"Checklist importado: {total} nomes")
+            except Exception as e:
+                self.status_var.set("Erro ao importar checklist")
+                messagebox.showerror("Erro", f"Erro ao importar checklist: {e}")
+
+        threading.Thread(target=importar, daemon=True).start()
+
     def show_credits(self):
         """Mostra informações sobre o desenvolvedor"""
         credits = """
@@ -381,16 +464,20 @@ Desenvolvido por: [Antonio MSP Figueiredo]
         messagebox.showinfo("Créditos", credits)
 
     def choose_file(self):
-        """Abre diálogo para seleção de arquivo Excel"""
+        """Abre diálogo para seleção da planilha (Excel, ODS, CSV ou Parquet)"""
         path = filedialog.askopenfilename(
-            title="Selecione a planilha Excel",
-            filetypes=[("Excel files", "*.xlsx *.xlsm *.xls")]
+            title="Selecione a planilha",
+            filetypes=[("Planilhas e listas de nomes",
+                        "*.xlsx *.xlsm *.xls *.ods *.csv *.tsv *.txt *.parquet *.pq"),
+                       ("Excel files", "*.xlsx *.xlsm *.xls"), ("OpenDocument", "*.ods"),
+                       ("CSV", "*.csv *.tsv *.txt"), ("Parquet", "*.parquet *.pq")]
         )
         if path:
             self.file_path.set(path)
             try:
-                self.dataframes = read_excel(path)
-                self.sheet_names = list(self.dataframes.keys())
+                # Só os nomes das abas; o conteúdo das selecionadas é lido ao iniciar a busca
+                self.sheet_names = listar_abas(path)
+                self.dataframes = {}
                 self.sheet_listbox.delete(0, tk.END)
                 for name in self.sheet_names:
                     self.sheet_listbox.insert(tk.END, name)
@@ -416,6 +503,11 @@ Desenvolvido por: [Antonio MSP Figueiredo]
                 f"Foi encontrado um progresso salvo com {len(progress['processed_rows'])} espécies processadas. Deseja continuar de onde parou?"
             )
 
+        # O destino (e o formato, pela extensão) é escolhido antes: os resultados são gravados durante a busca
+        output_path = escolher_saida(TIPOS_ARQUIVO_SAIDA)
+        if not output_path:
+            return
+
         self.selected_sheets = [self.sheet_names[i] for i in selection]
         self.status_var.set("Iniciando busca...")
         self.progress_value.set(0)
@@ -424,54 +516,206 @@ Desenvolvido por: [Antonio MSP Figueiredo]
 
         threading.Thread(
             target=self._process_sheets, 
-            args=(resume,),  # Passar a flag de continuar
+            args=(resume, output_path),  # Passar a flag de continuar
             daemon=True
         ).start()
 
-    def _process_sheets(self):
-        """Processa as abas selecionadas"""
-        resultados = {}
+    def _new_profiler(self):
+        """Cria a sessão de profiling se o modo estiver ativado"""
+        return ProfilingSession() if self.use_profiling.get() else None
+
+    def _save_profiling(self, profiler, output_path):
+        """Grava os arquivos de profiling ao lado da planilha salva"""
+        if output_path:
+            base_path = os.path.splitext(output_path)[0]
+        else:
+            base_path = f"reflora_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        arquivos = profiler.save(base_path)
+        print("Arquivos de profiling: " + ", ".join(arquivos))
+
+    def _name_correction(self):
+        """Modo de correção de grafia escolhido na interface"""
+        return MODOS_CORRECAO_GRAFIA[self.name_correction.get()]
+
+    def _fields(self):
+        """Campos marcados na janela de campos buscados"""
+        return tuple(campo for campo, marcado in self.selected_fields.items() if marcado.get())
+
+    def choose_fields(self):
+        """Abre uma janela para marcar os campos que a busca deve coletar"""
+        fields_window = tk.Toplevel(self.root)
+        fields_window.title("Campos buscados")
+        fields_window.configure(bg=self.colors['light'])
+        fields_window.resizable(False, False)
+        fields_window.transient(self.root)
+        fields_window.grab_set()
+
+        ttk.Label(
+            fields_window,
+            text="Campos a coletar (Origem e Endemismo abrem uma página a mais por espécie):",
+            style="Custom.TLabel"
+        ).grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+
+        for i, (campo, coluna) in enumerate(SEARCH_FIELDS.items()):
+            ttk.Checkbutton(
+                fields_window,
+                text=coluna,
+                variable=self.selected_fields[campo],
+                style="Custom.TCheckbutton"
+            ).grid(row=1 + i // 2, column=i % 2, padx=10, pady=2, sticky="w")
+
+        def confirmar():
+            if not self._fields():
+                messagebox.showwarning("Aviso", "Selecione ao menos um campo.", parent=fields_window)
+                return
+            fields_window.destroy()
+
+        ttk.Button(
+            fields_window,
+            text="OK",
+            command=confirmar,
+            style="Custom.TButton"
+        ).grid(row=2 + len(SEARCH_FIELDS) // 2, column=0, columnspan=2, pady=10)
+        fields_window.protocol("WM_DELETE_WINDOW", confirmar)
+
+    def _report_telemetry(self):
+        """Mostra no console os fallbacks usados e avisa sobre mudanças de layout"""
+        telemetria = DataReader.TELEMETRIA
+        print(telemetria.resumo_texto())
+        if telemetria.alertas:
+            messagebox.showwarning(
+                "Possível mudança no site",
+                "\n\n".join(alerta["mensagem"] for alerta in telemetria.alertas)
+            )
+
+    def _process_sheets(self, resume=False, output_path=None):
+        """Processa as abas selecionadas, gravando os resultados em `output_path` durante a busca"""
+        profiler = self._new_profiler()
+        DataReader.TELEMETRIA.reset()
         try:
+            for sheet_name in self.selected_sheets:
+                if sheet_name not in self.dataframes:
+                    self.status_var.set(f"Lendo aba '{sheet_name}'...")
+                    self.dataframes[sheet_name] = ler_nomes(self.file_path.get(), sheet_name)
+
             total_species = sum(len(self.dataframes[sheet]) for sheet in self.selected_sheets)
             processed_species = 0
-            
-            for sheet_name in self.selected_sheets:
-                self.status_var.set(f"Processando aba '{sheet_name}'...")
-                df = self.dataframes[sheet_name]
+            # Fechar a saída (também ao cancelar ou em erro) grava o que já foi buscado
+            with abrir_saida(output_path) as saida:
+                for sheet_name in self.selected_sheets:
+                    self.status_var.set(f"Processando aba '{sheet_name}'...")
+                    df = self.dataframes[sheet_name]
                 
-                def progress_callback(current, total, name, elapsed, remaining):
-                    nonlocal processed_species
-                    processed_species = current
-                    percent = int((processed_species / total_species) * 100)
-                    self.progress_value.set(percent)
-                    self.update_progress_color()
-                    self.status_var.set(
-                        f"Processando: {name} ({current}/{total_species}) | "
-                        f"Tempo decorrido: {elapsed:.1f}s | "
-                        f"Estimado: {remaining:.1f}s"
-                    )
-                    self.root.update_idletasks()
+                    def progress_callback(current, total, name, elapsed, remaining):
+                        nonlocal processed_species
+                        processed_species = current
+                        percent = int((processed_species / total_species) * 100)
+                        self.progress_value.set(percent)
+                        self.update_progress_color()
+                        self.status_var.set(
+                            f"Processando: {name} ({current}/{total_species}) | "
+                            f"Tempo decorrido: {elapsed:.1f}s | "
+                            f"Estimado: {remaining:.1f}s"
+                        )
+                        self.root.update_idletasks()
                 
-                resultados[sheet_name] = fetch_data(
-                    df, 
-                    headless=self.use_headless.get(),
-                    cancel_event=cancel_search_event,
-                    callback=progress_callback,
-                    resume=resume  # Passar a flag para o scraper
-                )
+                    fetch_data(
+                        df, 
+                        headless=self.use_headless.get(),
+                        cancel_event=cancel_search_event,
+                        callback=progress_callback,
+                        resume=resume,  # Passar a flag para o scraper
+                        profiler=profiler,
+                        name_correction=self._name_correction(),
+                        fields=self._fields(),
+                        writer=saida.aba(sheet_name)
+                    )
                 
-                if resume:
-                    # Se estava continuando, desativa a flag após a primeira execução
-                    resume = False
+                    if resume:
+                        # Se estava continuando, desativa a flag após a primeira execução
+                        resume = False
                     
-                if cancel_search_event.is_set():
-                    self.status_var.set("Processo cancelado pelo usuário.")
-                    return
+                    if cancel_search_event.is_set():
+                        break
+
+                self.status_var.set("Salvando resultados...")
 
+            if cancel_search_event.is_set():
+                self.status_var.set(f"Processo cancelado pelo usuário. Resultados parciais salvos em {output_path}")
+                return
 
+            messagebox.showinfo("Sucesso", f"Resultados salvos em:\n{output_path}")
+            if profiler:
+                self._save_profiling(profiler, output_path)
+            self._report_telemetry()
+            self.progress_value.set(100)
+            self.update_progress_color()
+            self.status_var.set("Busca concluída com sucesso!")
 
-            self.status_var.set("Salvando resultados...")
-            salvar_planilha(resultados)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Ocorreu um erro: {e}")
+            self.status_var.set("Erro no processamento.")
+
+    def run_enrich(self):
+        """Busca os nomes das abas selecionadas e grava uma cópia da planilha com os resultados"""
+        selection = self.sheet_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Aviso", "Selecione pelo menos uma aba para processar.")
+            return
+
+        if os.path.splitext(self.file_path.get())[1].lower() in EXTENSOES_CSV + EXTENSOES_PARQUET:
+            messagebox.showwarning("Aviso", "O enriquecimento só funciona com planilhas (.xlsx, .xls, .ods).")
+            return
+
+        output_path = escolher_saida()
+        if not output_path:
+            return
+
+        abas = [self.sheet_names[i] for i in selection]
+        self.status_var.set("Iniciando busca...")
+        self.progress_value.set(0)
+        self.update_progress_color()
+        cancel_search_event.clear()
+
+        threading.Thread(target=self._enrich_sheets, args=(abas, output_path), daemon=True).start()
+
+    def _enrich_sheets(self, abas, output_path):
+        """Busca cada nome distinto uma vez e junta os resultados a todas as linhas das `abas`"""
+        profiler = self._new_profiler()
+        DataReader.TELEMETRIA.reset()
+        try:
+            def progress_callback(current, total, name, elapsed, remaining):
+                percent = int((current / total) * 100)
+                self.progress_value.set(percent)
+                self.update_progress_color()
+                self.status_var.set(
+                    f"Processando: {name} ({current}/{total} nomes distintos) | "
+                    f"Tempo decorrido: {elapsed:.1f}s | "
+                    f"Estimado: {remaining:.1f}s"
+                )
+                self.root.update_idletasks()
+
+            self.status_var.set("Lendo planilha...")
+            enriquecer_planilha(
+                self.file_path.get(),
+                abas,
+                output_path,
+                headless=self.use_headless.get(),
+                cancel_event=cancel_search_event,
+                callback=progress_callback,
+                profiler=profiler,
+                name_correction=self._name_correction(),
+                fields=self._fields()
+            )
+
+            if cancel_search_event.is_set():
+                self.status_var.set(f"Processo cancelado pelo usuário. Resultados parciais salvos em {output_path}")
+                return
+
+            messagebox.showinfo("Sucesso", f"Planilha enriquecida salva em:\n{output_path}")
+            if profiler:
+                self._save_profiling(profiler, output_path)
+            self._report_telemetry()
             self.progress_value.set(100)
             self.update_progress_color()
             self.status_var.set("Busca concluída com sucesso!")
@@ -540,6 +784,10 @@ Desenvolvido por: [Antonio MSP Figueiredo]
                 messagebox.showwarning("Aviso", "A entrada não contém nomes válidos.")
                 return
 
+            output_path = escolher_saida(TIPOS_ARQUIVO_SAIDA)
+            if not output_path:
+                return
+
             df = pd.DataFrame({"Nome Científico": nomes})
             self.status_var.set("Iniciando busca manual...")
             self.progress_value.set(0)
@@ -549,7 +797,7 @@ Desenvolvido por: [Antonio MSP Figueiredo]
             # Rodar a busca manual em nova thread
             threading.Thread(
                 target=self.run_manual_fetch, 
-                args=(df,),
+                args=(df, output_path),
                 daemon=True
             ).start()
 
@@ -572,8 +820,10 @@ Desenvolvido por: [Antonio MSP Figueiredo]
             style="Custom.TButton"                      # Verde oliva claro
         ).grid(row=0, column=1, padx=5)
 
-    def run_manual_fetch(self, df_manual):
-        """Processa nomes inseridos manualmente"""
+    def run_manual_fetch(self, df_manual, output_path):
+        """Processa nomes inseridos manualmente, gravando os resultados em `output_path` durante a busca"""
+        profiler = self._new_profiler()
+        DataReader.TELEMETRIA.reset()
         try:
             total = len(df_manual)
 
@@ -588,19 +838,27 @@ Desenvolvido por: [Antonio MSP Figueiredo]
                 )
                 self.root.update_idletasks()
 
-            resultados = {"Consulta Manual": fetch_data(
-                df_manual,
-                headless=self.use_headless.get(),
-                cancel_event=cancel_search_event,
-                callback=progress_callback
-            )}
+            with abrir_saida(output_path) as saida:
+                fetch_data(
+                    df_manual,
+                    headless=self.use_headless.get(),
+                    cancel_event=cancel_search_event,
+                    callback=progress_callback,
+                    profiler=profiler,
+                    name_correction=self._name_correction(),
+                    fields=self._fields(),
+                    writer=saida.aba("Consulta Manual")
+                )
+                self.status_var.set("Salvando resultados...")
 
             if cancel_search_event.is_set():
-                self.status_var.set("Busca manual cancelada.")
+                self.status_var.set(f"Busca manual cancelada. Resultados parciais salvos em {output_path}")
                 return
 
-            self.status_var.set("Salvando resultados...")
-            salvar_planilha(resultados)
+            messagebox.showinfo("Sucesso", f"Resultados salvos em:\n{output_path}")
+            if profiler:
+                self._save_profiling(profiler, output_path)
+            self._report_telemetry()
             self.progress_value.set(100)
             self.update_progress_color()
             self.status_var.set("Busca manual concluída com sucesso!")
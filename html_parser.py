@@ -0,0 +1,171 @@
+# html_parser.py
+"""
+Backends de parsing de HTML usados pelo DataReader.
+
+Cada backend sabe parsear uma página e ler os blocos de texto da seção de
+forma de vida/substrato. O mais rápido instalado é escolhido ao importar o
+módulo (selectolax, depois lxml, depois o html.parser da biblioteca padrão);
+todos devolvem exatamente o mesmo texto (ver benchmarks/bench_html_parser.py).
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Parser do BeautifulSoup para árvores completas (PageSnapshot)
+PARSER_BS4 = "lxml" if lxml is not None else "html.parser"
+
+# Elementos cujo conteúdo não entra no texto (como no get_text do BeautifulSoup)
+_SEM_TEXTO = {"script", "style", "template"}
+
+
+def _juntar_textos(textos) -> str:
+    """Equivale a get_text(separator='\\n', strip=True) do BeautifulSoup"""
+    return "\n".join(texto for texto in (t.strip() for t in textos) if texto)
+
+
+class BackendHTML(ABC):
+    """
+    Interface dos backends.
+
+    parse(html) devolve a árvore do backend; blocos(arvore, id_container,
+    classes) devolve {classe: texto} para cada classe cujo primeiro <div>
+    dentro do elemento `id_container` existe e tem uma quebra <br>. O texto é
+    o de cada nó de texto do <div>, sem espaços nas pontas, um por linha.
+    """
+
+    nome = ""
+
+    @abstractmethod
+    def parse(self, html: str):
+        """Árvore do backend para `html`"""
+
+    @abstractmethod
+    def blocos(self, arvore, id_container: str, classes) -> Dict[str, str]:
+        """{classe: texto} dos blocos de `classes` dentro de `id_container`"""
+
+    def blocos_html(self, html: str, id_container: str, classes) -> Dict[str, str]:
+        return self.blocos(self.parse(html or ""), id_container, classes)
+
+
+class BackendBeautifulSoup(BackendHTML):
+    """BeautifulSoup com o html.parser da biblioteca padrão (sempre disponível)"""
+
+    nome = "html.parser"
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, "html.parser")
+
+    def blocos(self, arvore, id_container, classes):
+        container = arvore.find(id=id_container)
+        if container is None:
+            return {}
+        encontrados = {}
+        for classe in classes:
+            div = container.find("div", class_=classe)
+            if div is not None and div.find("br") is not None:
+                encontrados[classe] = div.get_text(separator="\n", strip=True)
+        return encontrados
+
+
+class BackendLxml(BackendHTML):
+    """lxml.html direto, sem a camada do BeautifulSoup"""
+
+    nome = "lxml"
+
+    def parse(self, html: str):
+        if not html.strip():
+            return None
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # Texto com declaração de encoding não é aceito como str
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+
+    @staticmethod
+    def _textos(el, textos):
+        if el.tag is etree.Comment or el.tag is etree.ProcessingInstruction:
+            return
+        if el.tag in _SEM_TEXTO:
+            return
+        if el.text:
+            textos.append(el.text)
+        for filho in el:
+            BackendLxml._textos(filho, textos)
+            if filho.tail:
+                textos.append(filho.tail)
+
+    def blocos(self, arvore, id_container, classes):
+        if arvore is None:
+            return {}
+        container = arvore.xpath("//*[@id=$id]", id=id_container)
+        if not container:
+            return {}
+        encontrados = {}
+        for classe in classes:
+            div = container[0].xpath(
+                ".//div[contains(concat(' ', normalize-space(@class), ' '), $classe)]",
+                classe=f" {classe} "
+            )
+            if div and div[0].find(".//br") is not None:
+                textos = []
+                self._textos(div[0], textos)
+                encontrados[classe] = _juntar_textos(textos)
+        return encontrados
+
+
+class BackendSelectolax(BackendHTML):
+    """selectolax (engine Lexbor), o mais rápido"""
+
+    nome = "selectolax"
+
+    def parse(self, html: str):
+        return LexborHTMLParser(html)
+
+    def blocos(self, arvore, id_container, classes):
+        container = arvore.css_first(f"#{id_container}")
+        if container is None:
+            return {}
+        encontrados = {}
+        for classe in classes:
+            div = container.css_first(f"div.{classe}")
+            if div is None or div.css_first("br") is None:
+                continue
+            textos = [
+                no.text_content for no in div.traverse(include_text=True)
+                if no.is_text_node and no.parent.tag not in _SEM_TEXTO
+            ]
+            encontrados[classe] = _juntar_textos(textos)
+        return encontrados
+
+
+def backends_disponiveis() -> Dict[str, BackendHTML]:
+    """Backends instalados, do mais rápido para o mais lento"""
+    backends = {}
+    if LexborHTMLParser is not None:
+        backends[BackendSelectolax.nome] = BackendSelectolax()
+    if lxml is not None:
+        backends[BackendLxml.nome] = BackendLxml()
+    backends[BackendBeautifulSoup.nome] = BackendBeautifulSoup()
+    return backends
+
+
+def escolher_backend(nome: Optional[str] = None) -> BackendHTML:
+    """O backend `nome` ou, sem nome, o mais rápido instalado"""
+    backends = backends_disponiveis()
+    if nome is None:
+        return next(iter(backends.values()))
+    if nome not in backends:
+        raise ValueError(f"Parser HTML '{nome}' não disponível (instalados: {', '.join(backends)})")
+    return backends[nome]
@@ -0,0 +1,182 @@
+# name_index.py
+import csv
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import List, NamedTuple, Optional
+
+from data_reader import normalizar_texto
+
+NAME_INDEX_FILE = "name_index.json"
+# Similaridade mínima de trigramas para um nome virar candidato
+MIN_SIMILARIDADE_TRIGRAMAS = 0.5
+# Colunas aceitas como nome científico em um checklist CSV
+COLUNAS_CHECKLIST = ("Nome Científico", "scientificName", "nome", "name")
+
+
+class Correcao(NamedTuple):
+    original: str
+    sugestao: str
+    distancia: int
+    # Outros nomes à mesma distância (correção ambígua se houver algum)
+    alternativas: tuple = ()
+
+    @property
+    def ambigua(self) -> bool:
+        return bool(self.alternativas)
+
+
+def _chave(nome: str) -> str:
+    return " ".join(normalizar_texto(nome).split())
+
+
+def _trigramas(chave: str) -> set:
+    texto = f"  {chave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def distancia_edicao(a: str, b: str, limite: int) -> int:
+    """Distância de Levenshtein entre `a` e `b`, ou `limite` + 1 se passar do limite"""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1] if anterior[-1] <= limite else limite + 1
+
+
+def distancia_maxima(chave: str) -> int:
+    """Erros de grafia tolerados: 1 em nomes curtos, 2 a partir de 16 caracteres"""
+    return 1 if len(chave) < 16 else 2
+
+
+class IndiceNomes:
+    """
+    Índice local de nomes científicos para corrigir erros de grafia sem
+    acessar o Reflora.
+
+    Guarda todo nome que já foi encontrado em uma busca e os nomes de um
+    checklist importado. A busca aproximada usa um índice invertido de
+    trigramas para achar candidatos e a distância de edição para escolher
+    entre eles, ignorando maiúsculas e acentos.
+    """
+
+    def __init__(self, caminho=NAME_INDEX_FILE):
+        self.caminho = caminho
+        self._nomes = {}
+        self._origens = {}
+        self._n_trigramas = {}
+        self._postings = defaultdict(set)
+        self._carregado = False
+        self._alterado = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def __contains__(self, nome):
+        return _chave(nome) in self._nomes
+
+    def _adicionar(self, nome, origem):
+        chave = _chave(nome)
+        if not chave or chave in self._nomes:
+            return False
+        self._nomes[chave] = nome
+        self._origens[chave] = origem
+        trigramas = _trigramas(chave)
+        self._n_trigramas[chave] = len(trigramas)
+        for trigrama in trigramas:
+            self._postings[trigrama].add(chave)
+        self._alterado = True
+        return True
+
+    def adicionar(self, nome: str, origem: str = "busca") -> bool:
+        with self._lock:
+            return self._adicionar(nome.strip(), origem)
+
+    def importar(self, caminho: str) -> int:
+        """
+        Importa um checklist: texto com um nome por linha ou CSV com uma das
+        COLUNAS_CHECKLIST. Retorna quantos nomes novos entraram no índice.
+        """
+        with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+            conteudo = f.read()
+        linhas = conteudo.splitlines()
+        nomes = [linha for linha in linhas if linha.strip() not in COLUNAS_CHECKLIST]
+        if linhas:
+            try:
+                dialeto = csv.Sniffer().sniff(linhas[0], delimiters=",;\t")
+            except csv.Error:
+                dialeto = None
+            if dialeto is not None:
+                leitor = csv.DictReader(linhas, dialect=dialeto)
+                coluna = next((c for c in COLUNAS_CHECKLIST if c in (leitor.fieldnames or ())), None)
+                if coluna is not None:
+                    nomes = [linha[coluna] or "" for linha in leitor]
+
+        with self._lock:
+            return sum(1 for nome in nomes if len(nome.split()) >= 2 and self._adicionar(nome.strip(), "checklist"))
+
+    def buscar(self, nome: str, limite: int = 5) -> List[tuple]:
+        """Até `limite` nomes parecidos com `nome`: [(nome, distância)], do mais próximo ao mais distante"""
+        chave = _chave(nome)
+        trigramas = _trigramas(chave)
+        tolerancia = distancia_maxima(chave)
+        with self._lock:
+            comuns = Counter()
+            for trigrama in trigramas:
+                comuns.update(self._postings.get(trigrama, ()))
+
+            encontrados = []
+            for candidato, n in comuns.items():
+                # Coeficiente de Dice entre os conjuntos de trigramas
+                if 2 * n / (len(trigramas) + self._n_trigramas[candidato]) < MIN_SIMILARIDADE_TRIGRAMAS:
+                    continue
+                distancia = distancia_edicao(chave, candidato, tolerancia)
+                if distancia <= tolerancia:
+                    encontrados.append((distancia, self._nomes[candidato]))
+        encontrados.sort()
+        return [(candidato, distancia) for distancia, candidato in encontrados[:limite]]
+
+    def corrigir(self, nome: str) -> Optional[Correcao]:
+        """Correção de grafia para `nome`, ou None se ele já está no índice ou nada é parecido"""
+        if nome in self:
+            return None
+        parecidos = self.buscar(nome)
+        if not parecidos:
+            return None
+        sugestao, distancia = parecidos[0]
+        alternativas = tuple(outro for outro, d in parecidos[1:] if d == distancia)
+        return Correcao(nome, sugestao, distancia, alternativas)
+
+    def carregar(self):
+        """Lê o índice salvo (uma única vez por processo)"""
+        with self._lock:
+            if self._carregado:
+                return
+            self._carregado = True
+            if not os.path.exists(self.caminho):
+                return
+            try:
+                with open(self.caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                return
+            for nome, origem in dados.get("nomes", {}).items():
+                self._adicionar(nome, origem)
+            self._alterado = False
+
+    def salvar(self):
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {"nomes": {self._nomes[chave]: self._origens[chave] for chave in sorted(self._nomes)}}
+            self._alterado = False
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
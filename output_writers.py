@@ -0,0 +1,347 @@
+"""
+Gravação dos resultados em xlsx, CSV, Parquet ou SQLite.
+
+Todos os formatos têm a mesma interface incremental: saida.aba(nome) é o
+`writer` que scraper.fetch_data alimenta linha a linha, as linhas são
+gravadas em lotes (LINHAS_POR_LOTE_SAIDA) com as colunas de exibição e a
+ordem da planilha (excel_utils.COL_MAP/COL_ORDER) e close() finaliza o
+arquivo. Enquanto ele não é finalizado, toda linha recebida também vai para
+um diário CSV ao lado da saída (<saída>.parcial.csv), apagado no close().
+
+Na planilha cada aba de entrada vira uma aba; nos demais formatos todas as
+abas vão para uma única tabela, com a coluna "Aba" na frente.
+"""
+import csv
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from excel_utils import (
+    COL_MAP, COL_ORDER, _estilo_link, _formatacao_condicional, _larguras, preparar_resultados, salvar_planilha
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Linhas acumuladas antes de cada gravação no arquivo de saída
+LINHAS_POR_LOTE_SAIDA = 500
+COLUNA_ABA = "Aba"
+# Colunas com poucos valores distintos, gravadas como categorias (dicionário) no Parquet
+COLUNAS_CATEGORICAS = [
+    COLUNA_ABA, "Família", "Status Nome", "Domínios Fitogeográficos", "Tipos de Vegetação",
+    "Forma de Vida", "Substrato", "Origem", "Endemismo"
+]
+TABELA_SQLITE = "resultados"
+
+
+class _Aba:
+    """Uma aba de uma SaidaIncremental; é o `writer` passado a scraper.fetch_data"""
+
+    def __init__(self, saida, nome):
+        self.saida = saida
+        self.nome = nome
+        self.linhas = 0
+        self.colunas = None
+        self._pendentes = []
+
+    def escrever(self, linhas):
+        """Recebe linhas de resultado (dicionários coluna → valor, como as de fetch_data)"""
+        if not linhas:
+            return
+        self.saida._anotar(self.nome, linhas)
+        self._pendentes.extend(linhas)
+        if len(self._pendentes) >= self.saida.lote:
+            self.descarregar()
+
+    def descarregar(self):
+        if not self._pendentes:
+            return
+        df = preparar_resultados(pd.DataFrame(self._pendentes))
+        self._pendentes = []
+        if self.colunas is None:
+            self.colunas = list(df.columns)
+        df = df.reindex(columns=self.colunas)
+        self.saida._gravar(self, df)
+        self.linhas += len(df)
+
+
+class SaidaIncremental(ABC):
+    """
+    Base dos formatos de saída. As subclasses implementam _gravar(aba, df),
+    chamado com cada lote já com as colunas de exibição, e _finalizar().
+    """
+
+    extensao = ""
+
+    def __init__(self, output_path, lote=LINHAS_POR_LOTE_SAIDA):
+        self.output_path = output_path
+        self.lote = max(1, lote)
+        self.diario = os.path.splitext(output_path)[0] + ".parcial.csv"
+        self._abas = {}
+        self._fechada = False
+        self._arquivo_diario = open(self.diario, 'w', encoding='utf-8-sig', newline='')
+        self._diario = csv.DictWriter(self._arquivo_diario, fieldnames=[COLUNA_ABA] + COL_ORDER,
+                                      extrasaction="ignore")
+        self._diario.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def aba(self, nome):
+        if nome not in self._abas:
+            self._abas[nome] = _Aba(self, nome)
+        return self._abas[nome]
+
+    @property
+    def linhas(self):
+        return sum(aba.linhas + len(aba._pendentes) for aba in self._abas.values())
+
+    def _anotar(self, nome, linhas):
+        self._diario.writerows({COLUNA_ABA: nome, **{COL_MAP.get(coluna, coluna): valor for coluna, valor in linha.items()}}
+                               for linha in linhas)
+        self._arquivo_diario.flush()
+
+    @abstractmethod
+    def _gravar(self, aba, df):
+        """Grava no arquivo de saída um lote `df` da `aba`"""
+
+    @abstractmethod
+    def _finalizar(self):
+        """Fecha o arquivo de saída depois do último lote"""
+
+    def close(self):
+        """
+        Grava as linhas pendentes, finaliza o arquivo e apaga o diário. Se a
+        finalização falha, o diário fica no disco com todas as linhas recebidas.
+        """
+        if self._fechada:
+            return
+        self._fechada = True
+        finalizado = False
+        try:
+            for aba in self._abas.values():
+                aba.descarregar()
+            self._finalizar()
+            finalizado = True
+        finally:
+            self._arquivo_diario.close()
+            if finalizado:
+                os.remove(self.diario)
+            else:
+                print(f"Erro ao finalizar {self.output_path}: "
+                      f"as linhas recebidas foram mantidas em {self.diario}")
+
+
+class SaidaXlsx(SaidaIncremental):
+    """
+    Planilha .xlsx em modo write-only do openpyxl: as linhas vão para o disco
+    a cada lote, sem manter a pasta de trabalho em memória. As larguras vêm
+    do primeiro lote de cada aba (têm de ser gravadas antes da primeira
+    linha) e a formatação condicional é fechada no close().
+    """
+
+    extensao = ".xlsx"
+
+    def __init__(self, output_path, lote=LINHAS_POR_LOTE_SAIDA):
+        super().__init__(output_path, lote)
+        self._workbook = Workbook(write_only=True)
+        self._estilo_link = _estilo_link(self._workbook)
+        self._worksheets = {}
+
+    def _gravar(self, aba, df):
+        worksheet = self._worksheets.get(aba.nome)
+        if worksheet is None:
+            worksheet = self._worksheets[aba.nome] = self._workbook.create_sheet(aba.nome[:31])
+            for numero, largura in enumerate(_larguras(df), start=1):
+                worksheet.column_dimensions[get_column_letter(numero)].width = largura
+            worksheet.append(aba.colunas)
+
+        link = aba.colunas.index("Link Reflora") if "Link Reflora" in aba.colunas else None
+        for valores in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            valores = list(valores)
+            if link is not None and "http" in str(valores[link] or ""):
+                celula = WriteOnlyCell(worksheet, value=valores[link])
+                celula.style = self._estilo_link
+                valores[link] = celula
+            worksheet.append(valores)
+
+    def _finalizar(self):
+        for aba in self._abas.values():
+            if aba.nome in self._worksheets:
+                _formatacao_condicional(self._worksheets[aba.nome], aba.colunas, aba.linhas)
+        if not self._worksheets:
+            self._workbook.create_sheet("Resultados")
+        self._workbook.save(self.output_path)
+
+
+def _com_aba(aba, df):
+    df = df.copy()
+    df.insert(0, COLUNA_ABA, aba.nome)
+    return df
+
+
+class SaidaCsv(SaidaIncremental):
+    """CSV (UTF-8, separado por vírgulas) gravado e descarregado no disco a cada lote"""
+
+    extensao = ".csv"
+
+    def __init__(self, output_path, lote=LINHAS_POR_LOTE_SAIDA):
+        super().__init__(output_path, lote)
+        self._arquivo = open(output_path, 'w', encoding='utf-8', newline='')
+        self._colunas = None
+
+    def _gravar(self, aba, df):
+        df = _com_aba(aba, df)
+        if self._colunas is None:
+            self._colunas = list(df.columns)
+            df.to_csv(self._arquivo, index=False)
+        else:
+            df.reindex(columns=self._colunas).to_csv(self._arquivo, index=False, header=False)
+        self._arquivo.flush()
+
+    def _finalizar(self):
+        self._arquivo.close()
+
+
+class SaidaParquet(SaidaIncremental):
+    """
+    Parquet com um row group por lote. As COLUNAS_CATEGORICAS são gravadas
+    com codificação de dicionário e voltam como categorias no pandas.
+    """
+
+    extensao = ".parquet"
+
+    def __init__(self, output_path, lote=LINHAS_POR_LOTE_SAIDA):
+        if pq is None:
+            raise ValueError("A saída em Parquet requer o pacote pyarrow")
+        super().__init__(output_path, lote)
+        self._writer = None
+
+    def _esquema(self, df):
+        campos = []
+        for coluna in df.columns:
+            if coluna == "Nº":
+                tipo = pa.int64()
+            elif coluna in COLUNAS_CATEGORICAS:
+                tipo = pa.dictionary(pa.int32(), pa.string())
+            else:
+                tipo = pa.string()
+            campos.append(pa.field(coluna, tipo))
+        return pa.schema(campos)
+
+    def _gravar(self, aba, df):
+        df = _com_aba(aba, df)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.output_path, self._esquema(df))
+        df = df.reindex(columns=self._writer.schema.names)
+        for coluna in df.columns:
+            if coluna in COLUNAS_CATEGORICAS:
+                df[coluna] = df[coluna].astype("category")
+            elif coluna != "Nº":
+                df[coluna] = df[coluna].astype(object).where(df[coluna].notna(), None)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False))
+
+    def _finalizar(self):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.output_path, pa.schema([pa.field(COLUNA_ABA, pa.string())]))
+        self._writer.close()
+
+
+class SaidaSqlite(SaidaIncremental):
+    """
+    Banco SQLite com uma tabela TABELA_SQLITE (recriada a cada busca) e um
+    índice pelo nome científico; cada lote é gravado em uma transação.
+    """
+
+    extensao = ".sqlite"
+
+    def __init__(self, output_path, lote=LINHAS_POR_LOTE_SAIDA):
+        super().__init__(output_path, lote)
+        self._conexao = sqlite3.connect(output_path)
+        self._colunas = None
+
+    def _criar_tabela(self, colunas):
+        definicoes = ", ".join(f'"{coluna}" {"INTEGER" if coluna == "Nº" else "TEXT"}' for coluna in colunas)
+        with self._conexao:
+            self._conexao.execute(f'DROP TABLE IF EXISTS "{TABELA_SQLITE}"')
+            self._conexao.execute(f'CREATE TABLE "{TABELA_SQLITE}" ({definicoes})')
+            if "Nome Científico" in colunas:
+                self._conexao.execute(
+                    f'CREATE INDEX "{TABELA_SQLITE}_nome" ON "{TABELA_SQLITE}" ("Nome Científico")')
+
+    def _gravar(self, aba, df):
+        df = _com_aba(aba, df)
+        if self._colunas is None:
+            self._colunas = list(df.columns)
+            self._criar_tabela(self._colunas)
+        df = df.reindex(columns=self._colunas)
+        linhas = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        nomes = ", ".join(f'"{coluna}"' for coluna in self._colunas)
+        marcadores = ", ".join("?" * len(self._colunas))
+        with self._conexao:
+            self._conexao.executemany(f'INSERT INTO "{TABELA_SQLITE}" ({nomes}) VALUES ({marcadores})', linhas)
+
+    def _finalizar(self):
+        self._conexao.close()
+
+
+FORMATOS_SAIDA = {
+    "xlsx": SaidaXlsx,
+    "csv": SaidaCsv,
+    "parquet": SaidaParquet,
+    "sqlite": SaidaSqlite,
+}
+# Extensões reconhecidas de cada formato (a primeira é a padrão)
+EXTENSOES_SAIDA = {
+    "xlsx": (".xlsx", ".xlsm"),
+    "csv": (".csv",),
+    "parquet": (".parquet", ".pq"),
+    "sqlite": (".sqlite", ".sqlite3", ".db"),
+}
+# Tipos de arquivo do diálogo de salvar, na ordem dos formatos
+TIPOS_ARQUIVO_SAIDA = [
+    ("Excel files", "*.xlsx *.xlsm"),
+    ("CSV", "*.csv"),
+    ("Parquet", "*.parquet *.pq"),
+    ("SQLite", "*.sqlite *.sqlite3 *.db"),
+]
+DEFAULT_FORMATO_SAIDA = "xlsx"
+
+
+def formato_saida(output_path):
+    """Formato indicado pela extensão de `output_path` (xlsx se não for conhecida)"""
+    extensao = os.path.splitext(output_path)[1].lower()
+    for formato, extensoes in EXTENSOES_SAIDA.items():
+        if extensao in extensoes:
+            return formato
+    return DEFAULT_FORMATO_SAIDA
+
+
+def abrir_saida(output_path, formato=None, lote=LINHAS_POR_LOTE_SAIDA):
+    """SaidaIncremental do `formato` (pela extensão de `output_path` se omitido)"""
+    formato = formato or formato_saida(output_path)
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída desconhecido: {formato} (use {', '.join(FORMATOS_SAIDA)})")
+    return FORMATOS_SAIDA[formato](output_path, lote)
+
+
+def salvar_resultados(dataframes_dict, output_path, formato=None):
+    """Grava de uma vez os DataFrames de fetch_data (um por aba) no formato escolhido"""
+    formato = formato or formato_saida(output_path)
+    if formato == "xlsx":
+        return salvar_planilha(dataframes_dict, output_path=output_path)
+    with abrir_saida(output_path, formato) as saida:
+        for nome, df in dataframes_dict.items():
+            saida.aba(nome).escrever(df.to_dict("records"))
+    return output_path
@@ -0,0 +1,220 @@
+"""
+Busca em duas etapas: download das páginas e extração dos dados.
+
+Threads de download (cada uma com seu próprio Chrome) abrem a ficha e a
+consulta de cada espécie e colocam o HTML das duas páginas em uma fila
+limitada; um pool de processos roda extract_species_data_from_html sobre
+esse HTML. Assim o navegador não fica parado enquanto o HTML é parseado, e
+o parse (CPU) não espera o carregamento das páginas.
+
+A memória fica limitada pelas filas (downloads bloqueiam quando a de
+páginas enche, e extrações quando a de resultados enche) e pelo número
+máximo de extrações em andamento no pool.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_manager import check_cache, update_cache
+from data_reader import DataReader, build_search_url
+from scraper import (
+    ALL_FIELDS, EspecieNaoCarregada, ReusableDriver, _CAMPOS_CONSULTA, _CAMPOS_FORMA_SUBSTRATO, _error_result,
+    campos_faltando, extract_species_data_from_html, load_species_page, mesclar_resultados, replay_events,
+    resolve_offline, retry_with_backoff
+)
+
+_FIM = object()
+# Intervalo com que as filas bloqueadas conferem se o pipeline foi encerrado
+_ESPERA_FILA_S = 0.2
+
+
+# Só erros do driver e da navegação são repetidos: uma ficha que não carrega é espécie fora da base,
+# como na busca sequencial
+@retry_with_backoff(max_retries=3, backoff_factor=2, nao_repetir=(EspecieNaoCarregada,))
+def _baixar_paginas(driver_instance, name, timeout, campos=ALL_FIELDS):
+    """HTML da ficha e da consulta (None se a consulta falhar ou `campos` não precisar dela)"""
+    driver = driver_instance.get_driver()
+    load_species_page(driver, name, timeout, aguardar_forma_vida=bool(_CAMPOS_FORMA_SUBSTRATO & set(campos)))
+    species_html = driver.page_source
+    if not _CAMPOS_CONSULTA & set(campos):
+        return species_html, None
+    try:
+        DataReader.load_consulta(driver, name)
+        consulta_html = driver.page_source
+    except Exception as e:
+        print(f"Erro ao buscar origem/endemismo para {name}: {e}")
+        consulta_html = None
+    return species_html, consulta_html
+
+
+class SearchPipeline:
+    """
+    Itera sobre (posição em `names`, nome, resultado) de cada nome, na ordem
+    em que os resultados ficam prontos.
+
+    fetch_workers   threads de download (um Chrome cada)
+    parse_workers   processos de extração (padrão: número de CPUs)
+    max_queue       páginas baixadas aguardando extração e resultados aguardando o
+                    consumidor (padrão: 2 x parse_workers)
+    campos          campos buscados (como em scraper.fetch_data)
+
+    Se o consumidor para de iterar antes do fim, as threads são encerradas e
+    todos os Chromes são fechados.
+    """
+
+    def __init__(self, names, fetch_workers=2, parse_workers=None, max_queue=None, headless=True,
+                 timeout=20, use_cache=True, cancel_event=None, recorder=None, block_network=False,
+                 checklist=None, campos=ALL_FIELDS):
+        self.names = list(names)
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_queue = max_queue or 2 * self.parse_workers
+        self.headless = headless
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self.cancel_event = cancel_event
+        self.recorder = recorder
+        self.block_network = block_network
+        self.checklist = checklist
+        self.campos = tuple(campos)
+        # Resultado parcial do cache e campos que faltam a ele, por posição
+        self._parciais = {}
+
+        self._nomes = queue.Queue()
+        self._paginas = queue.Queue(maxsize=self.max_queue)
+        self._resultados = queue.Queue(maxsize=self.max_queue)
+        self._drivers = []
+        self._parar = threading.Event()
+        # Limita as extrações submetidas ao pool e ainda não concluídas
+        self._em_andamento = threading.BoundedSemaphore(self.parse_workers * 2)
+
+    def _cancelado(self):
+        return self._parar.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    def _colocar(self, fila, item):
+        """Põe `item` na fila limitada, desistindo se o pipeline for encerrado enquanto ela está cheia"""
+        while not self._parar.is_set():
+            try:
+                fila.put(item, timeout=_ESPERA_FILA_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _baixar(self):
+        """Thread de download: consome nomes e produz páginas até a fila de nomes esvaziar"""
+        driver_instance = ReusableDriver(headless=self.headless, recorder=self.recorder,
+                                         block_network=self.block_network)
+        self._drivers.append(driver_instance)
+        try:
+            while not self._cancelado():
+                try:
+                    posicao, name = self._nomes.get_nowait()
+                except queue.Empty:
+                    return
+
+                offline = resolve_offline(name, self.use_cache, self.checklist, self.campos)
+                if offline:
+                    self._colocar(self._paginas, (posicao, name, None, offline))
+                    continue
+
+                parcial = check_cache(name) if self.use_cache else None
+                faltando = campos_faltando(parcial, self.campos)
+                self._parciais[posicao] = (parcial, faltando)
+                try:
+                    paginas = _baixar_paginas(driver_instance, name, self.timeout, faltando)
+                except Exception as e:
+                    print(f"ERRO com {name}, tentando refresh do driver: {str(e)}")
+                    self._colocar(self._paginas, (posicao, name, None, _error_result()))
+                    continue
+                self._colocar(self._paginas, (posicao, name, paginas, None))
+        finally:
+            driver_instance.cleanup()
+            self._colocar(self._paginas, _FIM)
+
+    def _extrair(self, executor):
+        """Thread que leva as páginas baixadas ao pool de processos"""
+        ativos = self.fetch_workers
+        while not self._parar.is_set():
+            try:
+                item = self._paginas.get(timeout=_ESPERA_FILA_S)
+            except queue.Empty:
+                continue
+            if item is _FIM:
+                ativos -= 1
+                if ativos == 0:
+                    break
+                continue
+
+            posicao, name, paginas, pronto = item
+            if pronto is not None:
+                self._colocar(self._resultados, (posicao, name, pronto, None))
+                continue
+
+            self._em_andamento.acquire()
+            if self._parar.is_set():
+                self._em_andamento.release()
+                break
+            species_html, consulta_html = paginas
+            try:
+                future = executor.submit(extract_species_data_from_html, name,
+                                         build_search_url(name, canonical=True), species_html, consulta_html,
+                                         self._parciais[posicao][1])
+            except Exception as e:
+                print(f"Erro na extração de {name}: {e}")
+                erro = _error_result("Erro na extração dos dados.")
+                self._colocar(self._resultados, (posicao, name, erro, None))
+                self._em_andamento.release()
+                continue
+            future.add_done_callback(lambda f, posicao=posicao, name=name: self._concluir(posicao, name, f))
+
+        # Espera as extrações em andamento terminarem
+        for _ in range(self.parse_workers * 2):
+            self._em_andamento.acquire()
+        self._colocar(self._resultados, _FIM)
+
+    def _concluir(self, posicao, name, future):
+        try:
+            result, eventos = future.result()
+        except Exception as e:
+            print(f"Erro na extração de {name}: {e}")
+            result, eventos = _error_result("Erro na extração dos dados."), None
+        self._colocar(self._resultados, (posicao, name, result, eventos))
+        self._em_andamento.release()
+
+    def __iter__(self):
+        for posicao, name in enumerate(self.names):
+            self._nomes.put((posicao, name))
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            baixadores = [threading.Thread(target=self._baixar, daemon=True)
+                          for _ in range(self.fetch_workers)]
+            extrator = threading.Thread(target=self._extrair, args=(executor,), daemon=True)
+            try:
+                for thread in baixadores + [extrator]:
+                    thread.start()
+
+                while True:
+                    item = self._resultados.get()
+                    if item is _FIM:
+                        break
+                    posicao, name, result, eventos = item
+                    if eventos is not None:
+                        # Extraído agora (não veio do cache nem é erro de download)
+                        replay_events(eventos)
+                        parcial, _ = self._parciais.pop(posicao)
+                        if parcial:
+                            result = mesclar_resultados(parcial, result)
+                        if self.use_cache:
+                            update_cache(name, result)
+                    yield posicao, name, result
+
+                for thread in baixadores + [extrator]:
+                    thread.join()
+            finally:
+                # Também quando o consumidor fecha o gerador antes do fim: as filas deixam de
+                # bloquear e nenhum Chrome fica aberto (antes de o pool esperar as extrações)
+                self._parar.set()
+                for driver_instance in list(self._drivers):
+                    driver_instance.cleanup()
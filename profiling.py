@@ -0,0 +1,173 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+
+class _AmostradorPilha(threading.Thread):
+    """
+    Amostra periodicamente a pilha de todas as threads do processo (formato
+    collapsed para flame graph, com o nome da thread na raiz de cada pilha)
+    """
+
+    def __init__(self, intervalo):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            nomes_threads = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                nomes = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    nomes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    frame = frame.f_back
+                nomes.append(nomes_threads.get(thread_id, f"thread-{thread_id}"))
+                self.pilhas[";".join(reversed(nomes))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+class ProfilingSession:
+    """
+    Sessão de profiling opcional de uma execução do scraper.
+
+    Envolve a busca em um cProfile (um por thread: a que chama start() e as
+    iniciadas enquanto a sessão está ativa, como as de download do pipeline,
+    somados ao gravar), opcionalmente amostra a pilha de todas as threads e
+    tira snapshots do tracemalloc a cada `intervalo_snapshot` espécies. Os
+    processos de extração do pipeline ficam de fora.
+    Ao final, save() grava ao lado da planilha de saída:
+        <base>.prof            estatísticas do cProfile (pstats/snakeviz)
+        <base>.alocacoes.txt   maiores diferenças de alocação entre snapshots
+        <base>.collapsed.txt   pilhas amostradas, prontas para flamegraph.pl/speedscope
+    """
+
+    def __init__(self, intervalo_snapshot=50, amostrador=True, intervalo_amostragem=0.005, top=25):
+        self.intervalo_snapshot = intervalo_snapshot
+        self.usar_amostrador = amostrador
+        self.intervalo_amostragem = intervalo_amostragem
+        self.top = top
+
+        self.profile = cProfile.Profile()
+        self.perfis_threads = []
+        self.pilhas = Counter()
+        self.diffs_alocacao = []
+        self._amostrador = None
+        self._ultimo_snapshot = None
+        self._iniciou_tracemalloc = False
+        self._ativa = False
+        self._lock = threading.Lock()
+
+    def _perfilar_thread(self, frame, evento, arg):
+        """
+        Gancho de threading.setprofile: no primeiro evento de uma thread nova,
+        liga nela um cProfile próprio, que substitui este gancho
+        """
+        perfil = cProfile.Profile()
+        with self._lock:
+            self.perfis_threads.append(perfil)
+        perfil.enable()
+
+    def start(self):
+        """Inicia (ou retoma) o profiling na thread atual e nas threads iniciadas a partir de agora"""
+        if self._ativa:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        if self._ultimo_snapshot is None:
+            self._ultimo_snapshot = self._tirar_snapshot()
+
+        if self.usar_amostrador:
+            self._amostrador = _AmostradorPilha(self.intervalo_amostragem)
+            self._amostrador.start()
+
+        threading.setprofile(self._perfilar_thread)
+        self.profile.enable()
+        self._ativa = True
+
+    def step(self, processadas):
+        """Chamado a cada espécie processada; tira snapshot de memória no intervalo"""
+        if not self._ativa or not self.intervalo_snapshot:
+            return
+        if processadas % self.intervalo_snapshot == 0:
+            self._snapshot_alocacoes(f"após {processadas} espécies")
+
+    @staticmethod
+    def _tirar_snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def _snapshot_alocacoes(self, rotulo):
+        snapshot = self._tirar_snapshot()
+        diff = snapshot.compare_to(self._ultimo_snapshot, 'lineno')[:self.top]
+        self.diffs_alocacao.append((rotulo, time.strftime('%H:%M:%S'), [str(stat) for stat in diff]))
+        self._ultimo_snapshot = snapshot
+
+    def stop(self):
+        """Pausa o profiling; pode ser retomado com start()"""
+        if not self._ativa:
+            return
+        self.profile.disable()
+        threading.setprofile(None)
+        if self._amostrador:
+            self._amostrador.parar()
+            self.pilhas.update(self._amostrador.pilhas)
+            self._amostrador = None
+        self._snapshot_alocacoes("fim da busca")
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+            self._ultimo_snapshot = None
+        self._ativa = False
+
+    def _estatisticas(self, stream=None):
+        """Estatísticas do cProfile da thread principal somadas às das demais threads"""
+        stats = pstats.Stats(self.profile, stream=stream)
+        with self._lock:
+            perfis = list(self.perfis_threads)
+        for perfil in perfis:
+            stats.add(perfil)
+        return stats
+
+    def save(self, base_path):
+        """Grava os arquivos de profiling usando `base_path` (sem extensão) como prefixo"""
+        self.stop()
+        arquivos = []
+
+        prof_path = f"{base_path}.prof"
+        self._estatisticas().dump_stats(prof_path)
+        arquivos.append(prof_path)
+
+        alloc_path = f"{base_path}.alocacoes.txt"
+        with open(alloc_path, 'w', encoding='utf-8') as f:
+            f.write("# Top alocações por diferença entre snapshots do tracemalloc\n")
+            for rotulo, horario, linhas in self.diffs_alocacao:
+                f.write(f"\n=== {rotulo} ({horario}) ===\n")
+                f.write("\n".join(linhas) + "\n")
+            f.write("\n=== Top funções por tempo acumulado (cProfile) ===\n")
+            self._estatisticas(stream=f).sort_stats('cumulative').print_stats(self.top)
+        arquivos.append(alloc_path)
+
+        if self.pilhas:
+            collapsed_path = f"{base_path}.collapsed.txt"
+            with open(collapsed_path, 'w', encoding='utf-8') as f:
+                for pilha, contagem in self.pilhas.most_common():
+                    f.write(f"{pilha} {contagem}\n")
+            arquivos.append(collapsed_path)
+
+        return arquivos
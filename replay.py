@@ -0,0 +1,166 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import zipfile
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Bloqueia qualquer resolução de nome fora do servidor local de replay
+CHROME_BLOQUEIO_REDE = "--host-resolver-rules=MAP * ~NOTFOUND , EXCLUDE 127.0.0.1"
+
+_SCRIPT_RE = re.compile(r'<script\b.*?</script\s*>', re.DOTALL | re.IGNORECASE)
+
+
+def chave_url(url: str) -> str:
+    """Chave de arquivamento independente do host: caminho + query"""
+    partes = urlsplit(url)
+    return partes.path + (f"?{partes.query}" if partes.query else "")
+
+
+class PageArchive:
+    """
+    Arquivo .zip com as páginas carregadas durante uma busca.
+
+    Cada entrada guarda a URL requisitada, o DOM final (como o scraper o viu
+    ao sair da página) e os tempos de carregamento/permanência. Aberto com
+    modo "w" para gravar e "r" para reproduzir.
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, path, modo="r"):
+        if modo not in ("r", "w"):
+            raise ValueError("modo deve ser 'r' ou 'w'")
+        self.path = path
+        self.modo = modo
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, modo, compression=zipfile.ZIP_DEFLATED)
+        self.index = json.loads(self._zip.read(self.INDEX)) if modo == "r" else {}
+
+    def record(self, url: str, html: str, tempos: dict):
+        chave = chave_url(url)
+        with self._lock:
+            arquivo = f"paginas/{hashlib.sha1(chave.encode('utf-8')).hexdigest()}_{len(self._zip.namelist())}.html"
+            self._zip.writestr(arquivo, html)
+            self.index[chave] = {
+                "url": url,
+                "arquivo": arquivo,
+                "gravado_em": datetime.now().isoformat(),
+                **tempos,
+            }
+
+    def get(self, url: str) -> Optional[str]:
+        entrada = self.index.get(chave_url(url))
+        if not entrada:
+            return None
+        with self._lock:
+            return self._zip.read(entrada["arquivo"]).decode('utf-8')
+
+    def close(self):
+        with self._lock:
+            if self._zip is None:
+                return
+            if self.modo == "w":
+                self._zip.writestr(self.INDEX, json.dumps(self.index, ensure_ascii=False, indent=2))
+            self._zip.close()
+            self._zip = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingDriver:
+    """
+    Envolve um WebDriver e grava no PageArchive o DOM final de cada página,
+    no momento em que o scraper navega para a próxima (ou encerra o driver).
+    Todo o resto é repassado ao driver original.
+    """
+
+    def __init__(self, driver, archive: PageArchive):
+        self._driver = driver
+        self._archive = archive
+        self._pagina_atual = None
+
+    def get(self, url):
+        self.flush()
+        inicio = time.perf_counter()
+        self._driver.get(url)
+        self._pagina_atual = (url, inicio, time.perf_counter() - inicio)
+
+    def flush(self):
+        """Grava a página atual, se houver uma ainda não arquivada"""
+        if not self._pagina_atual:
+            return
+        url, inicio, carregamento = self._pagina_atual
+        self._pagina_atual = None
+        self._archive.record(url, self._driver.page_source, {
+            "carregamento_s": round(carregamento, 4),
+            "permanencia_s": round(time.perf_counter() - inicio, 4),
+        })
+
+    def quit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Erro ao gravar última página: {e}")
+        self._driver.quit()
+
+    def __getattr__(self, nome):
+        return getattr(self._driver, nome)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        servidor = self.server.replay
+        html = servidor.archive.get(self.path)
+        if html is None:
+            if self.path != "/favicon.ico":
+                servidor.falhas += 1
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        dados = _SCRIPT_RE.sub('', html).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+
+class ReplayServer:
+    """Serve um PageArchive em 127.0.0.1 com os mesmos caminhos do Reflora"""
+
+    def __init__(self, archive: PageArchive):
+        self.archive = archive
+        self.falhas = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ReplayHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, porta = self.httpd.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
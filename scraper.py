@@ -4,11 +4,18 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import threading
 import pandas as pd
-from data_reader import DataReader
+from data_reader import DataReader, build_consulta_genero_url, build_consulta_url, build_search_url, set_base_url
+from snapshot import PageSnapshot
+from batched import BatchedPage
+from replay import CHROME_BLOQUEIO_REDE, RecordingDriver, ReplayServer
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from cache_manager import check_cache, update_cache
+from selenium.common.exceptions import TimeoutException
+from cache_manager import check_cache, check_cache_many, update_cache, update_cache_many
+from name_index import IndiceNomes
+from checklist import CAMPOS_CHECKLIST, Checklist, chave_nome
+from synonym_graph import GrafoSinonimos, nome_canonico, resultado_sinonimo
 from collections import defaultdict
 import re
 import random
@@ -17,42 +24,100 @@ import json
 import os
 from datetime import datetime
 
-PROGRESS_FILE = "search_progress.json"
+# Progresso em JSON Lines: cada gravação acrescenta só as linhas novas
+PROGRESS_FILE = "search_progress.jsonl"
 
-def retry_with_backoff(max_retries=3, backoff_factor=2):
+# Modos de extração: "live" consulta o WebDriver campo a campo; "snapshot"
+# transfere o DOM de cada página uma única vez e lê tudo em memória;
+# "batched" resolve todos os seletores no navegador em um único execute_script
+EXTRACTION_MODES = ("live", "snapshot", "batched")
+DEFAULT_EXTRACTION_MODE = "snapshot"
+
+# Correção de grafia pelo índice local de nomes, para um nome parecido (mas não
+# igual) com um nome conhecido: "suggest" busca o nome como está e indica a
+# correção nas Inconsistências; "skip" não o busca; "apply" busca direto o
+# nome corrigido
+NAME_CORRECTION_MODES = ("off", "suggest", "skip", "apply")
+DEFAULT_NAME_CORRECTION = "suggest"
+
+# Campos que podem ser selecionados para a busca e a coluna de cada um na planilha
+SEARCH_FIELDS = {
+    "familia": "Família",
+    "autor": "Autor",
+    "Status Nome": "Status Nome",
+    "distribuicao_geografica": "Distribuição",
+    "dominios_fitogeograficos": "Domínios Fitogeográficos",
+    "tipos_vegetacao": "Tipos de Vegetação",
+    "forma_vida": "Forma de Vida",
+    "substrato": "Substrato",
+    "origem": "Origem",
+    "endemismo": "Endemismo",
+}
+ALL_FIELDS = tuple(SEARCH_FIELDS)
+
+# Campos que dependem de cada etapa opcional da extração
+_CAMPOS_FORMA_SUBSTRATO = {"forma_vida", "substrato"}
+_CAMPOS_DISTRIBUICAO = {"distribuicao_geografica", "dominios_fitogeograficos", "tipos_vegetacao"}
+_CAMPOS_CONSULTA = {"origem", "endemismo"}
+
+# Consulta por gênero: máximo de páginas de resultados lidas de cada gênero
+LIMITE_PAGINAS_GENERO = 30
+
+# No modo batched o resultado do JS de forma de vida/substrato já veio na
+# coleta, então ele é tentado antes das estratégias em Python
+FORMA_SUBSTRATO_BATCHED = ("javascript",) + tuple(
+    e for e in DataReader.FORMA_SUBSTRATO_ESTRATEGIAS if e != "javascript"
+)
+
+class EspecieNaoCarregada(TimeoutException):
+    """A ficha abriu, mas o nome científico não apareceu no tempo limite (espécie fora da base)"""
+
+def retry_with_backoff(max_retries=3, backoff_factor=2, nao_repetir=()):
+    """Repete a função com espera exponencial, exceto nas exceções de `nao_repetir`"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
+                except nao_repetir:
+                    raise
                 except Exception as e:
                     if attempt == max_retries - 1:
                         raise
                     wait_time = backoff_factor ** attempt + random.uniform(0, 1)
                     print(f"Tentativa {attempt + 1} falhou: {e}. Retentando em {wait_time:.2f}s...")
+                    performance_metrics.record_timing("retry", wait_time)
                     time.sleep(wait_time)
         return wrapper
     return decorator
 
-def save_progress(df, current_index, results):
-    """Salva o progresso atual em um arquivo JSON."""
+def save_progress(total_rows, current_index, rows, novo=False):
+    """
+    Acrescenta ao arquivo de progresso as linhas `rows` processadas desde a
+    última gravação (com `novo`, o arquivo recomeça com elas).
+    """
     progress_data = {
         "timestamp": datetime.now().isoformat(),
         "current_index": current_index,
-        "processed_rows": results,
-        "total_rows": len(df)
+        "processed_rows": rows,
+        "total_rows": total_rows
     }
-    
-    with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(progress_data, f, ensure_ascii=False, indent=2)
+
+    with open(PROGRESS_FILE, 'w' if novo else 'a', encoding='utf-8') as f:
+        f.write(json.dumps(progress_data, ensure_ascii=False) + "\n")
 
 def load_progress():
-    """Carrega o progresso salvo, se existir."""
+    """Carrega o progresso salvo, se existir (todas as linhas processadas e os dados da última gravação)."""
     if os.path.exists(PROGRESS_FILE):
         try:
+            progress = None
             with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                for linha in f:
+                    gravacao = json.loads(linha)
+                    linhas = (progress["processed_rows"] if progress else []) + gravacao["processed_rows"]
+                    progress = dict(gravacao, processed_rows=linhas)
+            return progress
         except:
             return None
     return None
@@ -82,14 +147,36 @@ class PerformanceMetrics:
             }
         return stats
 
+    def count(self, operation: str) -> int:
+        return len(self.metrics.get(operation, []))
+
+    def reset(self):
+        self.metrics.clear()
+
+
+# Métricas globais da execução (retentativas, tempos de navegação e extração)
+performance_metrics = PerformanceMetrics()
+
+# Nomes já encontrados no Reflora (e de checklists importados), para corrigir grafia offline
+name_index = IndiceNomes()
+
+# Checklist da Flora e Funga do Brasil importado localmente (checklist.py)
+local_checklist = Checklist()
+
+# Sinônimos vistos nas buscas e o nome aceito de cada um (synonym_graph.py)
+synonym_graph = GrafoSinonimos()
 
 cancel_search_event = threading.Event()
 
 class ReusableDriver:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, recorder=None, block_network=False):
         self.driver = None
         self.headless = headless
         self.is_alive = False
+        # PageArchive onde gravar cada página carregada (modo record)
+        self.recorder = recorder
+        # Impede o Chrome de acessar qualquer host além do localhost (modo replay)
+        self.block_network = block_network
     
     def get_driver(self):
         if not self.driver or not self.is_alive:
@@ -109,9 +196,13 @@ class ReusableDriver:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--window-size=1920,1080")
+        if self.block_network:
+            options.add_argument(CHROME_BLOQUEIO_REDE)
         service = Service(ChromeDriverManager().install())
         
         self.driver = webdriver.Chrome(service=service, options=options)
+        if self.recorder is not None:
+            self.driver = RecordingDriver(self.driver, self.recorder)
         self.is_alive = True
     
     def cleanup(self):
@@ -128,34 +219,47 @@ class ReusableDriver:
         self.cleanup()
         self._init_driver()
 
-@retry_with_backoff(max_retries=3, backoff_factor=2)
-def search_species(name: str, driver_instance: ReusableDriver, timeout=20) -> dict:
-    cached = check_cache(name)
-    if cached:
-        print(f" Cache hit para: {name}")
-        return cached
+def _error_result(inconsistencia="Espécie fora da base de dados.", status_nome="Erro na verificação") -> dict:
+    """Resultado de uma espécie cuja busca falhou"""
+    return {
+        "familia": "",
+        "autor": "",
+        "reflora_link": "",
+        "distribuicao_geografica": "",
+        "dominios_fitogeograficos": "",
+        "tipos_vegetacao": "",
+        "forma_vida": "",
+        "substrato": "",
+        "origem": "",
+        "endemismo": "",
+        "inconsistencia": inconsistencia,
+        "Status Nome": status_nome
+    }
 
-    driver = driver_instance.get_driver()
-    url = f"http://servicos.jbrj.gov.br/flora/search/{name.replace(' ', '_')}"
-    
-    try:
-        driver.get(url)
-        wait = WebDriverWait(driver, timeout)
+def load_species_page(driver, name: str, timeout=20, aguardar_forma_vida=True):
+    """Abre a ficha da espécie e aguarda o nome científico e (se pedido) a forma de vida carregarem"""
+    inicio = time.perf_counter()
+    driver.get(build_search_url(name))
+    wait = WebDriverWait(driver, timeout)
 
-        # Aguardar carregamento do nome científico
+    # Aguardar carregamento do nome científico
+    try:
+        WebDriverWait(driver, min(10, timeout)).until(
+            lambda d: d.find_element(By.CSS_SELECTOR, ".nome.taxon, .taxon, .nomeAutorSupraGenerico").text.strip() != ""
+        )
+    except:
         try:
-            WebDriverWait(driver, 10).until(
-                lambda d: d.find_element(By.CSS_SELECTOR, ".nome.taxon, .taxon, .nomeAutorSupraGenerico").text.strip() != ""
-            )
-        except:
             wait.until(
                 lambda d: d.find_element(By.CSS_SELECTOR, ".nome.taxon, .taxon, .nomeAutorSupraGenerico").text.strip() != ""
             )
+        except TimeoutException as e:
+            raise EspecieNaoCarregada(f"Nome científico não carregou em {timeout}s: {name}") from e
 
-        # Aguardar um pouco mais para garantir que toda a página carregou
-        time.sleep(2)
-        
-        # Tentar aguardar o container de forma de vida especificamente
+    # Aguardar um pouco mais para garantir que toda a página carregou
+    time.sleep(2)
+    
+    # Tentar aguardar o container de forma de vida especificamente
+    if aguardar_forma_vida:
         try:
             WebDriverWait(driver, 5).until(
                 EC.presence_of_element_located((By.ID, "forma-de-vida-e-substrato"))
@@ -164,40 +268,207 @@ def search_species(name: str, driver_instance: ReusableDriver, timeout=20) -> di
             # Se não encontrar, continua mesmo assim
             pass
 
-        result = extract_species_data(driver, name, url)
-        update_cache(name, result)
+    performance_metrics.record_timing("navegacao", time.perf_counter() - inicio)
+
+def campos_do_resultado(result: dict) -> set:
+    """Campos presentes em um resultado (os resultados completos não listam os campos)"""
+    return set(result.get("campos") or ALL_FIELDS)
+
+def mesclar_resultados(parcial: dict, result: dict) -> dict:
+    """Completa um resultado parcial (do cache) com os campos buscados agora"""
+    if result["Status Nome"] == "Erro na verificação":
+        return result
+    campos = campos_do_resultado(result)
+    mesclado = dict(parcial)
+    for campo in campos:
+        mesclado[campo] = result[campo]
+    if "secao_distribuicao" in result:
+        mesclado["secao_distribuicao"] = result["secao_distribuicao"]
+    partes = []
+    for inconsistencia in (parcial["inconsistencia"], result["inconsistencia"]):
+        for parte in inconsistencia.split("|"):
+            if parte.strip() and parte.strip() not in partes:
+                partes.append(parte.strip())
+    mesclado["inconsistencia"] = " | ".join(partes)
+    campos |= campos_do_resultado(parcial)
+    if campos == set(ALL_FIELDS):
+        mesclado.pop("campos", None)
+    else:
+        mesclado["campos"] = [campo for campo in ALL_FIELDS if campo in campos]
+    return mesclado
+
+def campos_faltando(parcial, campos=ALL_FIELDS) -> tuple:
+    """Campos de `campos` que o resultado parcial do cache (ou None) ainda não tem"""
+    if parcial is None:
+        return tuple(campos)
+    presentes = campos_do_resultado(parcial)
+    return tuple(campo for campo in campos if campo not in presentes)
+
+def resolve_offline(name: str, use_cache=True, checklist=None, campos=ALL_FIELDS) -> dict:
+    """
+    Resultado do cache ou do checklist local, sem abrir o navegador (None se
+    nenhum tem o nome com todos os `campos`)
+    """
+    if use_cache:
+        cached = check_cache(name)
+        if cached and not campos_faltando(cached, campos):
+            print(f" Cache hit para: {name}")
+            return cached
+    if checklist is not None:
+        result = checklist.resultado(name)
+        if result:
+            print(f" Checklist local: {name}")
+            return result
+    return None
+
+@retry_with_backoff(max_retries=3, backoff_factor=2)
+def search_species(name: str, driver_instance: ReusableDriver, timeout=20, use_cache=True,
+                   mode=DEFAULT_EXTRACTION_MODE, checklist=None, campos=ALL_FIELDS) -> dict:
+    offline = resolve_offline(name, use_cache, checklist, campos)
+    if offline:
+        return offline
+
+    # Com um resultado parcial no cache, só os campos que faltam são buscados
+    parcial = check_cache(name) if use_cache else None
+    faltando = campos_faltando(parcial, campos)
+
+    driver = driver_instance.get_driver()
+    
+    try:
+        load_species_page(driver, name, timeout, aguardar_forma_vida=bool(_CAMPOS_FORMA_SUBSTRATO & set(faltando)))
+
+        inicio = time.perf_counter()
+        result = extract_species_data(driver, name, build_search_url(name, canonical=True), mode=mode,
+                                      campos=faltando)
+        performance_metrics.record_timing("extracao", time.perf_counter() - inicio)
+        if parcial:
+            result = mesclar_resultados(parcial, result)
+        if use_cache:
+            update_cache(name, result)
         return result
 
     except Exception as e:
         print(f"ERRO com {name}, tentando refresh do driver: {str(e)}")
-        return {
-            "familia": "",
-            "autor": "",
-            "reflora_link": "",
-            "distribuicao_geografica": "",
-            "dominios_fitogeograficos": "",
-            "tipos_vegetacao": "",
-            "forma_vida": "",
-            "substrato": "",
-            "inconsistencia": "Espécie fora da base de dados.",
-            "Status Nome": "Erro na verificação"
-        }
+        return _error_result()
 
-def extract_species_data(driver, name, url):
-    status_nome, inconsistencia = DataReader.read_status_nome(driver, name)
-    forma_vida, substrato = DataReader.read_forma_e_substrato(driver)
-    origem, endemismo = DataReader.read_origem_e_endemismo(driver, name)
-    
-    # NOVO: Extrai dados fitogeográficos usando o método do dominios.py
-    fitogeo_data = DataReader.extract_fitogeographic_data(driver)
+def _capturar_pagina(driver, url, mode):
+    """Objeto sobre o qual os métodos do DataReader vão rodar em cada modo"""
+    if mode == "snapshot":
+        return PageSnapshot.from_driver(driver, url)
+    if mode == "batched":
+        return BatchedPage.from_driver(driver, url)
+    return driver
+
+def extract_species_data(driver, name, url, mode=DEFAULT_EXTRACTION_MODE, campos=ALL_FIELDS):
+    """Lê da ficha já carregada (e da consulta, se Origem/Endemismo estão em `campos`) os `campos`"""
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Modo de extração desconhecido: {mode}")
+    campos = set(campos)
+
+    # Nos modos snapshot e batched cada página é transferida uma única vez
+    pagina = _capturar_pagina(driver, url, mode)
+
+    status_nome, inconsistencia = "", ""
+    if "Status Nome" in campos:
+        status_nome, inconsistencia = DataReader.read_status_nome(pagina, name)
+    forma_vida, substrato = "", ""
+    if campos & _CAMPOS_FORMA_SUBSTRATO:
+        forma_vida, substrato = DataReader.read_forma_e_substrato(
+            pagina, FORMA_SUBSTRATO_BATCHED if mode == "batched" else None
+        )
+
+    # Os demais campos são lidos da página de consulta, que só é aberta para Origem/Endemismo
+    consulta = None
+    if campos & _CAMPOS_CONSULTA:
+        try:
+            DataReader.load_consulta(driver, name)
+            consulta = _capturar_pagina(driver, build_consulta_url(name), mode)
+        except Exception as e:
+            print(f"Erro ao buscar origem/endemismo para {name}: {e}")
+
+    return _build_result(name, url, pagina, consulta, status_nome, inconsistencia, forma_vida, substrato,
+                         campos)
+
+def extract_species_data_from_html(name, url, species_html, consulta_html, campos=ALL_FIELDS):
+    """
+    Extrai os dados de uma espécie a partir do HTML já baixado das duas
+    páginas (consulta_html é None se a consulta falhou), sem WebDriver.
+
+    Função de módulo e com argumentos simples para poder rodar em um
+    processo separado (pipeline.py). Devolve o resultado e os registros de
+    telemetria/estatísticas feitos durante a extração, que o processo
+    principal reaplica com replay_events().
+    """
+    registros = {
+        "TELEMETRIA": _EventRecorder(DataReader.TELEMETRIA, forward=False),
+        "ESTATISTICAS_FORMA_SUBSTRATO": _EventRecorder(DataReader.ESTATISTICAS_FORMA_SUBSTRATO),
+    }
+    originais = {atributo: getattr(DataReader, atributo) for atributo in registros}
+    for atributo, registro in registros.items():
+        setattr(DataReader, atributo, registro)
+    try:
+        campos = set(campos)
+        pagina = PageSnapshot(species_html, url)
+        status_nome, inconsistencia = "", ""
+        if "Status Nome" in campos:
+            status_nome, inconsistencia = DataReader.read_status_nome(pagina, name)
+        forma_vida, substrato = "", ""
+        if campos & _CAMPOS_FORMA_SUBSTRATO:
+            forma_vida, substrato = DataReader.read_forma_e_substrato(pagina)
+        consulta = PageSnapshot(consulta_html, build_consulta_url(name)) if consulta_html is not None else None
+        result = _build_result(name, url, pagina, consulta, status_nome, inconsistencia, forma_vida, substrato,
+                               campos)
+    finally:
+        for atributo, original in originais.items():
+            setattr(DataReader, atributo, original)
+    return result, {atributo: registro.eventos for atributo, registro in registros.items()}
+
+def replay_events(eventos):
+    """Reaplica no processo atual os registros devolvidos por extract_species_data_from_html"""
+    for atributo, chamadas in eventos.items():
+        destino = getattr(DataReader, atributo)
+        for args in chamadas:
+            destino.registrar(*args)
+
+class _EventRecorder:
+    """Guarda as chamadas de registrar() (e as repassa ao original se `forward`)"""
+
+    def __init__(self, original, forward=True):
+        self.original = original
+        self.forward = forward
+        self.eventos = []
+
+    def registrar(self, *args):
+        self.eventos.append(args)
+        if self.forward:
+            self.original.registrar(*args)
+
+    def __getattr__(self, nome):
+        return getattr(self.original, nome)
+
+def _build_result(name, url, pagina, consulta, status_nome, inconsistencia, forma_vida, substrato,
+                  campos=ALL_FIELDS):
+    """
+    Lê os `campos` da página de consulta (ou da própria ficha, se a consulta
+    falhou ou não foi aberta) e monta o resultado. Os campos fora de
+    `campos` ficam vazios e o resultado lista os campos que tem.
+    """
+    campos = set(campos)
+    if consulta is not None:
+        origem, endemismo = DataReader._ler_origem_e_endemismo(consulta)
+        pagina = consulta
+    elif campos & _CAMPOS_CONSULTA:
+        origem, endemismo = "Erro na coleta", "Erro na coleta"
+    else:
+        origem, endemismo = "", ""
     
     result = {
-        "familia": DataReader.read_familia(driver),
-        "autor": DataReader.read_autor(driver),
+        "familia": DataReader.read_familia(pagina) if "familia" in campos else "",
+        "autor": DataReader.read_autor(pagina) if "autor" in campos else "",
         "reflora_link": url,
-        "distribuicao_geografica": DataReader.read_distribuicao(driver),
-        "dominios_fitogeograficos": fitogeo_data["dominios_fitogeograficos"],  # Usa o novo método
-        "tipos_vegetacao": fitogeo_data["tipos_vegetacao"],  # Usa o novo método
+        "distribuicao_geografica": "",
+        "dominios_fitogeograficos": "",
+        "tipos_vegetacao": "",
         "forma_vida": forma_vida,
         "substrato": substrato,
         "origem": origem,
@@ -205,13 +476,26 @@ def extract_species_data(driver, name, url):
         "inconsistencia": inconsistencia,
         "Status Nome": status_nome
     }
+
+    if campos & _CAMPOS_DISTRIBUICAO:
+        # Seção de distribuição lida uma única vez para as três colunas
+        secao_distribuicao = DataReader.read_secao_distribuicao(pagina)
+        fitogeo_data = DataReader.formatar_fitogeografia(secao_distribuicao)
+        result.update({
+            "distribuicao_geografica": DataReader.formatar_distribuicao(secao_distribuicao),
+            "dominios_fitogeograficos": fitogeo_data["dominios_fitogeograficos"],
+            "tipos_vegetacao": fitogeo_data["tipos_vegetacao"],
+            "secao_distribuicao": secao_distribuicao,
+        })
+    if campos != set(ALL_FIELDS):
+        result["campos"] = [campo for campo in ALL_FIELDS if campo in campos]
     
-    if status_nome != "Nome válido":
+    if "Status Nome" in campos and status_nome != "Nome válido":
         result["inconsistencia"] += " | Nome científico desatualizado"
 
-    if not result["familia"]:
+    if "familia" in campos and not result["familia"]:
         result["inconsistencia"] += " | Família não encontrada"
-    if not result["autor"]:
+    if "autor" in campos and not result["autor"]:
         result["inconsistencia"] += " | Autor não encontrado"
 
     print(f"\n{'-'*50}")
@@ -221,6 +505,74 @@ def extract_species_data(driver, name, url):
     print(f"{'-'*50}\n")
     return result
 
+def _resultado_linha_consulta(nome, linha, familia_pagina):
+    """Resultado de um táxon da listagem da consulta (None se a linha não traz os dados da ficha)"""
+    status_nome, inconsistencia = DataReader.read_status_nome(linha, nome)
+    forma_vida, substrato = DataReader.read_forma_e_substrato(linha)
+    result = _build_result(nome, build_search_url(nome, canonical=True), linha, linha,
+                           status_nome, inconsistencia, forma_vida, substrato)
+    if result["origem"] == "Não encontrado" or not result["secao_distribuicao"]["completa"]:
+        return None
+    if result["familia"] == "Família não identificada" and familia_pagina != "Família não identificada":
+        result["familia"] = familia_pagina
+    return result
+
+def fetch_genus(driver_instance, genero, timeout=20, cancel_event=None) -> dict:
+    """
+    Lê todas as páginas da consulta pública do gênero e devolve
+    {nome: resultado} de cada táxon listado com os dados completos.
+    """
+    driver = driver_instance.get_driver()
+    resultados = {}
+    for numero in range(1, LIMITE_PAGINAS_GENERO + 1):
+        if cancel_event and cancel_event.is_set():
+            break
+        inicio = time.perf_counter()
+        DataReader.load_consulta_genero(driver, genero, numero)
+        html = driver.page_source
+        performance_metrics.record_timing("navegacao", time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        novos = [(nome_canonico(nome), trecho) for nome, trecho in DataReader.read_taxons_consulta(html)]
+        novos = [(nome, trecho) for nome, trecho in novos if nome and nome not in resultados]
+        if not novos:
+            # Página vazia ou repetindo a anterior: fim da listagem
+            break
+        familia = DataReader.read_familia(PageSnapshot(html))
+        url = build_consulta_genero_url(genero, numero)
+        for nome, trecho in novos:
+            resultados[nome] = _resultado_linha_consulta(nome, PageSnapshot(trecho, url), familia)
+        performance_metrics.record_timing("extracao", time.perf_counter() - inicio)
+    return {nome: result for nome, result in resultados.items() if result}
+
+def _semear_cache_por_genero(driver_instance, nomes, minimo, cancel_event=None):
+    """
+    Busca pela consulta do gênero os gêneros com pelo menos `minimo` nomes
+    em `nomes` e grava no cache todos os táxons listados.
+    """
+    por_genero = defaultdict(list)
+    for nome in nomes:
+        por_genero[nome.split()[0]].append(nome)
+    generos = [genero for genero, do_genero in por_genero.items() if len(do_genero) >= minimo]
+    if not generos:
+        return
+
+    print(f" Consulta por gênero: {', '.join(generos)}")
+    for genero in generos:
+        if cancel_event and cancel_event.is_set():
+            return
+        try:
+            resultados = fetch_genus(driver_instance, genero, cancel_event=cancel_event)
+        except Exception as e:
+            print(f"Erro na consulta do gênero {genero}: {e}")
+            continue
+        if resultados:
+            update_cache_many(resultados)
+        encontrados = {chave_nome(nome) for nome in resultados}
+        cobertos = sum(1 for nome in por_genero[genero] if chave_nome(nome) in encontrados)
+        print(f" {genero}: {len(resultados)} táxons no cache, {cobertos} de {len(por_genero[genero])} "
+              f"nomes da planilha (os demais são buscados um a um)")
+
 def fallback_origem_endemismo(driver):
     """Fallback para quando o método principal falhar"""
     try:
@@ -357,39 +709,183 @@ def _is_generic_text(texto):
     return False
 
 
-def fetch_data(df, callback=None, headless=True, cancel_event=None, resume=False):
+def _result_row(idx, name, result, nota=""):
+    """Linha da planilha de resultados para o resultado de uma espécie"""
+    return {
+        "Nº": idx + 1,
+        "Nome Científico": name,
+        "Família": result["familia"],
+        "Autor": result["autor"],
+        "Link Reflora": result["reflora_link"],
+        "Distribuição": result["distribuicao_geografica"],
+        "Forma de Vida": result["forma_vida"],
+        "Substrato": result["substrato"],
+        "Origem": result["origem"],
+        "Endemismo": result["endemismo"],
+        "Domínios Fitogeográficos": result["dominios_fitogeograficos"],
+        "Tipos de Vegetação": result["tipos_vegetacao"],
+        "Inconsistências": result["inconsistencia"] + nota,
+        "Status Nome": result["Status Nome"]
+    }
+
+def _tabela_resultados(results, campos):
+    """DataFrame das linhas de resultado sem as colunas dos campos não selecionados"""
+    omitidas = [coluna for campo, coluna in SEARCH_FIELDS.items() if campo not in campos]
+    return pd.DataFrame(results).drop(columns=omitidas, errors="ignore")
+
+def fetch_data(df, callback=None, headless=True, cancel_event=None, resume=False, profiler=None,
+               recorder=None, replay=None, extraction_mode=DEFAULT_EXTRACTION_MODE,
+               fetch_workers=0, parse_workers=None, name_correction=DEFAULT_NAME_CORRECTION,
+               use_checklist=True, live_fields=(), resolve_synonyms=True, genus_bulk=0, fields=ALL_FIELDS,
+               writer=None, name_column="Nome Científico", timeout=20):
+    """
+    Busca no Reflora todos os nomes da coluna `name_column` de `df`.
+
+    `df` pode ser um DataFrame ou um iterável de DataFrames com a mesma
+    coluna (por exemplo excel_utils.iter_blocos_nomes), consumido bloco a
+    bloco: da entrada só ficam na memória o Nº e o nome de cada linha.
+
+    `profiler` é uma profiling.ProfilingSession opcional que envolve a busca
+    e recebe a contagem de espécies processadas para os snapshots de memória.
+
+    `recorder` (replay.PageArchive aberto para escrita) grava cada página
+    carregada; `replay` (PageArchive aberto para leitura) serve as páginas
+    gravadas ao Chrome sem acesso à rede. Em ambos os modos o cache é
+    ignorado, para que toda espécie passe de fato pelo navegador.
+
+    `extraction_mode` é um dos EXTRACTION_MODES ("snapshot" por padrão).
+
+    Com `fetch_workers` > 0 a busca roda em pipeline (pipeline.SearchPipeline):
+    esse número de Chromes baixa as páginas e `parse_workers` processos
+    extraem os dados do HTML. O pipeline sempre extrai de snapshots.
+
+    `name_correction` é um dos NAME_CORRECTION_MODES: antes de buscar, cada
+    nome é conferido no índice local (name_index) e um nome com grafia
+    parecida com a de um nome conhecido é buscado com a correção sugerida nas
+    Inconsistências ("suggest"), não é buscado ("skip") ou é trocado pelo
+    nome conhecido ("apply"; uma correção ambígua é só sugerida).
+
+    Com `use_checklist`, os nomes presentes no checklist local (checklist.py)
+    são respondidos por ele, sem navegador, a menos que algum campo de
+    `live_fields` (chaves de CAMPOS_CHECKLIST) tenha de vir do Reflora ou
+    que o checklist importado não traga todos os campos.
+
+    Com `resolve_synonyms`, um nome que o grafo local de sinônimos
+    (synonym_graph.py) conhece como sinônimo não é buscado: busca-se o nome
+    aceito e o resultado do sinônimo é montado a partir do dele. Nomes que
+    levam ao mesmo táxon (repetidos, ou sinônimos de um mesmo nome aceito)
+    são buscados uma única vez.
+
+    Com `genus_bulk` > 0, cada gênero com pelo menos esse número de nomes
+    ainda fora do cache (e do checklist) é buscado de uma vez pela consulta
+    pública do gênero, página a página, e todos os táxons listados entram
+    no cache; só os nomes que a listagem não cobre são buscados um a um.
+    Requer o cache (não roda ao gravar nem ao reproduzir).
+
+    `fields` (chaves de SEARCH_FIELDS) limita a busca a esses campos: as
+    navegações, esperas e leituras que nenhum deles usa são puladas (a
+    consulta só é aberta para Origem/Endemismo) e as colunas dos demais
+    ficam fora da planilha. Os resultados parciais vão para o cache com a
+    lista dos campos que têm, e uma busca posterior só busca os que faltam.
+
+    `writer` (por exemplo saida.aba(nome) de output_writers.abrir_saida) recebe
+    em writer.escrever(linhas) as linhas de resultado (dicionários com as
+    colunas do DataFrame de resultados) na ordem das linhas da entrada: cada
+    linha pronta espera só as anteriores a ela que ainda estão sendo buscadas
+    (no fim, ao cancelar ou em erro, as que esperam são gravadas assim mesmo).
+    Com `writer` as linhas não ficam todas na memória e fetch_data devolve
+    None; sem ele, devolve o DataFrame ordenado pelo Nº.
+
+    `timeout` é a espera, em segundos, pelo carregamento de cada ficha.
+
+    O progresso (PROGRESS_FILE) é gravado a cada 5 espécies acrescentando só
+    as linhas novas desde a gravação anterior.
+    """
+    if fetch_workers and extraction_mode != "snapshot":
+        raise ValueError("O pipeline só funciona com extraction_mode='snapshot'")
+    desconhecidos = set(fields) - set(ALL_FIELDS)
+    if desconhecidos or not fields:
+        raise ValueError(f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}" if desconhecidos
+                         else "Selecione ao menos um campo")
+
+    # Linhas do DataFrame devolvido (só sem writer) e linhas ainda fora do arquivo de progresso
     results = []
+    progresso = []
+    processados = 0
     start_time = time.time()
 
-    if "Nome Científico" not in df.columns:
-        raise ValueError("A planilha deve conter a coluna 'Nome Científico'")
+    omitidas = {coluna for campo, coluna in SEARCH_FIELDS.items() if campo not in fields}
+
+    # Com writer: índices da entrada na ordem original e linhas prontas à espera das anteriores
+    ordem_entrada = []
+    proxima = 0
+    em_espera = {}
+
+    def escrever(todas=False):
+        """Passa ao writer as linhas prontas que seguem a ordem da entrada (`todas`: também as que esperam)"""
+        nonlocal proxima
+        liberadas = []
+        while proxima < len(ordem_entrada) and (em_espera or not todas):
+            linhas = em_espera.get(ordem_entrada[proxima])
+            if not linhas and not todas:
+                break
+            if linhas:
+                liberadas.append(linhas.pop(0))
+                if not linhas:
+                    del em_espera[ordem_entrada[proxima]]
+            proxima += 1
+        if liberadas:
+            writer.escrever([{coluna: valor for coluna, valor in linha.items() if coluna not in omitidas}
+                             for linha in liberadas])
+
+    def registrar(*linhas):
+        nonlocal processados
+        processados += len(linhas)
+        progresso.extend(linhas)
+        if writer is None:
+            results.extend(linhas)
+            return
+        for linha in linhas:
+            em_espera.setdefault(linha["Nº"] - 1, []).append(linha)
+        escrever()
+
+    def tabela():
+        return _tabela_resultados(results, fields) if writer is None else None
 
     # PRÉ-VALIDAÇÃO E LIMPEZA
     valid_names = []
     invalid_names = []
+    total = 0
 
-    for idx, row in df.iterrows():
-        name = str(row["Nome Científico"]).strip()
+    for bloco in [df] if isinstance(df, pd.DataFrame) else df:
+        if name_column not in bloco.columns:
+            raise ValueError(f"A planilha deve conter a coluna '{name_column}'")
+        total += len(bloco)
+        if writer is not None:
+            ordem_entrada.extend(bloco.index)
 
-        # Validar formato básico
-        if not name or len(name.split()) < 2:
-            invalid_names.append((idx, name, "Nome inválido"))
-            continue
+        for idx, name in zip(bloco.index, bloco[name_column]):
+            name = str(name).strip()
+
+            # Validar formato básico
+            if not name or len(name.split()) < 2:
+                invalid_names.append((idx, name, "Nome inválido"))
+                continue
 
-        # Remover caracteres especiais problemáticos
-        cleaned_name = re.sub(r'[^\w\s.-]', '', name)
-        if cleaned_name != name:
-            print(f" Nome limpo: '{name}' → '{cleaned_name}'")
-            name = cleaned_name
+            # Remover caracteres especiais problemáticos
+            cleaned_name = re.sub(r'[^\w\s.-]', '', name)
+            if cleaned_name != name:
+                print(f" Nome limpo: '{name}' → '{cleaned_name}'")
+                name = cleaned_name
 
-        valid_names.append((idx, name))
+            valid_names.append((idx, name))
 
     print(f" Nomes válidos: {len(valid_names)}")
     print(f" Nomes inválidos: {len(invalid_names)}")
 
     # Processar nomes inválidos primeiro
     for idx, name, error in invalid_names:
-        results.append({
+        registrar({
             "Nº": idx + 1,
             "Nome Científico": name,
             "Família": "",
@@ -406,55 +902,179 @@ def fetch_data(df, callback=None, headless=True, cancel_event=None, resume=False
             "Status Nome": "Nome inválido"
         })
 
+    # CORREÇÃO DE GRAFIA PELO ÍNDICE LOCAL (sem acessar o Reflora)
+    name_index.carregar()
+    corrigidos = {}
+    sugeridos = {}
+    if name_correction != "off" and len(name_index):
+        a_buscar = []
+        for idx, name in valid_names:
+            correcao = name_index.corrigir(name)
+            if correcao is None:
+                a_buscar.append((idx, name))
+            elif name_correction == "apply" and not correcao.ambigua:
+                print(f" Grafia corrigida: '{name}' → '{correcao.sugestao}'")
+                corrigidos[idx] = correcao
+                a_buscar.append((idx, correcao.sugestao))
+            else:
+                sugestoes = " ou ".join((correcao.sugestao,) + correcao.alternativas)
+                print(f" Possível erro de grafia: '{name}' (sugestão: {sugestoes})")
+                if name_correction == "skip":
+                    registrar(_result_row(idx, name, _error_result(
+                        f"Nome não buscado: parecido com um nome conhecido. Sugestão: {sugestoes}",
+                        "Possível erro de grafia"
+                    )))
+                else:
+                    # Um nome parecido pode ser um congênere real: busca-se o nome como está
+                    sugeridos[idx] = sugestoes
+                    a_buscar.append((idx, name))
+        valid_names = a_buscar
+
+    # RESOLUÇÃO DE SINÔNIMOS PELO GRAFO LOCAL
+    synonym_graph.carregar()
+    sinonimos = {}
+    if resolve_synonyms:
+        for idx, name in valid_names:
+            aceito = synonym_graph.aceito(name)
+            if aceito:
+                print(f" Sinônimo conhecido: '{name}' → '{aceito}'")
+                sinonimos[idx] = aceito
+
+    # Cada táxon é buscado uma única vez, para todas as linhas que levam a ele
+    grupos = {}
+    for idx, name in valid_names:
+        alvo = sinonimos.get(idx, name)
+        grupos.setdefault(chave_nome(alvo), (alvo, []))[1].append((idx, name))
+    buscas = list(grupos.values())
+    if len(buscas) < len(valid_names):
+        print(f" Táxons a buscar: {len(buscas)} (para {len(valid_names)} nomes)")
+
     # CRIAR DRIVER APENAS SE HOUVER NOMES VÁLIDOS
     if not valid_names:
-        return pd.DataFrame(results)
+        if writer is not None:
+            escrever(todas=True)
+        return tabela()
+
+    replay_server = None
+    if replay is not None:
+        replay_server = ReplayServer(replay).start()
+        set_base_url(replay_server.base_url)
+    use_cache = recorder is None and replay is None
+
+    checklist = None
+    if use_checklist and use_cache and local_checklist.disponivel:
+        faltando = ((set(CAMPOS_CHECKLIST) - local_checklist.campos()) | set(live_fields)) & set(fields)
+        if faltando:
+            print(f" Checklist local ignorado: campos buscados no Reflora ({', '.join(sorted(faltando))})")
+        else:
+            checklist = local_checklist
+
+    estatisticas_estrategias = DataReader.ESTATISTICAS_FORMA_SUBSTRATO
+    estatisticas_estrategias.carregar()
+
+    driver_instance = None
+    if fetch_workers:
+        from pipeline import SearchPipeline
+        busca = SearchPipeline(
+            [alvo for alvo, _ in buscas], fetch_workers=fetch_workers, parse_workers=parse_workers,
+            headless=headless, timeout=timeout, use_cache=use_cache, cancel_event=cancel_event,
+            recorder=recorder, block_network=replay is not None, checklist=checklist, campos=fields
+        )
+    else:
+        driver_instance = ReusableDriver(headless=headless, recorder=recorder, block_network=replay is not None)
+
+        def busca_sequencial():
+            for posicao, (name, _) in enumerate(buscas):
+                if cancel_event and cancel_event.is_set():
+                    break
+                print(f"🔍 Buscando: {name}")
+                yield posicao, name, search_species(name, driver_instance, timeout=timeout,
+                                                    use_cache=use_cache, mode=extraction_mode,
+                                                    checklist=checklist, campos=fields)
 
-    driver_instance = ReusableDriver(headless=headless)
+        busca = busca_sequencial()
+
+    if profiler:
+        profiler.start()
 
     try:
-        for i, (idx, name) in enumerate(valid_names):
-            if cancel_event and cancel_event.is_set():
-                break
+        if genus_bulk and use_cache:
+            alvos = [alvo for alvo, _ in buscas]
+            offline = {nome for nome, cached in check_cache_many(alvos).items()
+                       if not campos_faltando(cached, fields)}
+            pendentes = [alvo for alvo in alvos if alvo not in offline
+                         and (checklist is None or checklist.buscar(alvo) is None)]
+            driver_genero = driver_instance or ReusableDriver(headless=headless)
+            try:
+                _semear_cache_por_genero(driver_genero, pendentes, genus_bulk, cancel_event)
+            finally:
+                if driver_genero is not driver_instance:
+                    driver_genero.cleanup()
 
-            print(f"🔍 Buscando: {name}")
-            result = search_species(name, driver_instance)
-
-            results.append({
-                "Nº": idx + 1,
-                "Nome Científico": name,
-                "Família": result["familia"],
-                "Autor": result["autor"],
-                "Link Reflora": result["reflora_link"],
-                "Distribuição": result["distribuicao_geografica"],
-                "Forma de Vida": result["forma_vida"],
-                "Substrato": result["substrato"],
-                "Origem": result["origem"],
-                "Endemismo": result["endemismo"],
-                "Domínios Fitogeográficos": result["dominios_fitogeograficos"],
-                "Tipos de Vegetação": result["tipos_vegetacao"],
-                "Inconsistências": result["inconsistencia"],
-                "Status Nome": result["Status Nome"]
-            })
+        for i, (posicao, alvo, result) in enumerate(busca):
+            synonym_graph.registrar_resultado(alvo, result)
+            if result["Status Nome"] != "Erro na verificação" and result["familia"]:
+                name_index.adicionar(alvo)
 
+            for idx, name in buscas[posicao][1]:
+                nota = ""
+                if idx in corrigidos:
+                    nota = f" | Grafia corrigida (original: {corrigidos[idx].original})"
+                elif idx in sugeridos:
+                    nota = f" | Possível erro de grafia (sugestão: {sugeridos[idx]})"
+                if idx in sinonimos:
+                    registrar(_result_row(idx, name, resultado_sinonimo(result, alvo), nota))
+                else:
+                    registrar(_result_row(idx, name, result, nota))
 
             # Salva o progresso a cada 5 espécies processadas
             if i % 5 == 0:
-                save_progress(df, idx, results)
+                save_progress(total, idx, progresso, novo=i == 0)
+                progresso.clear()
+
+            if profiler:
+                profiler.step(i + 1)
 
             if callback:
                 elapsed = time.time() - start_time
-                avg_time = elapsed / (len(results))
-                estimated = avg_time * (len(df) - len(results))
-                callback(len(results), len(df), name, elapsed, estimated)
+                avg_time = elapsed / processados
+                estimated = avg_time * (total - processados)
+                callback(processados, total, name, elapsed, estimated)
+
+        # Sugestões de grafia vêm antes das buscas, e no pipeline os resultados chegam fora de ordem
+        results[len(invalid_names):] = sorted(results[len(invalid_names):], key=lambda r: r["Nº"])
 
         # Limpa o progresso ao concluir
         clear_progress()
-        return pd.DataFrame(results)
+        return tabela()
 
     except Exception as e:
         # Em caso de erro, mantém o progresso salvo para recuperação
         print(f"Erro durante a busca: {e}")
         raise
     finally:
-        driver_instance.cleanup()
\ No newline at end of file
+        if writer is not None:
+            escrever(todas=True)
+        if profiler:
+            profiler.stop()
+        if driver_instance:
+            driver_instance.cleanup()
+        try:
+            name_index.salvar()
+        except Exception as e:
+            print(f"Erro ao salvar o índice de nomes: {e}")
+        try:
+            synonym_graph.salvar()
+        except Exception as e:
+            print(f"Erro ao salvar o grafo de sinônimos: {e}")
+        try:
+            estatisticas_estrategias.salvar()
+            ordem = estatisticas_estrategias.ordem(extraction_mode, DataReader.FORMA_SUBSTRATO_ESTRATEGIAS)
+            print(f"Ordem das estratégias de forma de vida/substrato ({extraction_mode}): {', '.join(ordem)}")
+        except Exception as e:
+            print(f"Erro ao salvar estatísticas das estratégias: {e}")
+        if replay_server:
+            set_base_url(None)
+            replay_server.stop()
+            if replay_server.falhas:
+                print(f"Replay: {replay_server.falhas} páginas não encontradas no arquivo")
\ No newline at end of file
@@ -0,0 +1,170 @@
+import re
+from typing import List
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import CData, Comment, Declaration, Doctype, ProcessingInstruction
+from selenium.common.exceptions import (
+    InvalidSelectorException, NoSuchElementException, WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+from html_parser import PARSER_BS4 as PARSER_PADRAO
+
+# Elementos que o Selenium renderiza em linha própria no .text
+_BLOCOS = {
+    "address", "article", "aside", "blockquote", "body", "caption", "dd", "details",
+    "dialog", "div", "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "html", "li", "main", "nav",
+    "ol", "p", "pre", "section", "summary", "table", "tbody", "tfoot", "thead", "tr", "ul",
+}
+# Elementos nunca visíveis, ignorados no .text
+_OCULTOS = {"head", "link", "meta", "noscript", "script", "style", "template", "title"}
+_STRINGS_IGNORADAS = (CData, Comment, Declaration, Doctype, ProcessingInstruction)
+
+_XPATH_ATRIBUTO = re.compile(r"""^//([\w*-]+)\[@([\w-]+)=(["'])(.*?)\3\]$""")
+_XPATH_CONTAINS_TEXT = re.compile(r"""^//([\w*-]+)\[contains\(text\(\),\s*(["'])(.*?)\2\)\]$""")
+_XPATH_TAG = re.compile(r"^//([\w-]+)$")
+_XPATH_IRMAO = re.compile(r"^\./following-sibling::([\w-]+)$")
+
+
+def texto_visivel(tag) -> str:
+    """Aproxima o `.text` do Selenium: blocos e <br> quebram linha, espaços colapsados"""
+    partes = []
+
+    def visitar(no):
+        if isinstance(no, NavigableString):
+            if not isinstance(no, _STRINGS_IGNORADAS):
+                partes.append(str(no))
+            return
+        nome = no.name
+        if nome in _OCULTOS:
+            return
+        if nome == "br":
+            partes.append("\n")
+            return
+        bloco = nome in _BLOCOS
+        if bloco:
+            partes.append("\n")
+        for filho in no.children:
+            visitar(filho)
+        if bloco:
+            partes.append("\n")
+        elif nome in ("td", "th"):
+            partes.append(" ")
+
+    visitar(tag)
+    linhas = (re.sub(r"[ \t\r\f\v\xa0]+", " ", linha).strip() for linha in "".join(partes).split("\n"))
+    return "\n".join(linha for linha in linhas if linha)
+
+
+class SnapshotElement:
+    """Elemento de um PageSnapshot com a mesma interface usada do WebElement"""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    @property
+    def text(self) -> str:
+        return texto_visivel(self.tag)
+
+    def get_attribute(self, nome):
+        if nome == "textContent":
+            return self.tag.get_text()
+        if nome == "innerHTML":
+            return self.tag.decode_contents()
+        if nome == "outerHTML":
+            return str(self.tag)
+        valor = self.tag.get(nome)
+        if isinstance(valor, list):
+            return " ".join(valor)
+        return valor
+
+    def find_elements(self, by=By.ID, value=None) -> List["SnapshotElement"]:
+        return [SnapshotElement(tag) for tag in _buscar(self.tag, by, value)]
+
+    def find_element(self, by=By.ID, value=None) -> "SnapshotElement":
+        encontrados = _buscar(self.tag, by, value)
+        if not encontrados:
+            raise NoSuchElementException(f"Elemento não encontrado no snapshot: {by}={value}")
+        return SnapshotElement(encontrados[0])
+
+
+def _buscar(raiz, by, value):
+    if by == By.CSS_SELECTOR:
+        return raiz.select(value)
+    if by == By.ID:
+        return raiz.select(f"#{value}")
+    if by == By.CLASS_NAME:
+        return raiz.select(f".{value}")
+    if by == By.TAG_NAME:
+        return raiz.find_all(value)
+    if by == By.XPATH:
+        return _buscar_xpath(raiz, value)
+    raise InvalidSelectorException(f"Localizador não suportado no snapshot: {by}")
+
+
+def _buscar_xpath(raiz, xpath):
+    """Suporta apenas as formas de XPath usadas pelo DataReader"""
+    xpath = xpath.strip()
+
+    match = _XPATH_ATRIBUTO.match(xpath)
+    if match:
+        tag, atributo, _, valor = match.groups()
+        return [
+            el for el in raiz.find_all(None if tag == "*" else tag)
+            if SnapshotElement(el).get_attribute(atributo) == valor
+        ]
+
+    match = _XPATH_CONTAINS_TEXT.match(xpath)
+    if match:
+        tag, _, trecho = match.groups()
+        encontrados = []
+        for el in raiz.find_all(None if tag == "*" else tag):
+            # No XPath 1.0, text() em contains() é o primeiro nó de texto filho
+            primeiro_texto = next((f for f in el.children if isinstance(f, NavigableString)), None)
+            if primeiro_texto is not None and trecho in str(primeiro_texto):
+                encontrados.append(el)
+        return encontrados
+
+    match = _XPATH_TAG.match(xpath)
+    if match:
+        return raiz.find_all(match.group(1))
+
+    match = _XPATH_IRMAO.match(xpath)
+    if match:
+        return raiz.find_next_siblings(match.group(1))
+
+    raise InvalidSelectorException(f"XPath não suportado no snapshot: {xpath}")
+
+
+class PageSnapshot:
+    """
+    Cópia em memória de uma página carregada no WebDriver.
+
+    O DOM é transferido uma única vez (page_source) e parseado uma única vez;
+    os métodos do DataReader rodam sobre ele sem nenhuma chamada ao
+    chromedriver, pois a classe expõe o subconjunto da API do WebDriver que
+    eles usam (find_element(s), page_source, current_url).
+    """
+
+    is_snapshot = True
+    modo_extracao = "snapshot"
+
+    def __init__(self, page_source: str, current_url: str = "", parser: str = None):
+        self.page_source = page_source
+        self.current_url = current_url
+        self.soup = BeautifulSoup(page_source, parser or PARSER_PADRAO)
+        self._raiz = SnapshotElement(self.soup)
+
+    @classmethod
+    def from_driver(cls, driver, url: str = None, parser: str = None) -> "PageSnapshot":
+        return cls(driver.page_source, url if url is not None else driver.current_url, parser)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._raiz.find_elements(by, value)
+
+    def find_element(self, by=By.ID, value=None):
+        return self._raiz.find_element(by, value)
+
+    def execute_script(self, *args, **kwargs):
+        raise WebDriverException("PageSnapshot não executa JavaScript")
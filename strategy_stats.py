@@ -0,0 +1,139 @@
+# strategy_stats.py
+import json
+import os
+import threading
+from collections import deque
+
+STRATEGY_STATS_FILE = "strategy_stats.json"
+JANELA_PADRAO = 50
+# Tentativas mínimas antes de a estratégia ser ordenada pelo histórico
+MIN_AMOSTRAS = 3
+# Taxa de sucesso a partir da qual a estratégia é confiável para encerrar a busca com um só campo
+TAXA_COMPROVADA = 0.9
+# Versão do critério de sucesso: históricos gravados com outro critério são descartados
+VERSAO_HISTORICO = 2
+
+
+class EstatisticasEstrategias:
+    """
+    Sucesso e custo de cada estratégia de extração em uma janela deslizante
+    das últimas `janela` tentativas, separados por contexto (modo de extração:
+    a mesma estratégia custa e funciona diferente no WebDriver e num snapshot).
+
+    ordem() põe primeiro as estratégias com sucesso comprovado (ao menos
+    `min_amostras` tentativas e algum sucesso na janela), da menor para a
+    maior esperança de custo por sucesso (custo médio / taxa de sucesso);
+    depois as ainda não medidas e, no fim, as que só falharam. A ordem dada
+    desempata, de modo que uma estratégia nunca medida não passa à frente de
+    uma que funciona. Assim, quando o layout do site muda, a busca converge
+    para a estratégia que voltou a funcionar.
+    """
+
+    def __init__(self, janela=JANELA_PADRAO, caminho=STRATEGY_STATS_FILE, min_amostras=MIN_AMOSTRAS,
+                 taxa_comprovada=TAXA_COMPROVADA):
+        self.janela = janela
+        self.min_amostras = min_amostras
+        self.taxa_comprovada = taxa_comprovada
+        self.caminho = caminho
+        self.adaptativo = True
+        self._historico = {}
+        self._carregado = False
+        self._lock = threading.Lock()
+
+    def _janela(self, contexto, estrategia):
+        por_estrategia = self._historico.setdefault(contexto, {})
+        if estrategia not in por_estrategia:
+            por_estrategia[estrategia] = deque(maxlen=self.janela)
+        return por_estrategia[estrategia]
+
+    def registrar(self, contexto: str, estrategia: str, sucesso: bool, custo: float):
+        with self._lock:
+            self._janela(contexto, estrategia).append((bool(sucesso), custo))
+
+    def _resumo(self, tentativas):
+        sucessos = sum(1 for sucesso, _ in tentativas if sucesso)
+        custo_medio = sum(custo for _, custo in tentativas) / len(tentativas)
+        return {
+            "tentativas": len(tentativas),
+            "sucessos": sucessos,
+            "taxa_sucesso": sucessos / len(tentativas),
+            "custo_medio_s": custo_medio,
+            "custo_por_sucesso_s": custo_medio * len(tentativas) / sucessos if sucessos else None,
+        }
+
+    def comprovada(self, contexto: str, estrategia: str) -> bool:
+        """Ao menos `min_amostras` tentativas na janela, com taxa de sucesso de `taxa_comprovada` ou mais"""
+        with self._lock:
+            tentativas = self._historico.get(contexto, {}).get(estrategia)
+            if not tentativas or len(tentativas) < self.min_amostras:
+                return False
+            return self._resumo(tentativas)["taxa_sucesso"] >= self.taxa_comprovada
+
+    def ordem(self, contexto: str, estrategias) -> tuple:
+        """`estrategias` reordenadas pelo histórico do contexto (a ordem dada desempata)"""
+        if not self.adaptativo:
+            return tuple(estrategias)
+
+        with self._lock:
+            historico = self._historico.get(contexto, {})
+            chaves = {}
+            for posicao, estrategia in enumerate(estrategias):
+                tentativas = historico.get(estrategia)
+                if not tentativas or len(tentativas) < self.min_amostras:
+                    chaves[estrategia] = (1, 0, posicao)
+                    continue
+                custo_por_sucesso = self._resumo(tentativas)["custo_por_sucesso_s"]
+                if custo_por_sucesso is None:
+                    chaves[estrategia] = (2, 0, posicao)
+                else:
+                    chaves[estrategia] = (0, custo_por_sucesso, posicao)
+        return tuple(sorted(estrategias, key=chaves.__getitem__))
+
+    def stats(self) -> dict:
+        """{contexto: {estrategia: resumo}} da janela atual"""
+        with self._lock:
+            return {
+                contexto: {
+                    estrategia: self._resumo(tentativas)
+                    for estrategia, tentativas in por_estrategia.items() if tentativas
+                }
+                for contexto, por_estrategia in self._historico.items()
+            }
+
+    def carregar(self):
+        """Lê o histórico salvo (uma única vez por processo)"""
+        with self._lock:
+            if self._carregado:
+                return
+            self._carregado = True
+            if not os.path.exists(self.caminho):
+                return
+            try:
+                with open(self.caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                return
+            if dados.get("versao") != VERSAO_HISTORICO:
+                return
+            for contexto, por_estrategia in dados.get("historico", {}).items():
+                for estrategia, tentativas in por_estrategia.items():
+                    janela = self._janela(contexto, estrategia)
+                    janela.extend((bool(sucesso), float(custo)) for sucesso, custo in tentativas)
+
+    def salvar(self):
+        with self._lock:
+            dados = {
+                "versao": VERSAO_HISTORICO,
+                "janela": self.janela,
+                "historico": {
+                    contexto: {estrategia: list(tentativas) for estrategia, tentativas in por_estrategia.items()}
+                    for contexto, por_estrategia in self._historico.items()
+                },
+            }
+        dados["resumo"] = self.stats()
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._historico.clear()
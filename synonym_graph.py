@@ -0,0 +1,157 @@
+# synonym_graph.py
+"""
+Grafo local de sinônimos: sinônimo → nome aceito.
+
+Toda busca cujo resultado diz "Nome desatualizado" com "Sugerido: <aceito>"
+registra a aresta, com a data em que foi vista. Antes de buscar, um nome que
+é sinônimo conhecido é trocado pelo nome aceito (seguindo cadeias de
+sinônimos), de modo que só o táxon aceito é buscado, uma única vez, e o
+resultado do sinônimo é montado a partir dele.
+"""
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from checklist import chave_nome
+
+SYNONYM_GRAPH_FILE = "synonym_graph.json"
+SYNONYM_EXPIRE_DAYS = 180
+
+_SUGERIDO_RE = re.compile(r"Sugerido:\s*([^|]+)")
+# Marcadores de categoria infraespecífica que fazem parte do nome
+_CATEGORIAS = {"subsp.", "ssp.", "var.", "f.", "forma", "subvar."}
+
+
+def nome_canonico(texto: str) -> str:
+    """Nome científico sem autor: 'Cedrela fissilis Vell.' → 'Cedrela fissilis'"""
+    palavras = texto.split()
+    if not palavras:
+        return ""
+    nome = [palavras[0]]
+    for palavra in palavras[1:]:
+        if palavra in _CATEGORIAS or (palavra[:1].islower() and "." not in palavra):
+            nome.append(palavra)
+        else:
+            break
+    # Uma categoria sem epíteto depois dela é o começo do autor
+    while nome[-1] in _CATEGORIAS:
+        nome.pop()
+    return " ".join(nome)
+
+
+def nome_aceito(result: dict) -> Optional[str]:
+    """Nome aceito indicado em um resultado de sinônimo, ou None"""
+    if result.get("Status Nome") != "Nome desatualizado":
+        return None
+    sugerido = _SUGERIDO_RE.search(result.get("inconsistencia") or "")
+    if not sugerido:
+        return None
+    return nome_canonico(sugerido.group(1)) or None
+
+
+def resultado_sinonimo(result: dict, aceito: str) -> dict:
+    """Resultado de um sinônimo montado a partir do resultado do nome aceito"""
+    if result["Status Nome"] == "Erro na verificação":
+        return result
+    partes = [f"Sugerido: {aceito}", "Nome científico desatualizado"]
+    partes += [p.strip() for p in result["inconsistencia"].split("|")
+               if p.strip() and p.strip() not in partes and not p.strip().startswith("Sugerido:")]
+    return dict(result, inconsistencia=" | ".join(partes), **{"Status Nome": "Nome desatualizado"})
+
+
+class GrafoSinonimos:
+    """
+    Arestas sinônimo → nome aceito, persistidas em JSON.
+
+    Arestas mais antigas que SYNONYM_EXPIRE_DAYS são ignoradas na resolução
+    (o nome volta a ser buscado e a aresta é registrada de novo), e um nome
+    que uma busca mostrou ser válido perde a aresta que tinha.
+    """
+
+    def __init__(self, caminho=SYNONYM_GRAPH_FILE, validade_dias=SYNONYM_EXPIRE_DAYS):
+        self.caminho = caminho
+        self.validade = timedelta(days=validade_dias)
+        self._arestas = {}
+        self._carregado = False
+        self._alterado = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._arestas)
+
+    def registrar(self, sinonimo: str, aceito: str, data: Optional[datetime] = None) -> bool:
+        chave, chave_aceito = chave_nome(sinonimo), chave_nome(aceito)
+        if not chave or not chave_aceito or chave == chave_aceito:
+            return False
+        with self._lock:
+            self._arestas[chave] = {
+                "sinonimo": " ".join(sinonimo.split()),
+                "aceito": " ".join(aceito.split()),
+                "data": (data or datetime.now()).isoformat(timespec="seconds"),
+            }
+            self._alterado = True
+        return True
+
+    def registrar_resultado(self, nome: str, result: dict) -> Optional[str]:
+        """Atualiza o grafo com o resultado da busca de `nome`; devolve o nome aceito, se é sinônimo"""
+        aceito = nome_aceito(result)
+        if aceito:
+            self.registrar(nome, aceito)
+        elif result.get("Status Nome") == "Nome válido":
+            with self._lock:
+                if self._arestas.pop(chave_nome(nome), None) is not None:
+                    self._alterado = True
+        return aceito
+
+    def _valida(self, aresta) -> bool:
+        try:
+            return datetime.now() - datetime.fromisoformat(aresta["data"]) < self.validade
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def aceito(self, nome: str) -> Optional[str]:
+        """Nome aceito de `nome` (seguindo cadeias de sinônimos), ou None se não é sinônimo conhecido"""
+        chave = chave_nome(nome)
+        aceito = None
+        vistos = {chave}
+        with self._lock:
+            while True:
+                aresta = self._arestas.get(chave)
+                if aresta is None or not self._valida(aresta):
+                    return aceito
+                aceito = aresta["aceito"]
+                chave = chave_nome(aceito)
+                if chave in vistos:
+                    # Ciclo (dados inconsistentes): não resolve
+                    return None
+                vistos.add(chave)
+
+    def carregar(self):
+        """Lê o grafo salvo (uma única vez por processo)"""
+        with self._lock:
+            if self._carregado:
+                return
+            self._carregado = True
+            if not os.path.exists(self.caminho):
+                return
+            try:
+                with open(self.caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                return
+            for aresta in dados.get("sinonimos", []):
+                if aresta.get("sinonimo") and aresta.get("aceito"):
+                    self._arestas[chave_nome(aresta["sinonimo"])] = aresta
+            self._alterado = False
+
+    def salvar(self):
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {"sinonimos": [self._arestas[chave] for chave in sorted(self._arestas)]}
+            self._alterado = False
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,161 @@
+# telemetry.py
+import json
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+
+JANELA_PADRAO = 50
+LIMIAR_PADRAO = 0.5
+MIN_LEITURAS_PADRAO = 20
+
+# Caminho registrado quando nenhum seletor do leitor encontrou o valor
+SEM_RESULTADO = "(nenhum)"
+
+
+class TelemetriaSeletores:
+    """
+    Contadores de acerto por seletor dos leitores do DataReader em uma
+    execução, com detecção de mudança de layout.
+
+    Cada leitura registra os caminhos tentados (seletor CSS ou fallback) com
+    o tempo gasto em cada um e o caminho que encontrou o valor. Depois de
+    `min_leituras` leituras, o caminho que mais venceu vira a referência do
+    leitor; quando a taxa de vitória da referência nas últimas `janela`
+    leituras cai abaixo de `limiar`, um alerta é emitido e a referência é
+    reaprendida com as `min_leituras` leituras seguintes (o layout novo).
+    """
+
+    def __init__(self, janela=JANELA_PADRAO, limiar=LIMIAR_PADRAO, min_leituras=MIN_LEITURAS_PADRAO):
+        self.janela = janela
+        self.limiar = limiar
+        self.min_leituras = min_leituras
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera os contadores para uma nova execução"""
+        with self._lock:
+            self._tentativas = defaultdict(Counter)
+            self._acertos = defaultdict(Counter)
+            self._tempo = defaultdict(lambda: defaultdict(float))
+            self._vitorias = defaultdict(Counter)
+            self._recentes = defaultdict(lambda: deque(maxlen=self.janela))
+            self._fallbacks = defaultdict(Counter)
+            self._tempo_fallbacks = defaultdict(lambda: defaultdict(float))
+            self._leituras = Counter()
+            self._referencias = {}
+            self._reaprender_em = {}
+            self.alertas = []
+            self.inicio = datetime.now()
+
+    def registrar(self, leitor: str, tentativas, vencedor=None):
+        """
+        `tentativas` é a lista [(caminho, segundos)] na ordem em que os
+        caminhos foram tentados; `vencedor` é o caminho que encontrou o valor
+        (None se nenhum encontrou).
+        """
+        vencedor = vencedor or SEM_RESULTADO
+        with self._lock:
+            self._leituras[leitor] += 1
+            for caminho, custo in tentativas:
+                self._tentativas[leitor][caminho] += 1
+                self._tempo[leitor][caminho] += custo
+            if vencedor != SEM_RESULTADO:
+                self._acertos[leitor][vencedor] += 1
+            self._vitorias[leitor][vencedor] += 1
+            self._recentes[leitor].append(vencedor)
+
+            # Fallback: o valor não veio do primeiro caminho tentado
+            if tentativas and vencedor != tentativas[0][0]:
+                self._fallbacks[leitor][vencedor] += 1
+                self._tempo_fallbacks[leitor][vencedor] += sum(custo for _, custo in tentativas)
+
+            alerta = self._verificar_deriva(leitor)
+        if alerta:
+            print(f"⚠ {alerta}")
+
+    def _verificar_deriva(self, leitor):
+        leituras = self._leituras[leitor]
+        recentes = self._recentes[leitor]
+        referencia = self._referencias.get(leitor)
+        if referencia is None:
+            if leituras < self._reaprender_em.get(leitor, self.min_leituras):
+                return None
+            ultimas = Counter(list(recentes)[-self.min_leituras:])
+            ultimas.pop(SEM_RESULTADO, None)
+            if not ultimas:
+                return None
+            referencia = self._referencias[leitor] = ultimas.most_common(1)[0][0]
+            self._recentes[leitor] = recentes = deque(list(recentes)[-self.min_leituras:], maxlen=self.janela)
+
+        taxa = sum(1 for v in recentes if v == referencia) / len(recentes)
+        if taxa >= self.limiar:
+            return None
+
+        del self._referencias[leitor]
+        self._reaprender_em[leitor] = leituras + self.min_leituras
+        mensagem = (
+            f"Possível mudança de layout em '{leitor}': o seletor '{referencia}' encontrou o valor "
+            f"em {taxa:.0%} das últimas {len(recentes)} leituras (limite {self.limiar:.0%})"
+        )
+        self.alertas.append({"horario": datetime.now().isoformat(), "leitor": leitor,
+                             "seletor": referencia, "taxa": taxa, "mensagem": mensagem})
+        return mensagem
+
+    def referencia(self, leitor):
+        """Seletor de referência atual do leitor (o que mais venceu, se ainda não definido)"""
+        if leitor in self._referencias:
+            return self._referencias[leitor]
+        vitorias = Counter(self._vitorias[leitor])
+        vitorias.pop(SEM_RESULTADO, None)
+        return vitorias.most_common(1)[0][0] if vitorias else None
+
+    def relatorio(self) -> dict:
+        with self._lock:
+            leitores = {}
+            for leitor, total in self._leituras.items():
+                seletores = {}
+                for caminho, tentativas in self._tentativas[leitor].items():
+                    acertos = self._acertos[leitor][caminho]
+                    tempo = self._tempo[leitor][caminho]
+                    seletores[caminho] = {
+                        "tentativas": tentativas,
+                        "acertos": acertos,
+                        "taxa_acerto": acertos / tentativas,
+                        "tempo_total_s": tempo,
+                        "tempo_medio_s": tempo / tentativas,
+                    }
+                leitores[leitor] = {
+                    "leituras": total,
+                    "seletor_referencia": self.referencia(leitor),
+                    "sem_resultado": self._vitorias[leitor][SEM_RESULTADO],
+                    "seletores": seletores,
+                    "fallbacks": {
+                        caminho: {"vezes": vezes, "tempo_total_s": self._tempo_fallbacks[leitor][caminho]}
+                        for caminho, vezes in self._fallbacks[leitor].most_common()
+                    },
+                }
+            return {
+                "inicio": self.inicio.isoformat(),
+                "fim": datetime.now().isoformat(),
+                "leitores": leitores,
+                "alertas": list(self.alertas),
+            }
+
+    def resumo_texto(self) -> str:
+        """Relatório legível dos fallbacks tomados na execução"""
+        relatorio = self.relatorio()
+        linhas = []
+        for leitor, dados in relatorio["leitores"].items():
+            linhas.append(f"{leitor}: {dados['leituras']} leituras, referência '{dados['seletor_referencia']}', "
+                          f"{dados['sem_resultado']} sem resultado")
+            for caminho, fallback in dados["fallbacks"].items():
+                linhas.append(f"  fallback '{caminho}': {fallback['vezes']}x, {fallback['tempo_total_s']:.3f}s")
+        for alerta in relatorio["alertas"]:
+            linhas.append(f"ALERTA: {alerta['mensagem']}")
+        return "\n".join(linhas)
+
+    def salvar(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.relatorio(), f, ensure_ascii=False, indent=2)
+        return caminho